@@ -0,0 +1,178 @@
+import hashlib
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, TokenAuthentication, get_authorization_header
+
+from apps.core.timing import measure
+
+
+class TokenCacheStats:
+    """Per-process hit/miss counters for the token cache"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def snapshot(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / total if total else None,
+            }
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+token_cache_stats = TokenCacheStats()
+
+
+def get_token_cache():
+    return caches[settings.TOKEN_CACHE_ALIAS]
+
+
+def token_cache_key(key):
+    # Never use the raw token as a cache key
+    return 'auth:token:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def invalidate_token(key):
+    """Drop a token from the cache, e.g. on logout"""
+    get_token_cache().delete(token_cache_key(key))
+
+
+def invalidate_user_tokens(user):
+    """Drop every cached token belonging to ``user``"""
+    from rest_framework.authtoken.models import Token
+
+    keys = Token.objects.filter(user=user).values_list('key', flat=True)
+    get_token_cache().delete_many([token_cache_key(key) for key in keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that keeps token -> user lookups in a bounded,
+    TTL-evicted cache instead of querying authtoken_token on every request.
+
+    Entries are dropped on logout, token deletion and user changes. The
+    default file backend shares them between the workers of a host; with a
+    per-process backend other workers could honour a revoked token until
+    TOKEN_CACHE_TIMEOUT, so config/gunicorn.py refuses it for several workers.
+
+    ``aauthenticate`` is the same lookup for async views, using the async ORM on a miss.
+    """
+
+    def authenticate(self, request):
+        with measure('auth'):
+            return super().authenticate(request)
+
+    async def aauthenticate(self, request):
+        with measure('auth'):
+            key = self.get_key(request)
+            if key is None:
+                return None
+            return await self.aauthenticate_credentials(key)
+
+    def get_key(self, request):
+        """The token from the Authorization header, parsed as TokenAuthentication does"""
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) == 1:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. No credentials provided.'))
+        if len(auth) > 2:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. Token string should not contain spaces.'))
+        try:
+            return auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(
+                _('Invalid token header. Token string should not contain invalid characters.')
+            )
+
+    async def aauthenticate_credentials(self, key):
+        # Both cache backends used here are in-process or local files, cheap enough to call inline
+        cache = get_token_cache()
+        cache_key = token_cache_key(key)
+        token = cache.get(cache_key)
+        token_cache_stats.record(hit=token is not None)
+        if token is not None:
+            return (token.user, token)
+
+        model = self.get_model()
+        try:
+            token = await model.objects.select_related('user').aget(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        cache.set(cache_key, token)
+        return (token.user, token)
+
+    def authenticate_credentials(self, key):
+        cache = get_token_cache()
+        cache_key = token_cache_key(key)
+        token = cache.get(cache_key)
+        token_cache_stats.record(hit=token is not None)
+        if token is not None:
+            return (token.user, token)
+
+        user, token = super().authenticate_credentials(key)
+        cache.set(cache_key, token)
+        return (user, token)
+
+
+class SignedAccessTokenAuthentication(BaseAuthentication):
+    """
+    ``Authorization: Bearer <access token>`` verified by signature alone.
+    The user is built from the token without a query; fields other than
+    id and role are loaded from the database only if something reads them.
+    Active only when SIGNED_ACCESS_TOKENS is enabled.
+    """
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        if not settings.SIGNED_ACCESS_TOKENS:
+            return None
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed(_('Invalid bearer header.'))
+
+        from .tokens import InvalidAccessToken, read_access_token
+
+        with measure('auth'):
+            try:
+                payload = read_access_token(auth[1].decode())
+            except (InvalidAccessToken, UnicodeError) as exc:
+                raise exceptions.AuthenticationFailed(str(exc) or _('Invalid access token.'))
+            return (self.get_user(payload), payload)
+
+    async def aauthenticate(self, request):
+        return self.authenticate(request)
+
+    def get_user(self, payload):
+        from .models import User
+
+        using = router.db_for_read(User)
+        return User.from_db(using, ['id', 'role', 'is_active'], [payload['u'], payload['r'], payload['a']])
+
+    def authenticate_header(self, request):
+        return self.keyword
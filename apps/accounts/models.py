@@ -29,9 +29,20 @@ class User(AbstractUser):
     class Meta:
         db_table = 'users'
         ordering = ['-date_joined']
+        indexes = [
+            models.Index(fields=['date_joined'], name='users_date_joined_idx'),
+        ]
 
     def __str__(self):
         return self.username
+
+    def save(self, *args, **kwargs):
+        # auto_now is only written when listed; cached ticket representations and
+        # ETags are versioned by it, so any change but a login touch bumps it
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) - {'last_login'}:
+            kwargs['update_fields'] = {*update_fields, 'updated_at'}
+        super().save(*args, **kwargs)
     
     @property
     def is_admin(self):
@@ -0,0 +1,13 @@
+from drf_spectacular.extensions import OpenApiAuthenticationExtension
+
+
+class SignedAccessTokenScheme(OpenApiAuthenticationExtension):
+    target_class = 'apps.accounts.authentication.SignedAccessTokenAuthentication'
+    name = 'Bearer'
+
+    def get_security_definition(self, auto_schema):
+        return {
+            'type': 'http',
+            'scheme': 'bearer',
+            'description': 'Signed access token from login or /auth/token/refresh/ (SIGNED_ACCESS_TOKENS)',
+        }
@@ -1,9 +1,10 @@
 from rest_framework import serializers
 from rest_framework.authtoken.models import Token
 
+from apps.core.serializers import SparseFieldsetMixin, TimedRepresentationMixin
 from .models import User
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedRepresentationMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer fot User model"""
     
     class Meta:
@@ -11,7 +12,7 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'email', 'role', 'date_joined']
         read_only_fields = ['id', 'date_joined']
 
-class UserDetailSerializer(serializers.ModelSerializer):
+class UserDetailSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     """Detailed user serializer iwth avatar"""
 
     class Meta:
@@ -44,3 +45,8 @@ class LoginSerializer(serializers.Serializer):
     """Login serializer"""
     username = serializers.CharField()
     password = serializers.CharField(write_only=True)
+
+
+class TokenRefreshSerializer(serializers.Serializer):
+    """Exchange a refresh token (the DRF Token key) for a new access token"""
+    refresh = serializers.CharField()
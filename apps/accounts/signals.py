@@ -0,0 +1,28 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import invalidate_token, invalidate_user_tokens
+from .models import User
+from .tokens import revoke_user_access_tokens
+
+
+@receiver(post_save, sender=User)
+def invalidate_tokens_on_user_change(sender, instance, created, update_fields, **kwargs):
+    """Deactivation and role changes must not be served from the token cache"""
+    if created:
+        return
+    invalidate_user_tokens(instance)
+    # Access tokens carry the role, so they are revoked too; a last_login touch is not a change
+    if update_fields is None or set(update_fields) != {'last_login'}:
+        revoke_user_access_tokens(instance)
+
+
+@receiver(post_delete, sender=User)
+def revoke_tokens_of_deleted_user(sender, instance, **kwargs):
+    revoke_user_access_tokens(instance)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    invalidate_token(instance.key)
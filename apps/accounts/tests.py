@@ -1,3 +1,140 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APIRequestFactory
+
+from .authentication import get_token_cache, token_cache_stats
+from .models import User
+from .tokens import get_revocation_cache, issue_access_token
+from .views import UserViewSet
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Token lookups are served from the cache and invalidated on logout"""
+
+    def setUp(self):
+        get_token_cache().clear()
+        token_cache_stats.reset()
+        self.user = User.objects.create_user(username='alice', password='password123')
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_second_request_skips_token_query(self):
+        with self.assertNumQueries(1):
+            self.client.get('/api/v1/auth/users/me/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/v1/auth/users/me/')
+        self.assertEqual(response.data['username'], 'alice')
+        self.assertEqual(token_cache_stats.snapshot()['hits'], 1)
+        self.assertEqual(token_cache_stats.snapshot()['misses'], 1)
+
+    def test_logout_invalidates_cached_token(self):
+        self.client.get('/api/v1/auth/users/me/')
+        response = self.client.post('/api/v1/auth/logout/')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get('/api/v1/auth/users/me/')
+        self.assertEqual(response.status_code, 401)
+
+    def test_deactivation_invalidates_cached_token(self):
+        self.client.get('/api/v1/auth/users/me/')
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get('/api/v1/auth/users/me/')
+        self.assertEqual(response.status_code, 401)
+
+    def test_stats_endpoint_requires_staff(self):
+        response = self.client.get('/api/v1/auth/token-cache-stats/')
+        self.assertEqual(response.status_code, 403)
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get('/api/v1/auth/token-cache-stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('hit_ratio', response.data)
+
+
+@override_settings(SIGNED_ACCESS_TOKENS=True, ACCESS_TOKEN_LIFETIME=300)
+class SignedAccessTokenTests(TestCase):
+    """Bearer access tokens are verified without a token lookup and can be revoked"""
+
+    def setUp(self):
+        get_token_cache().clear()
+        get_revocation_cache().clear()
+        self.user = User.objects.create_user(username='alice', password='password123')
+        self.client = APIClient()
+        response = self.client.post(
+            '/api/v1/auth/login/', {'username': 'alice', 'password': 'password123'}, format='json'
+        )
+        self.tokens = response.data
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.tokens["access"]}')
+
+    def test_login_returns_access_and_refresh_tokens(self):
+        self.assertEqual(self.tokens['refresh'], self.tokens['token'])
+        self.assertEqual(self.tokens['expires_in'], 300)
+
+    def test_bearer_request_skips_token_query(self):
+        # The only query loads the profile that /me returns
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/auth/users/me/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['username'], 'alice')
+
+    @override_settings(ASYNC_READ_VIEWS=True)
+    def test_async_me_loads_deferred_profile(self):
+        view = UserViewSet.as_view({'get': 'me'}, basename='user', detail=False)
+        request = APIRequestFactory().get(
+            '/api/v1/auth/users/me/', HTTP_AUTHORIZATION=f'Bearer {self.tokens["access"]}'
+        )
+        response = async_to_sync(view)(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['username'], 'alice')
+
+    def test_refresh_issues_new_access_token(self):
+        response = APIClient().post(
+            '/api/v1/auth/token/refresh/', {'refresh': self.tokens['refresh']}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+        self.assertEqual(self.client.get('/api/v1/auth/users/me/').status_code, 200)
+
+        response = APIClient().post('/api/v1/auth/token/refresh/', {'refresh': 'nope'}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_logout_revokes_access_token(self):
+        response = self.client.post('/api/v1/auth/logout/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/api/v1/auth/users/me/').status_code, 401)
+        self.assertFalse(Token.objects.filter(user=self.user).exists())
+
+    def test_user_change_revokes_access_tokens(self):
+        self.user.role = 'admin'
+        self.user.save()
+        self.assertEqual(self.client.get('/api/v1/auth/users/me/').status_code, 401)
+
+    def test_inactive_and_deleted_users_are_rejected(self):
+        self.user.is_active = False
+        access, _ = issue_access_token(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.assertEqual(self.client.get('/api/v1/auth/users/me/').status_code, 401)
+
+        other = User.objects.create_user(username='bob', password='password123')
+        access, _ = issue_access_token(other)
+        other.delete()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.assertEqual(self.client.get('/api/v1/auth/users/me/').status_code, 401)
+
+    def test_expired_and_tampered_tokens_are_rejected(self):
+        with mock.patch('apps.accounts.tokens.time.time', return_value=10**10):
+            self.assertEqual(self.client.get('/api/v1/auth/users/me/').status_code, 401)
+        access, _ = issue_access_token(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access[:-2]}xx')
+        self.assertEqual(self.client.get('/api/v1/auth/users/me/').status_code, 401)
+
+    @override_settings(SIGNED_ACCESS_TOKENS=False)
+    def test_disabled_mode_ignores_bearer_tokens(self):
+        self.assertEqual(self.client.get('/api/v1/auth/users/me/').status_code, 401)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.tokens["token"]}')
+        self.assertEqual(self.client.get('/api/v1/auth/users/me/').status_code, 200)
@@ -0,0 +1,84 @@
+"""
+Short-lived signed access tokens.
+
+An access token is the HMAC-signed (``django.core.signing``) payload
+``{'u': user id, 'r': role, 'a': is active, 'j': token id, 'i': issued at (ms),
+'e': expires at}``, so verifying it needs no database round trip. The DRF
+``Token`` row acts as the refresh token that mints new access tokens.
+
+Revocation is a list kept in TOKEN_REVOCATION_CACHE_ALIAS, whose entries
+expire with the tokens they revoke: one entry per logged-out token id, and
+one "not before" timestamp per user whose account changed or was deleted.
+That cache is shared by the workers of a host and never culls entries.
+"""
+import math
+import secrets
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import caches
+
+
+ACCESS_TOKEN_SALT = 'apps.accounts.tokens.access'
+
+
+class InvalidAccessToken(Exception):
+    pass
+
+
+def get_revocation_cache():
+    return caches[settings.TOKEN_REVOCATION_CACHE_ALIAS]
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+def issue_access_token(user):
+    """Return ``(token, expires_in)`` for ``user``"""
+    issued = now_ms()
+    lifetime = settings.ACCESS_TOKEN_LIFETIME
+    payload = {
+        'u': user.pk, 'r': user.role, 'a': user.is_active, 'j': secrets.token_urlsafe(8),
+        'i': issued, 'e': issued // 1000 + lifetime,
+    }
+    return signing.dumps(payload, salt=ACCESS_TOKEN_SALT), lifetime
+
+
+def read_access_token(token):
+    """Return the payload of a valid, unexpired and unrevoked access token"""
+    try:
+        payload = signing.loads(token, salt=ACCESS_TOKEN_SALT)
+    except signing.BadSignature:
+        raise InvalidAccessToken('Invalid access token.')
+    if payload['e'] <= time.time():
+        raise InvalidAccessToken('Access token expired.')
+    if not payload.get('a'):
+        raise InvalidAccessToken('User inactive or deleted.')
+
+    token_key, user_key = revoked_token_key(payload['j']), revoked_user_key(payload['u'])
+    revoked = get_revocation_cache().get_many([token_key, user_key])
+    if token_key in revoked or payload['i'] <= revoked.get(user_key, -1):
+        raise InvalidAccessToken('Access token revoked.')
+    return payload
+
+
+def revoked_token_key(jti):
+    return f'auth:revoked:{jti}'
+
+
+def revoked_user_key(user_id):
+    return f'auth:revoked-user:{user_id}'
+
+
+def revoke_access_token(payload):
+    """Revoke one access token until it would have expired anyway"""
+    remaining = math.ceil(payload['e'] - time.time())
+    if remaining > 0:
+        get_revocation_cache().set(revoked_token_key(payload['j']), True, timeout=remaining)
+
+
+def revoke_user_access_tokens(user):
+    """Revoke every access token issued to ``user`` up to now"""
+    get_revocation_cache().set(revoked_user_key(user.pk), now_ms(), timeout=settings.ACCESS_TOKEN_LIFETIME + 1)
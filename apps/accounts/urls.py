@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import UserViewSet, register, login, logout
+from .views import UserViewSet, register, login, logout, refresh_token, token_cache_stats_view
 
 router = DefaultRouter()
 router.register(r'users', UserViewSet, basename='user')
@@ -9,5 +9,7 @@ urlpatterns = [
     path('register/', register, name='register'),
     path('login/', login, name='login'),
     path('logout/', logout, name='logout'),
+    path('token/refresh/', refresh_token, name='token-refresh'),
+    path('token-cache-stats/', token_cache_stats_view, name='token-cache-stats'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
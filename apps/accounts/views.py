@@ -2,16 +2,22 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from django.conf import settings
 from django.contrib.auth import authenticate
 from drf_spectacular.utils import extend_schema, extend_schema_view
+from apps.core.asyncviews import AsyncActionsMixin
+from apps.core.schema import SPARSE_FIELDSET_PARAMETERS
+from .authentication import SignedAccessTokenAuthentication, token_cache_stats
 from .models import User
 from .serializers import (
     UserSerializer,
     UserDetailSerializer,
     UserRegistrationSerializer,
-    LoginSerializer
+    LoginSerializer,
+    TokenRefreshSerializer,
 )
+from .tokens import issue_access_token, revoke_access_token
 
 
 @extend_schema(
@@ -36,15 +42,28 @@ def register(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+def access_token_response(token):
+    """Access/refresh pair for a refresh token (the DRF Token row)"""
+    access, expires_in = issue_access_token(token.user)
+    return {'access': access, 'refresh': token.key, 'expires_in': expires_in}
+
+
 @extend_schema(
     summary="User login",
-    description="Login with username and password to receive an authentication token.",
+    description=(
+        "Login with username and password to receive an authentication token. "
+        "With SIGNED_ACCESS_TOKENS enabled the response also carries a short-lived access token "
+        "for `Authorization: Bearer <access>` and the refresh token that renews it."
+    ),
     request=LoginSerializer,
     responses={
         200: {
             'type': 'object',
             'properties': {
                 'token': {'type': 'string'},
+                'access': {'type': 'string'},
+                'refresh': {'type': 'string'},
+                'expires_in': {'type': 'integer'},
                 'user': {'type': 'object'}
             }
         }
@@ -63,10 +82,11 @@ def login(request):
         )
         if user:
             token, _ = Token.objects.get_or_create(user=user)
-            return Response({
-                'token': token.key,
-                'user': UserDetailSerializer(user).data
-            })
+            data = {'token': token.key}
+            if settings.SIGNED_ACCESS_TOKENS:
+                data.update(access_token_response(token))
+            data['user'] = UserDetailSerializer(user).data
+            return Response(data)
         return Response(
             {'error': 'Invalid credentials'},
             status=status.HTTP_401_UNAUTHORIZED
@@ -74,9 +94,39 @@ def login(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@extend_schema(
+    summary="Refresh access token",
+    description="Exchange a refresh token for a new short-lived access token.",
+    request=TokenRefreshSerializer,
+    responses={
+        200: {
+            'type': 'object',
+            'properties': {
+                'access': {'type': 'string'},
+                'refresh': {'type': 'string'},
+                'expires_in': {'type': 'integer'},
+            }
+        }
+    },
+    tags=['Authentication'],
+)
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def refresh_token(request):
+    """Issue a new access token"""
+    if not settings.SIGNED_ACCESS_TOKENS:
+        return Response({'error': 'Signed access tokens are disabled'}, status=status.HTTP_404_NOT_FOUND)
+    serializer = TokenRefreshSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    token = Token.objects.select_related('user').filter(key=serializer.validated_data['refresh']).first()
+    if token is None or not token.user.is_active:
+        return Response({'error': 'Invalid refresh token'}, status=status.HTTP_401_UNAUTHORIZED)
+    return Response(access_token_response(token))
+
+
 @extend_schema(
     summary="User logout",
-    description="Logout and delete the authentication token.",
+    description="Logout, delete the authentication token and revoke the access token used.",
     request=None,
     responses={200: {'description': 'Successfully logged out'}},
     tags=['Authentication'],
@@ -85,28 +135,57 @@ def login(request):
 @permission_classes([IsAuthenticated])
 def logout(request):
     """Logout and delete token"""
+    if isinstance(request.successful_authenticator, SignedAccessTokenAuthentication):
+        revoke_access_token(request.auth)
     request.user.auth_token.delete()
     return Response({'message': 'Successfully logged out'})
 
 
+@extend_schema(
+    summary="Token cache statistics",
+    description="Hit/miss counters of the token authentication cache for the worker serving the request.",
+    responses={
+        200: {
+            'type': 'object',
+            'properties': {
+                'hits': {'type': 'integer'},
+                'misses': {'type': 'integer'},
+                'hit_ratio': {'type': 'number', 'nullable': True},
+            }
+        }
+    },
+    tags=['Authentication'],
+)
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def token_cache_stats_view(request):
+    """Token cache hit ratio for this process"""
+    return Response(token_cache_stats.snapshot())
+
+
 @extend_schema_view(
     list=extend_schema(
         summary="List all users",
+        parameters=SPARSE_FIELDSET_PARAMETERS,
         tags=['Users'],
     ),
     retrieve=extend_schema(
         summary="Get user details",
+        parameters=SPARSE_FIELDSET_PARAMETERS,
         tags=['Users'],
     ),
 )
-class UserViewSet(viewsets.ReadOnlyModelViewSet):
+class UserViewSet(AsyncActionsMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for viewing users
     """
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
-    
+
+    def get_queryset(self):
+        return self.get_serializer().optimize_queryset(User.objects.all())
+
     @extend_schema(
         summary="Get current user profile",
         tags=['Users'],
@@ -114,5 +193,16 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['get'])
     def me(self, request):
         """Get current user profile"""
-        serializer = UserDetailSerializer(request.user)
-        return Response(serializer.data)
+        user = request.user
+        if user.get_deferred_fields():
+            # Built from a signed access token; load the whole profile at once
+            user = User.objects.get(pk=user.pk)
+        return Response(UserDetailSerializer(user).data)
+
+    async def ame(self, request):
+        # Token and session users are fully loaded by authentication; only
+        # signed access tokens leave fields deferred
+        user = request.user
+        if user.get_deferred_fields():
+            user = await User.objects.aget(pk=user.pk)
+        return Response(UserDetailSerializer(user).data)
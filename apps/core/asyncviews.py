@@ -0,0 +1,113 @@
+"""
+Coroutine handlers for DRF viewsets under ASGI.
+
+DRF views are synchronous, so under an ASGI server each request occupies
+a worker thread for its whole lifetime, including database waits.
+``AsyncActionsMixin`` lets a viewset implement selected actions as
+``a<action>`` coroutines using Django's async ORM. When
+``ASYNC_READ_VIEWS`` is enabled the router-built view awaits those
+handlers and hands every other action to the regular synchronous view in
+a thread, so URLs, authentication, permissions, content negotiation,
+exception handling and response finalization stay those of the viewset.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from rest_framework import exceptions
+
+
+async def aauthenticate(request):
+    """
+    Async counterpart of ``Request._authenticate``. Authenticators that
+    provide ``aauthenticate`` are awaited, the others run in a thread.
+    """
+    for authenticator in request.authenticators:
+        try:
+            if hasattr(authenticator, 'aauthenticate'):
+                user_auth_tuple = await authenticator.aauthenticate(request)
+            else:
+                user_auth_tuple = await sync_to_async(authenticator.authenticate)(request)
+        except exceptions.APIException:
+            request._not_authenticated()
+            raise
+
+        if user_auth_tuple is not None:
+            request._authenticator = authenticator
+            request.user, request.auth = user_auth_tuple
+            return
+    request._not_authenticated()
+
+
+class AsyncActionsMixin:
+    """Serve the viewset's ``a<action>`` coroutines when ASYNC_READ_VIEWS is on"""
+
+    @classmethod
+    def get_async_actions(cls, actions):
+        return {
+            method: action for method, action in actions.items()
+            if iscoroutinefunction(getattr(cls, f'a{action}', None))
+        }
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        sync_view = super().as_view(actions, **initkwargs)
+        async_actions = cls.get_async_actions(actions or {})
+        if not settings.ASYNC_READ_VIEWS or not async_actions:
+            return sync_view
+
+        run_sync_view = sync_to_async(sync_view)
+
+        async def view(request, *args, **kwargs):
+            action = async_actions.get(request.method.lower())
+            if action is None:
+                return await run_sync_view(request, *args, **kwargs)
+
+            self = cls(**initkwargs)
+            self.action_map = actions
+            self.args = args
+            self.kwargs = kwargs
+            request = self.initialize_request(request, *args, **kwargs)
+            self.request = request
+            self.headers = self.default_response_headers
+            try:
+                await self.ainitial(request, *args, **kwargs)
+                response = await getattr(self, f'a{action}')(request, *args, **kwargs)
+            except Exception as exc:
+                response = self.handle_exception(exc)
+            self.response = self.finalize_response(request, response, *args, **kwargs)
+            return self.response
+
+        view.cls = cls
+        view.initkwargs = initkwargs
+        view.actions = actions
+        view.csrf_exempt = True
+        markcoroutinefunction(view)
+        return view
+
+    async def ainitial(self, request, *args, **kwargs):
+        """``APIView.initial`` with authentication awaited"""
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+        neg = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = neg
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+
+        await aauthenticate(request)
+        self.check_permissions(request)
+        self.check_throttles(request)
+
+    async def aget_object(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, ValidationError, TypeError, ValueError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
@@ -0,0 +1,201 @@
+import hashlib
+
+from django.db import router, transaction
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The resource has been modified since it was last fetched.'
+    default_code = 'precondition_failed'
+
+
+def instance_etag(pk, versions, media_type):
+    """Strong ETag built from the primary key, modification timestamps and rendered media type"""
+    parts = [str(pk), media_type]
+    parts.extend('' if modified is None else str(int(modified.timestamp() * 1_000_000)) for modified in versions)
+    digest = hashlib.sha1('|'.join(parts).encode()).hexdigest()
+    return f'"{pk}-{digest}"'
+
+
+def set_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+class ConditionalRequestMixin:
+    """
+    Conditional GET and optimistic concurrency for model viewsets whose
+    model maintains a modification timestamp (``conditional_field``).
+
+    ``retrieve`` answers ``If-None-Match``/``If-Modified-Since`` with 304
+    before serializing. Its ETag covers the timestamps of the embedded
+    ``conditional_related`` rows and the negotiated media type, so it has to
+    be loaded with those relations. ``list`` builds a weak ETag from ``max(updated_at)``
+    and the row count of the filtered queryset in the same query that the
+    page-number paginator needs for its total; keyset pages are left alone
+    because they deliberately avoid counting. ``update``/``partial_update``
+    honour ``If-Match`` and answer 412 when the row has changed; the row is
+    locked from the check until the update commits, so a concurrent write
+    cannot slip in between.
+
+    Rows are rendered through ``serialize_instance``/``serialize_page`` so
+    viewsets can serve representations from a cache. ``aretrieve`` and
+    ``alist`` are the same handlers for ``AsyncActionsMixin``.
+    """
+    conditional_field = 'updated_at'
+    # Embedded relations whose own ``conditional_field`` versions the representation too
+    conditional_related = ()
+
+    def get_versions(self, instance):
+        versions = [getattr(instance, self.conditional_field)]
+        for name in self.conditional_related:
+            related = getattr(instance, name)
+            versions.append(None if related is None else getattr(related, self.conditional_field))
+        return versions
+
+    def get_validators(self, instance, media_type=None):
+        """``(etag, last_modified)`` of ``instance`` rendered as ``media_type`` (default: the negotiated one)"""
+        versions = self.get_versions(instance)
+        media_type = media_type or self.request.accepted_renderer.media_type
+        modified = max(version for version in versions if version is not None)
+        return instance_etag(instance.pk, versions, media_type), modified
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method in ('PUT', 'PATCH'):
+            queryset = queryset.select_related(*self.conditional_related).select_for_update(of=('self',))
+        return queryset
+
+    def get_object(self):
+        instance = super().get_object()
+        if self.request.method in ('PUT', 'PATCH'):
+            self.check_preconditions(instance)
+        return instance
+
+    def check_preconditions(self, instance):
+        """
+        If-Match passes with the ETag of any rendering of the current version,
+        so clients may write in another media type than they read
+        """
+        if_match = parse_etags(self.request.META.get('HTTP_IF_MATCH', ''))
+        if if_match:
+            etags = {self.get_validators(instance, renderer.media_type)[0] for renderer in self.get_renderers()}
+            if if_match != ['*'] and not etags.intersection(if_match):
+                raise PreconditionFailed()
+            return
+        _, modified = self.get_validators(instance)
+        response = get_conditional_response(self.request, last_modified=int(modified.timestamp()))
+        if response is not None and response.status_code == status.HTTP_412_PRECONDITION_FAILED:
+            raise PreconditionFailed()
+
+    def update(self, request, *args, **kwargs):
+        # The lock taken by get_object holds until the update is written
+        with transaction.atomic(using=router.db_for_write(self.get_queryset().model)):
+            return super().update(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag, modified = self.get_validators(instance)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=int(modified.timestamp())
+        )
+        if response is None:
+            response = Response(self.serialize_instance(instance))
+        return set_validators(response, etag, modified)
+
+    def list(self, request, *args, **kwargs):
+        paginator = self.paginator
+        if paginator is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if paginator.use_keyset(request):
+            page = self.paginate_queryset(queryset)
+            return self.get_paginated_response(self.serialize_page(page))
+
+        aggregate = queryset.order_by().aggregate(
+            modified=Max(self.conditional_field), count=Count('pk')
+        )
+        etag = self.get_list_etag(request, aggregate)
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            return set_validators(response, etag)
+
+        paginator.set_count_hint(aggregate['count'])
+        page = self.paginate_queryset(queryset)
+        return set_validators(self.get_paginated_response(self.serialize_page(page)), etag)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        etag, modified = self.get_validators(instance)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=int(modified.timestamp())
+        )
+        if response is None:
+            response = Response(await self.aserialize_instance(instance))
+        return set_validators(response, etag, modified)
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        paginator = self.paginator
+        if paginator is None:
+            return Response(await self.aserialize_page([row async for row in queryset]))
+        if paginator.use_keyset(request):
+            page = await self.apaginate_queryset(queryset)
+            return self.get_paginated_response(await self.aserialize_page(page))
+
+        aggregate = await queryset.order_by().aaggregate(
+            modified=Max(self.conditional_field), count=Count('pk')
+        )
+        etag = self.get_list_etag(request, aggregate)
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            return set_validators(response, etag)
+
+        paginator.set_count_hint(aggregate['count'])
+        page = await self.apaginate_queryset(queryset)
+        return set_validators(self.get_paginated_response(await self.aserialize_page(page)), etag)
+
+    def serialize_instance(self, instance):
+        return self.get_serializer(instance).data
+
+    def serialize_page(self, page):
+        return self.get_serializer(page, many=True).data
+
+    async def aserialize_instance(self, instance):
+        return self.serialize_instance(instance)
+
+    async def aserialize_page(self, page):
+        return self.serialize_page(page)
+
+    def get_list_etag(self, request, aggregate):
+        modified = aggregate['modified']
+        parts = [
+            request.get_full_path(),
+            request.META.get('HTTP_ACCEPT', ''),
+            modified.isoformat() if modified else '',
+            str(aggregate['count']),
+        ]
+        digest = hashlib.sha1('|'.join(parts).encode()).hexdigest()
+        return f'W/"{digest}"'
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if (
+            self.request.method in ('PUT', 'PATCH')
+            and 200 <= response.status_code < 300
+            and getattr(self, 'updated_instance', None) is not None
+        ):
+            set_validators(response, *self.get_validators(self.updated_instance))
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        self.updated_instance = serializer.instance
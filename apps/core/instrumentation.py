@@ -0,0 +1,69 @@
+"""
+Request instrumentation shared by the timing and metrics middlewares.
+
+``track_queries`` installs one database execute wrapper per request on
+every connection; a middleware further in finds the wrapper already active
+and reads the same counts instead of wrapping the connections again.
+``handler_label`` names the request the same way for logs and metrics:
+``<basename>-<action>`` for viewsets (``ticket-list``, ``ticket-assign``,
+``user-me``) and the URL name for other views (``login``). Unrouted
+requests share the ``unmatched`` label so 404 scans cannot blow up the
+series count.
+"""
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+
+
+UNMATCHED = 'unmatched'
+
+_current_queries = ContextVar('request_queries', default=None)
+
+
+class QueryStats:
+    """Database execute wrapper counting queries and the time spent in them"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+@contextmanager
+def track_queries():
+    """Yield the ``QueryStats`` of the current request, wrapping the connections if nobody has yet"""
+    stats = _current_queries.get()
+    if stats is not None:
+        yield stats
+        return
+    stats = QueryStats()
+    token = _current_queries.set(stats)
+    try:
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(stats))
+            yield stats
+    finally:
+        _current_queries.reset(token)
+
+
+def handler_label(request, view_func):
+    cls = getattr(view_func, 'cls', None)
+    actions = getattr(view_func, 'actions', None)
+    basename = getattr(view_func, 'initkwargs', {}).get('basename')
+    if cls is not None and actions and basename:
+        action = actions.get(request.method.lower(), request.method.lower())
+        return f'{basename}-{action.replace("_", "-")}'
+    match = request.resolver_match
+    if match is not None and match.url_name:
+        return match.url_name
+    return getattr(view_func, '__name__', UNMATCHED)
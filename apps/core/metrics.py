@@ -0,0 +1,117 @@
+"""
+Prometheus metrics for the API.
+
+Requests are labelled by handler (see ``instrumentation.handler_label``)
+and their queries are counted by the execute wrapper that the timing
+middleware shares.
+
+Under gunicorn each worker is a separate process. Setting
+``PROMETHEUS_MULTIPROC_DIR`` before start-up makes prometheus_client keep
+values in mmap'd files in that directory, and ``/metrics`` then sums the
+files of every worker (see ``config/gunicorn.py``).
+"""
+import os
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from .instrumentation import UNMATCHED, handler_label, track_queries
+
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Time spent processing a request',
+    ['handler', 'method'],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'http_requests_in_progress',
+    'Requests currently being processed',
+    multiprocess_mode='livesum',
+)
+RESPONSES = Counter(
+    'http_responses',
+    'Responses by status code',
+    ['handler', 'method', 'status'],
+)
+REQUEST_QUERIES = Histogram(
+    'http_request_db_queries',
+    'Database queries executed per request',
+    ['handler'],
+    buckets=(0, 1, 2, 3, 4, 6, 8, 12, 20, 50, 100, float('inf')),
+)
+
+
+class PrometheusMetricsMiddleware:
+    """Record latency, status and query count for every request"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request.metrics_handler = UNMATCHED
+        started = time.perf_counter()
+        REQUESTS_IN_PROGRESS.inc()
+        try:
+            with track_queries() as queries:
+                response = self.get_response(request)
+        finally:
+            REQUESTS_IN_PROGRESS.dec()
+        return self.observe(request, response, started, queries)
+
+    async def __acall__(self, request):
+        request.metrics_handler = UNMATCHED
+        started = time.perf_counter()
+        REQUESTS_IN_PROGRESS.inc()
+        try:
+            with track_queries() as queries:
+                response = await self.get_response(request)
+        finally:
+            REQUESTS_IN_PROGRESS.dec()
+        return self.observe(request, response, started, queries)
+
+    def observe(self, request, response, started, queries):
+        handler = request.metrics_handler
+        REQUEST_LATENCY.labels(handler, request.method).observe(time.perf_counter() - started)
+        RESPONSES.labels(handler, request.method, str(response.status_code)).inc()
+        REQUEST_QUERIES.labels(handler).observe(queries.count)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.metrics_handler = handler_label(request, view_func)
+
+
+def get_registry():
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def metrics_view(request):
+    """Prometheus text exposition, optionally guarded by ``METRICS_TOKEN``"""
+    token = settings.METRICS_TOKEN
+    if token and not constant_time_compare(
+        request.headers.get('Authorization', ''), f'Bearer {token}'
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,307 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.core import signing
+from django.core.paginator import InvalidPage, Paginator as DjangoPaginator
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def approximate_count(queryset):
+    """
+    Estimate the number of rows in ``queryset`` from planner statistics.
+    Backends without usable statistics fall back to an exact COUNT(*).
+    """
+    queryset = queryset.order_by()
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+
+    with connection.cursor() as cursor:
+        # Unmanaged models may be views, whose reltuples is 0 before PostgreSQL 14
+        if not queryset.query.where and queryset.model._meta.managed:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table],
+            )
+        else:
+            sql, params = queryset.query.sql_with_params()
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        row = cursor.fetchone()
+
+    if row is None:
+        return queryset.count()
+    estimate = row[0]
+    if isinstance(estimate, str):
+        estimate = json.loads(estimate)
+    if isinstance(estimate, list):
+        estimate = estimate[0]['Plan']['Plan Rows']
+    # reltuples is -1 for tables that have never been analyzed
+    if estimate < 0:
+        return queryset.count()
+    return int(estimate)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset pagination over a unique, descending ordering.
+    Pages are fetched with the expansion ``a < x OR (a = x AND b < y)`` of
+    the row-value comparison ``(a, b) < (x, y)`` instead of OFFSET, and no
+    COUNT(*) is run unless ``?count=approx`` is requested. The ordering
+    replaces any ordering of the queryset, such as search relevance.
+    """
+    ordering = ('created_at', 'id')
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    cursor_salt = 'apps.core.pagination.KeysetPagination'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.setup(queryset, request):
+            return None
+        if self.wants_count(request):
+            self.count = approximate_count(queryset)
+        return self.set_page(list(self.get_page_queryset(queryset)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        if not self.setup(queryset, request):
+            return None
+        if self.wants_count(request):
+            self.count = await sync_to_async(approximate_count)(queryset)
+        return self.set_page([row async for row in self.get_page_queryset(queryset)])
+
+    def setup(self, queryset, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return False
+        self.position, self.reverse = self.decode_cursor(request)
+        self.count = None
+        return True
+
+    def wants_count(self, request):
+        return request.query_params.get(self.count_query_param) == 'approx'
+
+    def get_page_queryset(self, queryset):
+        """One row past the page, so the next page's existence is known without counting"""
+        if self.position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(self.position))
+        direction = '' if self.reverse else '-'
+        queryset = queryset.order_by(*[f'{direction}{field}' for field in self.ordering])
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+            self.has_next = self.position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        return self.page_size
+
+    def get_keyset_filter(self, position):
+        """``(a, b) < (x, y)`` expanded to ``a < x OR (a = x AND b < y)``, as a Q object"""
+        lookup = 'gt' if self.reverse else 'lt'
+        keyset_filter = Q()
+        equal = {}
+        for field, value in zip(self.ordering, position):
+            keyset_filter |= Q(**equal, **{f'{field}__{lookup}': value})
+            equal[field] = value
+        return keyset_filter
+
+    def get_position(self, instance):
+        return [
+            self.model._meta.get_field(field).value_to_string(instance)
+            for field in self.ordering
+        ]
+
+    def encode_cursor(self, instance, reverse):
+        payload = {'p': self.get_position(instance)}
+        if reverse:
+            payload['r'] = 1
+        cursor = signing.dumps(payload, salt=self.cursor_salt)
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = signing.loads(encoded, salt=self.cursor_salt)
+            raw_position = payload['p']
+            if len(raw_position) != len(self.ordering):
+                raise ValueError
+            position = [
+                self.model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.ordering, raw_position)
+            ]
+        except (signing.BadSignature, ValidationError, KeyError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, bool(payload.get('r'))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.count is not None:
+            payload = {'count': self.count, **payload}
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {
+                    'type': 'integer',
+                    'description': 'Approximate total, only present with count=approx',
+                },
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Opaque keyset cursor taken from a next/previous link.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.count_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Set to "approx" to include a planner-estimated total.',
+                'schema': {'type': 'string', 'enum': ['approx']},
+            },
+        ]
+
+
+class CountHintPageNumberPagination(PageNumberPagination):
+    """Page-number pagination that can reuse a total the caller already computed"""
+    count_hint = None
+
+    def django_paginator_class(self, object_list, per_page):
+        paginator = DjangoPaginator(object_list, per_page)
+        if self.count_hint is not None:
+            # Overrides the cached_property so no COUNT(*) is issued
+            paginator.count = self.count_hint
+        return paginator
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` with the count and the page fetched through the async ORM"""
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        if self.count_hint is None:
+            paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.page.object_list = [row async for row in self.page.object_list]
+        return list(self.page)
+
+
+class PageNumberOrKeysetPagination(BasePagination):
+    """
+    Page-number pagination by default.
+    Clients opt in to keyset pagination with ``?pagination=cursor`` or by
+    following a ``cursor`` link.
+    """
+    mode_query_param = 'pagination'
+    page_number_class = CountHintPageNumberPagination
+    keyset_class = KeysetPagination
+
+    def __init__(self):
+        self.page_number = self.page_number_class()
+        self.keyset = self.keyset_class()
+        self.active = self.page_number
+
+    def use_keyset(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.keyset.cursor_query_param in request.query_params
+        )
+
+    def set_count_hint(self, count):
+        self.page_number.count_hint = count
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.active = self.keyset if self.use_keyset(request) else self.page_number
+        return self.active.paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.active = self.keyset if self.use_keyset(request) else self.page_number
+        return await self.active.apaginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.active.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.page_number.get_paginated_response_schema(schema)
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.active, 'display_page_controls', False)
+
+    def to_html(self):
+        return self.active.to_html()
+
+    def get_results(self, data):
+        return data['results']
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *self.page_number.get_schema_operation_parameters(view),
+            {
+                'name': self.mode_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Set to "cursor" for keyset pagination without a total count.',
+                'schema': {'type': 'string', 'enum': ['cursor']},
+            },
+            *self.keyset.get_schema_operation_parameters(view),
+        ]
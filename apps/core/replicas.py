@@ -0,0 +1,119 @@
+"""
+Read replicas with read-your-writes pinning.
+
+``ReplicaRoutingMiddleware`` picks one of ``REPLICA_DATABASES`` for each
+GET/HEAD/OPTIONS request and ``ReplicaRouter`` sends that request's reads
+there; everything else, including work outside a request (management
+commands, the outbox worker), reads and writes ``PRIMARY_DATABASE``.
+
+Replicas lag behind the primary, so after a write the client's reads stay
+on the primary for ``PRIMARY_PIN_SECONDS``. The deadline is handed back in
+a cookie for browsers and in the ``X-Primary-Pin`` response header for API
+clients, which echo it in the request header of the same name. A client
+can only use it to route its own reads to the primary, so it is not signed,
+but deadlines further out than the window are ignored.
+"""
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+
+PIN_COOKIE = 'primary_pin'
+PIN_HEADER = 'X-Primary-Pin'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Replica alias serving the reads of the current request, None for the primary
+_read_database = ContextVar('read_database', default=None)
+
+
+class ReplicaRouter:
+    """Reads go to the replica chosen for the request, writes and migrations to the primary"""
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db == settings.PRIMARY_DATABASE:
+            # Related lookups from a row read on the primary stay consistent with it
+            return settings.PRIMARY_DATABASE
+        return _read_database.get() or settings.PRIMARY_DATABASE
+
+    def db_for_write(self, model, **hints):
+        return settings.PRIMARY_DATABASE
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {settings.PRIMARY_DATABASE, *settings.REPLICA_DATABASES}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.REPLICA_DATABASES:
+            return False
+        return None
+
+
+def pinned_until(request):
+    """The client's primary pin deadline, or None when it is absent, expired or implausible"""
+    now = time.time()
+    for value in (request.headers.get(PIN_HEADER), request.COOKIES.get(PIN_COOKIE)):
+        try:
+            deadline = float(value)
+        except (TypeError, ValueError):
+            continue
+        if now < deadline <= now + settings.PRIMARY_PIN_SECONDS + 1:
+            return deadline
+    return None
+
+
+def choose_read_database(request):
+    if not settings.REPLICA_DATABASES or request.method not in SAFE_METHODS:
+        return None
+    if pinned_until(request) is not None:
+        return None
+    return random.choice(settings.REPLICA_DATABASES)
+
+
+def pin_to_primary(response):
+    deadline = time.time() + settings.PRIMARY_PIN_SECONDS
+    response[PIN_HEADER] = f'{deadline:.3f}'
+    response.set_cookie(
+        PIN_COOKIE, f'{deadline:.3f}', max_age=settings.PRIMARY_PIN_SECONDS,
+        httponly=True, samesite='Lax', secure=settings.SESSION_COOKIE_SECURE,
+    )
+
+
+class ReplicaRoutingMiddleware:
+    """Route safe requests' reads to a replica; pin clients to the primary after a write"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _read_database.set(choose_read_database(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_database.reset(token)
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        token = _read_database.set(choose_read_database(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_database.reset(token)
+        return self.finish(request, response)
+
+    def finish(self, request, response):
+        if settings.REPLICA_DATABASES and request.method not in SAFE_METHODS:
+            pin_to_primary(response)
+        return response
@@ -0,0 +1,21 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+
+
+SPARSE_FIELDSET_PARAMETERS = [
+    OpenApiParameter(
+        name='fields',
+        type=OpenApiTypes.STR,
+        location=OpenApiParameter.QUERY,
+        description='Comma-separated list of fields to return, e.g. id,title,status,priority',
+    ),
+    OpenApiParameter(
+        name='expand',
+        type=OpenApiTypes.STR,
+        location=OpenApiParameter.QUERY,
+        description=(
+            'Comma-separated list of nested objects or large text fields to include. '
+            'List views return related users as ids and omit large text fields unless expanded.'
+        ),
+    ),
+]
@@ -0,0 +1,116 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+from .timing import measure
+
+
+class SparseFieldsetMixin:
+    """
+    Lets clients choose fields with ``?fields=`` and nested objects with ``?expand=``.
+
+    ``Meta.expandable_fields`` names nested serializers that are rendered as
+    primary keys on list views unless expanded. ``Meta.list_excluded_fields``
+    names heavy fields that list views only return when requested.
+    Detail views keep the full, expanded representation by default.
+    """
+    fields_query_param = 'fields'
+    expand_query_param = 'expand'
+
+    def get_query_list(self, param):
+        request = self.context.get('request')
+        if request is None or param not in request.query_params:
+            return None
+        raw = request.query_params.get(param, '')
+        return {name.strip() for name in raw.split(',') if name.strip()}
+
+    def is_root_serializer(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def is_list_view(self):
+        view = self.context.get('view')
+        return getattr(view, 'detail', True) is False
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.is_root_serializer():
+            return fields
+
+        meta = self.Meta
+        expandable = getattr(meta, 'expandable_fields', [])
+        list_excluded = getattr(meta, 'list_excluded_fields', [])
+        requested = self.get_query_list(self.fields_query_param)
+        expand = self.get_query_list(self.expand_query_param)
+        if expand is None:
+            expand = set() if self.is_list_view() else set(expandable) | set(list_excluded)
+
+        for name in expandable:
+            if name in fields and name not in expand:
+                fields[name] = serializers.PrimaryKeyRelatedField(read_only=True)
+
+        if requested is not None:
+            return {name: field for name, field in fields.items() if name in requested}
+        if self.is_list_view():
+            for name in list_excluded:
+                if name not in expand:
+                    fields.pop(name, None)
+        return fields
+
+    def project(self, data):
+        """
+        Reduce a full, expanded representation (as rendered without a request)
+        to the fields and expansions this serializer would render.
+        """
+        projected = {}
+        for name, field in self.fields.items():
+            value = data.get(name)
+            if isinstance(field, serializers.PrimaryKeyRelatedField) and isinstance(value, dict):
+                value = value.get('id')
+            projected[name] = value
+        return projected
+
+    def optimize_queryset(self, queryset, extra_fields=()):
+        """
+        Defer every column this serializer will not render and join the
+        nested serializers it will, so one query loads the whole page.
+        """
+        opts = queryset.model._meta
+        only = {opts.pk.name, *extra_fields}
+        related = []
+        for field in self.fields.values():
+            try:
+                model_field = opts.get_field(field.source.split('.')[0])
+            except FieldDoesNotExist:
+                continue
+            if not model_field.concrete:
+                continue
+            only.add(model_field.name)
+            if model_field.is_relation and isinstance(field, serializers.BaseSerializer):
+                related.append(model_field.name)
+                related_opts = model_field.related_model._meta
+                only.add(f'{model_field.name}__{related_opts.pk.name}')
+                for child in field.fields.values():
+                    try:
+                        child_field = related_opts.get_field(child.source.split('.')[0])
+                    except FieldDoesNotExist:
+                        continue
+                    if child_field.concrete:
+                        only.add(f'{model_field.name}__{child_field.name}')
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*only)
+
+
+class TimedRepresentationMixin:
+    """Record the time spent rendering root representations as the ``serialize`` phase"""
+
+    def to_representation(self, instance):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        if parent is not None:
+            return super().to_representation(instance)
+        with measure('serialize'):
+            return super().to_representation(instance)
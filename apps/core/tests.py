@@ -1,3 +1,244 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
 
-# Create your tests here.
+import msgpack
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connections
+from django.test import TestCase, override_settings
+from prometheus_client import REGISTRY
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.tickets.models import Ticket
+from .replicas import PIN_COOKIE, PIN_HEADER, ReplicaRouter
+
+
+class ServerTimingTests(TestCase):
+    """Server-Timing header and structured timing logs"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='password123')
+        token = Token.objects.create(user=self.user)
+        Ticket.objects.create(title='Ticket', description='d', content='c', created_by=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def metrics(self, response):
+        return {metric.split(';')[0].strip(): metric for metric in response['Server-Timing'].split(',')}
+
+    def test_header_and_log_line(self):
+        with self.assertLogs('apps.timing', 'INFO') as logs:
+            response = self.client.get('/api/v1/tickets/')
+        metrics = self.metrics(response)
+        self.assertTrue({'total', 'db', 'auth', 'serialize', 'render'} <= set(metrics))
+
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record['action'], 'ticket-list')
+        self.assertEqual(record['status'], 200)
+        self.assertIn(f'desc="{record["queries"]} queries"', metrics['db'])
+
+    def test_function_views_and_extra_actions_are_labelled(self):
+        with self.assertLogs('apps.timing', 'INFO') as logs:
+            self.client.post('/api/v1/auth/login/', {'username': 'alice', 'password': 'password123'})
+            self.client.get('/api/v1/tickets/my_tickets/')
+        actions = [json.loads(record.getMessage())['action'] for record in logs.records]
+        self.assertEqual(actions, ['login', 'ticket-my-tickets'])
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_not_timed(self):
+        response = self.client.get('/api/v1/tickets/')
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    @override_settings(SERVER_TIMING_HEADER=False)
+    def test_header_can_be_kept_internal(self):
+        with self.assertLogs('apps.timing', 'INFO'):
+            response = self.client.get('/api/v1/tickets/')
+        self.assertFalse(response.has_header('Server-Timing'))
+
+
+class PrometheusMetricsTests(TestCase):
+    """/metrics exposition and per-handler labels"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_requests_are_labelled_by_viewset_action(self):
+        before = self.sample('http_responses_total', handler='ticket-my-tickets', method='GET', status='200')
+        queries_before = self.sample('http_request_db_queries_count', handler='user-me')
+        self.client.get('/api/v1/tickets/my_tickets/')
+        self.client.get('/api/v1/auth/users/me/')
+
+        self.assertEqual(
+            self.sample('http_responses_total', handler='ticket-my-tickets', method='GET', status='200'),
+            before + 1,
+        )
+        self.assertEqual(self.sample('http_request_db_queries_count', handler='user-me'), queries_before + 1)
+
+        body = self.client.get('/metrics').content.decode()
+        self.assertIn('http_request_duration_seconds_bucket{handler="ticket-my-tickets",le="0.005",method="GET"}', body)
+        self.assertIn('http_requests_in_progress', body)
+
+    def test_unrouted_requests_share_one_label(self):
+        self.client.get('/no/such/page/')
+        self.assertGreater(
+            self.sample('http_responses_total', handler='unmatched', method='GET', status='404'), 0
+        )
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+
+
+class RendererTests(TestCase):
+    """orjson and MessagePack renderers match the stock JSON output"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='password123')
+        self.ticket = Ticket.objects.create(
+            title='Caf\u00e9 \u2028 line', description='d', content='c', created_by=self.user,
+            assigned_to=self.user, priority='high',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_orjson_output_matches_json_renderer(self):
+        for path in ['/api/v1/tickets/0/', '/api/v1/tickets/', f'/api/v1/tickets/{self.ticket.pk}/']:
+            response = self.client.get(path)
+            expected = JSONRenderer().render(response.data, 'application/json')
+            self.assertEqual(response.content, expected, path)
+        self.assertIn('Café \\u2028 line'.encode(), response.content)
+
+    def test_indent_falls_back_to_json_renderer(self):
+        response = self.client.get('/api/v1/tickets/', HTTP_ACCEPT='application/json; indent=2')
+        self.assertTrue(response.content.startswith(b'{\n  "count"'))
+
+    def test_messagepack_round_trip(self):
+        response = self.client.get(f'/api/v1/tickets/{self.ticket.pk}/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        expected = json.loads(self.client.get(f'/api/v1/tickets/{self.ticket.pk}/').content)
+        self.assertEqual(msgpack.unpackb(response.content), expected)
+
+        body = msgpack.packb({'title': 'Packed', 'description': 'Sent as MessagePack', 'priority': 'low'})
+        response = self.client.post('/api/v1/tickets/', body, content_type='application/msgpack')
+        self.assertEqual(response.status_code, 201)
+        response = self.client.post('/api/v1/tickets/', b'\xc1', content_type='application/msgpack')
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_json_body(self):
+        response = self.client.post('/api/v1/tickets/', b'{"title":', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('JSON parse error', response.data['detail'])
+
+
+class SQLiteReplicaHarness:
+    """
+    A primary and a read replica as two SQLite files, registered as extra
+    database aliases and made the PRIMARY_DATABASE / REPLICA_DATABASES.
+    Replication is a file copy: the replica lags until ``replicate()``.
+    """
+    primary = 'harness_primary'
+    replica = 'harness_replica'
+
+    def __enter__(self):
+        self.directory = tempfile.TemporaryDirectory()
+        for alias in (self.primary, self.replica):
+            connections.settings[alias] = {
+                **connections.settings['default'],
+                'NAME': str(Path(self.directory.name) / f'{alias}.sqlite3'),
+                'TEST': {},
+            }
+        self.settings = override_settings(PRIMARY_DATABASE=self.primary, REPLICA_DATABASES=[self.replica])
+        self.settings.enable()
+        call_command('migrate', database=self.primary, verbosity=0)
+        self.replicate()
+        return self
+
+    def replicate(self):
+        connections[self.replica].close()
+        shutil.copyfile(connections.settings[self.primary]['NAME'], connections.settings[self.replica]['NAME'])
+
+    def __exit__(self, *exc_info):
+        self.settings.disable()
+        for alias in (self.primary, self.replica):
+            connections[alias].close()
+            del connections[alias]
+            del connections.settings[alias]
+        self.directory.cleanup()
+
+
+class ReplicaRoutingTests(TestCase):
+    """Safe requests read from a replica unless the client wrote recently"""
+
+    def setUp(self):
+        for alias in ('tickets', 'tokens'):
+            caches[alias].clear()
+        self.harness = SQLiteReplicaHarness().__enter__()
+        self.addCleanup(self.harness.__exit__)
+        self.user = User.objects.create_user(username='alice', password='password123')
+        Ticket.objects.create(title='Replicated', description='d', content='c', created_by=self.user)
+        self.harness.replicate()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def count(self, **headers):
+        return self.client.get('/api/v1/tickets/', **headers).data['count']
+
+    def test_reads_use_the_replica_and_writes_pin_the_primary(self):
+        self.assertEqual(User.objects.db_manager(self.harness.replica).count(), 1)
+        response = self.client.post('/api/v1/tickets/', {'title': 'New', 'description': 'd'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Ticket.objects.using(self.harness.primary).count(), 2)
+        self.assertEqual(Ticket.objects.using(self.harness.replica).count(), 1)
+
+        # The cookie keeps this client on the primary
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertEqual(self.count(), 2)
+        # Other clients still read the lagging replica
+        other = APIClient()
+        other.force_authenticate(self.user)
+        self.assertEqual(other.get('/api/v1/tickets/').data['count'], 1)
+        # Token clients echo the header instead
+        self.assertEqual(other.get('/api/v1/tickets/', HTTP_X_PRIMARY_PIN=response[PIN_HEADER]).data['count'], 2)
+
+        self.harness.replicate()
+        self.assertEqual(other.get('/api/v1/tickets/').data['count'], 2)
+
+    def test_streamed_export_reads_the_replica(self):
+        Ticket.objects.create(title='Unreplicated', description='d', content='c', created_by=self.user)
+        response = self.client.get('/api/v1/tickets/export/')
+        self.assertEqual(response.status_code, 200)
+        rows = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(row)['title'] for row in rows], ['Replicated'])
+
+    def test_expired_or_implausible_pins_are_ignored(self):
+        Ticket.objects.create(title='Unreplicated', description='d', content='c', created_by=self.user)
+        self.assertEqual(self.count(HTTP_X_PRIMARY_PIN=str(time.time() - 1)), 1)
+        self.assertEqual(self.count(HTTP_X_PRIMARY_PIN=str(time.time() + 3600)), 1)
+        self.assertEqual(self.count(HTTP_X_PRIMARY_PIN='soon'), 1)
+        self.assertEqual(self.count(HTTP_X_PRIMARY_PIN=str(time.time() + 2)), 2)
+
+    def test_router_outside_requests(self):
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_read(Ticket), self.harness.primary)
+        self.assertEqual(router.db_for_write(Ticket), self.harness.primary)
+        self.assertFalse(router.allow_migrate(self.harness.replica, 'tickets'))
+        self.assertIsNone(router.allow_migrate(self.harness.primary, 'tickets'))
+
+    def test_no_pin_without_replicas(self):
+        with override_settings(REPLICA_DATABASES=[]):
+            response = self.client.post('/api/v1/tickets/', {'title': 'New', 'description': 'd'})
+        self.assertFalse(response.has_header(PIN_HEADER))
+        self.assertNotIn(PIN_COOKIE, response.cookies)
@@ -0,0 +1,157 @@
+"""
+Per-request timing exposed as ``Server-Timing`` headers and structured logs.
+
+``ServerTimingMiddleware`` reads query count and database time from the
+request's shared execute wrapper, labels the request with its handler
+(``ticket-list``, ``login``, ...) and times rendering. Code deeper
+in the stack adds its own phases with ``measure('serialize')`` and friends;
+the active timing is held in a context variable so no request object has
+to be threaded through. Phases may overlap: queries run while serializing
+are counted in both ``db`` and ``serialize``.
+"""
+import json
+import logging
+import random
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .instrumentation import handler_label, track_queries
+
+
+logger = logging.getLogger('apps.timing')
+
+_current_timing = ContextVar('request_timing', default=None)
+
+
+class RequestTiming:
+    """Durations (in seconds) collected for one request; ``queries`` is its ``QueryStats``"""
+
+    def __init__(self, queries):
+        self.started = time.perf_counter()
+        self.durations = defaultdict(float)
+        self.queries = queries
+        self.action = None
+
+    def add(self, name, seconds):
+        self.durations[name] += seconds
+
+    @property
+    def total(self):
+        return time.perf_counter() - self.started
+
+    def phases(self):
+        if not self.queries.count:
+            return dict(self.durations)
+        return {'db': self.queries.duration, **self.durations}
+
+    def header(self, total):
+        metrics = [f'total;dur={total * 1000:.2f}']
+        for name, seconds in self.phases().items():
+            metric = f'{name};dur={seconds * 1000:.2f}'
+            if name == 'db':
+                metric += f';desc="{self.queries.count} queries"'
+            metrics.append(metric)
+        return ', '.join(metrics)
+
+    def as_log_record(self, request, response, total):
+        return {
+            'event': 'request_timing',
+            'method': request.method,
+            'path': request.path,
+            'action': self.action,
+            'status': response.status_code,
+            'queries': self.queries.count,
+            'total_ms': round(total * 1000, 2),
+            **{f'{name}_ms': round(seconds * 1000, 2) for name, seconds in self.phases().items()},
+        }
+
+
+@contextmanager
+def measure(name):
+    """Add the time spent in the block to phase ``name`` of the current request"""
+    timing = _current_timing.get()
+    if timing is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(name, time.perf_counter() - started)
+
+
+class ServerTimingMiddleware:
+    """
+    Time sampled requests; ``SERVER_TIMING_SAMPLE_RATE`` is the fraction
+    of requests measured and ``SERVER_TIMING_HEADER`` controls whether the
+    header is sent to clients as well as logged.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.is_sampled():
+            return self.get_response(request)
+
+        with track_queries() as queries:
+            timing = RequestTiming(queries)
+            token = _current_timing.set(timing)
+            try:
+                response = self.get_response(request)
+            finally:
+                _current_timing.reset(token)
+        return self.finish(request, response, timing)
+
+    async def __acall__(self, request):
+        if not self.is_sampled():
+            return await self.get_response(request)
+
+        with track_queries() as queries:
+            timing = RequestTiming(queries)
+            token = _current_timing.set(timing)
+            try:
+                response = await self.get_response(request)
+            finally:
+                _current_timing.reset(token)
+        return self.finish(request, response, timing)
+
+    def is_sampled(self):
+        sample_rate = settings.SERVER_TIMING_SAMPLE_RATE
+        return sample_rate >= 1 or (sample_rate > 0 and random.random() < sample_rate)
+
+    def finish(self, request, response, timing):
+        total = timing.total
+        if settings.SERVER_TIMING_HEADER:
+            response['Server-Timing'] = timing.header(total)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(timing.as_log_record(request, response, total)))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timing = _current_timing.get()
+        if timing is not None:
+            timing.action = handler_label(request, view_func)
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after this hook returns
+        timing = _current_timing.get()
+        if timing is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                timing.add('render', time.perf_counter() - started)
+
+            response.add_post_render_callback(rendered)
+        return response
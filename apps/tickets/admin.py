@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import Ticket
+from .search import search_tickets
 
 @admin.register(Ticket)
 class TicketAdmin(admin.ModelAdmin):
@@ -23,3 +24,9 @@ class TicketAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+    def get_search_results(self, request, queryset, search_term):
+        """Use the full-text index instead of ILIKE scans"""
+        if not search_term:
+            return queryset, False
+        return search_tickets(queryset, search_term), False
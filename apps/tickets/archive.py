@@ -0,0 +1,76 @@
+"""
+Archival of long-closed tickets.
+
+Closed tickets whose last update is older than a cutoff are copied into
+``tickets_archive`` and deleted from ``tickets`` in one transaction per
+batch, so the hot table only holds the working set and an interrupted run
+resumes where it stopped. Archived tickets leave the statistics counters
+and the full-text index and get a sync tombstone, but keep their id, so
+``TicketWithArchive`` (a UNION ALL view over both tables) still finds them.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from .live import DELETED, notify
+from .models import ArchivedTicket, Ticket, TicketCounter, TicketTombstone, TicketWithArchive
+from .search import unindex_tickets
+
+
+ARCHIVED_STATUS = 'closed'
+
+COPIED_FIELDS = [field.attname for field in TicketWithArchive._meta.concrete_fields]
+
+
+def archive_cutoff(days=None):
+    if days is None:
+        days = settings.TICKET_ARCHIVE_AFTER_DAYS
+    return timezone.now() - timedelta(days=days)
+
+
+def archivable_tickets(cutoff, using=None):
+    using = using or router.db_for_write(Ticket)
+    return Ticket.objects.using(using).filter(status=ARCHIVED_STATUS, updated_at__lt=cutoff)
+
+
+def archive_batch(cutoff, batch_size, using=None):
+    """Move up to ``batch_size`` archivable tickets; return the number moved"""
+    using = using or router.db_for_write(Ticket)
+    with transaction.atomic(using=using):
+        rows = list(
+            archivable_tickets(cutoff, using).select_for_update()
+            .order_by('pk').values(*COPIED_FIELDS)[:batch_size]
+        )
+        if not rows:
+            return 0
+        pks = [row['id'] for row in rows]
+        archived_at = timezone.now()
+        ArchivedTicket.objects.using(using).bulk_create(
+            [ArchivedTicket(archived_at=archived_at, **row) for row in rows]
+        )
+        TicketCounter.objects.db_manager(using).apply_changes(
+            (Ticket(**row).counted_values(), None) for row in rows
+        )
+        unindex_tickets(pks, using=using)
+        TicketTombstone.objects.using(using).bulk_create(
+            [TicketTombstone(ticket_id=pk, deleted_at=archived_at) for pk in pks]
+        )
+        notify([{'type': DELETED, 'id': pk} for pk in pks], using=using)
+        delete_tickets(pks, using)
+    return len(rows)
+
+
+def delete_tickets(pks, using):
+    """
+    DELETE ``pks`` in one statement. ``QuerySet.delete()`` would send
+    pre/post_delete for each ticket, whose handlers adjust counters, write
+    tombstones and notify one ticket at a time: work archive_batch has
+    already done for the whole batch.
+    """
+    ops = connections[using].ops
+    table, pk_column = ops.quote_name(Ticket._meta.db_table), ops.quote_name(Ticket._meta.pk.column)
+    placeholders = ', '.join(['%s'] * len(pks))
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE {pk_column} IN ({placeholders})', pks)
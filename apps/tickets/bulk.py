@@ -0,0 +1,87 @@
+"""
+Batch writes for tickets.
+
+``bulk_create`` and ``bulk_update`` skip ``Ticket.save`` and the model
+signals, so these helpers apply the same side effects (counters, search
+index, history, outbox, live events) for the whole batch inside one transaction.
+"""
+from django.db import router, transaction
+from django.utils import timezone
+
+from .history import diff_changes, record_changes
+from .live import CREATED, notify, save_event_kind, ticket_event
+from .models import COUNTED_FIELDS, Ticket, TicketCounter
+from .outbox import enqueue_events, ticket_events
+from .search import index_tickets
+
+
+COUNTED_MODEL_FIELDS = {'status', 'priority', 'assigned_to'}
+SEARCH_FIELDS = {'title', 'description', 'content'}
+
+
+def create_tickets(tickets, batch_size=None, using=None):
+    """INSERT ``tickets`` in batches and return them with primary keys set"""
+    using = using or router.db_for_write(Ticket)
+    now = timezone.now()
+    for ticket in tickets:
+        ticket.sync_resolved_at(now)
+    with transaction.atomic(using=using):
+        created = Ticket.objects.using(using).bulk_create(tickets, batch_size=batch_size)
+        TicketCounter.objects.db_manager(using).apply_changes(
+            (None, ticket.counted_values()) for ticket in created
+        )
+        index_tickets(created, using=using)
+        notify([ticket_event(CREATED, ticket) for ticket in created], using=using)
+    return created
+
+
+def update_tickets(tickets, fields, batch_size=None, using=None, changed_by=None):
+    """
+    Write ``fields`` of already-modified ``tickets`` with bulk UPDATEs.
+    The stored values are re-read under row locks so counters move exactly once.
+    """
+    using = using or router.db_for_write(Ticket)
+    fields = set(fields) | {'updated_at'}
+    now = timezone.now()
+    if 'status' in fields:
+        resolved = [ticket.sync_resolved_at(now) for ticket in tickets]
+        if any(resolved):
+            fields.add('resolved_at')
+    with transaction.atomic(using=using):
+        stored = {
+            row['pk']: row
+            for row in Ticket._base_manager.using(using).select_for_update().filter(
+                pk__in=[ticket.pk for ticket in tickets]
+            ).order_by('pk').values('pk', *COUNTED_FIELDS.values())
+        }
+        for ticket in tickets:
+            ticket.updated_at = now
+        Ticket.objects.using(using).bulk_update(tickets, sorted(fields), batch_size=batch_size)
+
+        previous = {}
+        if fields & COUNTED_MODEL_FIELDS:
+            previous = {
+                ticket.pk: {dimension: stored[ticket.pk][attname] for dimension, attname in COUNTED_FIELDS.items()}
+                for ticket in tickets
+                if ticket.pk in stored
+            }
+            TicketCounter.objects.db_manager(using).apply_changes(
+                (previous[ticket.pk], ticket.counted_values()) for ticket in tickets if ticket.pk in previous
+            )
+            record_changes([
+                change
+                for ticket in tickets if ticket.pk in previous
+                for change in diff_changes(ticket, previous[ticket.pk], changed_by)
+            ], using=using)
+            enqueue_events([
+                event
+                for ticket in tickets if ticket.pk in previous
+                for event in ticket_events(ticket, previous[ticket.pk], changed_by)
+            ], using=using)
+        if fields & SEARCH_FIELDS:
+            index_tickets(tickets, using=using)
+        notify([
+            ticket_event(save_event_kind(ticket, previous.get(ticket.pk), False), ticket)
+            for ticket in tickets if ticket.pk in stored
+        ], using=using)
+    return tickets
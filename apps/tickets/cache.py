@@ -0,0 +1,90 @@
+"""
+Read-through cache of full ticket representations.
+
+Entries are keyed by ticket id, the ticket's ``updated_at`` and the
+``updated_at`` of the users it embeds (creator and assignee). A saved ticket
+or a changed user therefore gets a new key in every worker, and nothing is
+ever served stale without any invalidation; replaced entries just expire.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import OuterRef, Subquery
+
+
+EMBEDDED_USERS = ('created_by', 'assigned_to')
+
+
+def get_ticket_cache():
+    return caches[settings.TICKET_CACHE_ALIAS]
+
+
+def row_queryset(queryset):
+    """
+    Only the columns needed to look rows up in the cache. The users' versions
+    are scalar subqueries rather than joins, so page queries keep their index plans.
+    """
+    versions = {}
+    for name in EMBEDDED_USERS:
+        users = queryset.model._meta.get_field(name).related_model._base_manager
+        versions[f'{name}_updated_at'] = Subquery(
+            users.filter(pk=OuterRef(f'{name}_id')).values('updated_at')[:1]
+        )
+    return queryset.select_related(None).only('id', 'created_at', 'updated_at').annotate(**versions)
+
+
+def embedded_version(ticket, name):
+    # Rows from row_queryset carry the version; loaded tickets the user itself
+    if hasattr(ticket, f'{name}_updated_at'):
+        return getattr(ticket, f'{name}_updated_at')
+    user = getattr(ticket, name)
+    return None if user is None else user.updated_at
+
+
+def version(moment):
+    return '' if moment is None else str(int(moment.timestamp() * 1_000_000))
+
+
+def ticket_cache_key(ticket):
+    """``ticket`` comes from ``row_queryset`` or has its embedded users loaded"""
+    versions = [version(ticket.updated_at), *(version(embedded_version(ticket, name)) for name in EMBEDDED_USERS)]
+    return f"tickets:repr:{ticket.pk}:{':'.join(versions)}"
+
+
+def get_representations(rows, load):
+    """
+    Return full representations for ``rows`` (see ``ticket_cache_key``) in
+    the same order. ``load`` receives the ids that missed
+    the cache and returns ``(instance, data)`` pairs.
+    """
+    keys, cached, missing = lookup_representations(rows)
+    if missing:
+        store_representations(rows, keys, cached, load(missing))
+    return [cached[key] for key in keys if key in cached]
+
+
+async def aget_representations(rows, aload):
+    """``get_representations`` with an awaitable ``aload``"""
+    keys, cached, missing = lookup_representations(rows)
+    if missing:
+        store_representations(rows, keys, cached, await aload(missing))
+    return [cached[key] for key in keys if key in cached]
+
+
+def lookup_representations(rows):
+    keys = [ticket_cache_key(row) for row in rows]
+    cached = get_ticket_cache().get_many(keys)
+    missing = [row.pk for row, key in zip(rows, keys) if key not in cached]
+    return keys, cached, missing
+
+
+def store_representations(rows, keys, cached, loaded):
+    loaded = {instance.pk: (instance, data) for instance, data in loaded}
+    fresh = {}
+    for row, key in zip(rows, keys):
+        if key in cached or row.pk not in loaded:
+            continue
+        instance, data = loaded[row.pk]
+        cached[key] = data
+        # A write between the two queries must not be cached under the old key
+        fresh[ticket_cache_key(instance)] = data
+    get_ticket_cache().set_many(fresh, timeout=settings.TICKET_CACHE_TIMEOUT)
@@ -0,0 +1,151 @@
+"""
+Field-level ticket history, written behind the request.
+
+``Ticket.save`` and ``update_tickets`` already read the stored status,
+priority and assignee under a row lock to maintain the counters, so the
+diff costs no extra query. Changes are handed to the process-wide
+``history_buffer`` when the transaction commits and a background thread
+writes them with batched INSERTs every ``TICKET_HISTORY_FLUSH_INTERVAL``
+seconds, or sooner once ``TICKET_HISTORY_BATCH_SIZE`` changes are pending.
+Changes still buffered when a worker is killed are lost; an interval of 0
+writes them synchronously on commit instead.
+"""
+import atexit
+import logging
+import os
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .models import COUNTED_FIELDS, TicketChange
+
+
+logger = logging.getLogger(__name__)
+
+
+def history_value(value):
+    return None if value is None else str(value)
+
+
+def diff_changes(ticket, previous, changed_by=None, changed_at=None):
+    """``TicketChange`` rows for the history fields that differ from ``previous``"""
+    changed_at = changed_at or ticket.updated_at
+    changes = []
+    for field, attname in COUNTED_FIELDS.items():
+        old, new = history_value(previous[field]), history_value(getattr(ticket, attname))
+        if old != new:
+            changes.append(TicketChange(
+                ticket_id=ticket.pk, field=field, old_value=old, new_value=new,
+                changed_by_id=getattr(changed_by, 'pk', None), changed_at=changed_at,
+            ))
+    return changes
+
+
+def write_changes(changes, using):
+    # All or nothing, so a failed batch can be retried without duplicating rows
+    with transaction.atomic(using=using):
+        TicketChange.objects.using(using).bulk_create(changes, batch_size=settings.TICKET_HISTORY_BATCH_SIZE)
+
+
+class HistoryBuffer:
+    """
+    Pending changes per database, flushed by a daemon thread started on first use.
+    At most ``TICKET_HISTORY_MAX_PENDING`` changes are held per database; a
+    batch that fails ``TICKET_HISTORY_MAX_RETRIES`` flushes in a row is
+    written row by row and the rows that still fail are logged and dropped.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = defaultdict(list)
+        self.failures = defaultdict(int)
+        self.wake = threading.Event()
+        self.thread = None
+        self.pid = None
+
+    def add(self, changes, using):
+        if settings.TICKET_HISTORY_FLUSH_INTERVAL <= 0:
+            write_changes(changes, using)
+            return
+        with self.lock:
+            pending = self.pending[using]
+            pending.extend(changes)
+            overflow = len(pending) - settings.TICKET_HISTORY_MAX_PENDING
+            if overflow > 0:
+                del pending[:overflow]
+            full = len(pending) >= settings.TICKET_HISTORY_BATCH_SIZE
+        if overflow > 0:
+            logger.error('Ticket history buffer full; dropped the %d oldest changes', overflow)
+        self.ensure_thread()
+        if full:
+            self.wake.set()
+
+    def flush(self):
+        """Write every pending change; failed batches are kept for the next flush, up to a limit"""
+        with self.lock:
+            pending, self.pending = self.pending, defaultdict(list)
+        for using, changes in pending.items():
+            try:
+                write_changes(changes, using)
+            except Exception:
+                self.failures[using] += 1
+                if self.failures[using] < settings.TICKET_HISTORY_MAX_RETRIES:
+                    logger.exception('Could not write %d ticket changes; retrying', len(changes))
+                    with self.lock:
+                        self.pending[using][:0] = changes
+                    continue
+                self.write_one_by_one(changes, using)
+            self.failures[using] = 0
+
+    def flush_ticket(self, ticket_id, using):
+        """Write only the pending changes of one ticket, leaving the rest to the thread"""
+        with self.lock:
+            pending = self.pending[using]
+            changes = [change for change in pending if change.ticket_id == ticket_id]
+            if not changes:
+                return
+            pending[:] = [change for change in pending if change.ticket_id != ticket_id]
+        try:
+            write_changes(changes, using)
+        except Exception:
+            logger.exception('Could not write %d changes of ticket %s; left to the next flush', len(changes), ticket_id)
+            with self.lock:
+                self.pending[using][:0] = changes
+
+    def write_one_by_one(self, changes, using):
+        """Isolate the rows that keep a batch from being written"""
+        for change in changes:
+            try:
+                write_changes([change], using)
+            except Exception:
+                logger.exception('Dropping ticket change %s', change)
+
+    def ensure_thread(self):
+        # A forked worker inherits the buffer but not the thread
+        if self.thread is not None and self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.thread is not None and self.pid == os.getpid():
+                return
+            self.pid = os.getpid()
+            self.thread = threading.Thread(target=self.run, name='ticket-history-writer', daemon=True)
+            self.thread.start()
+
+    def run(self):
+        while True:
+            self.wake.wait(settings.TICKET_HISTORY_FLUSH_INTERVAL)
+            self.wake.clear()
+            self.flush()
+            close_old_connections()
+
+
+history_buffer = HistoryBuffer()
+atexit.register(history_buffer.flush)
+
+
+def record_changes(changes, using):
+    """Buffer ``changes`` once the surrounding transaction commits"""
+    if changes:
+        transaction.on_commit(lambda: history_buffer.add(changes, using), using=using)
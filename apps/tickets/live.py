@@ -0,0 +1,287 @@
+"""
+Live ticket events for Server-Sent Events streams.
+
+Each ASGI worker runs one ``TicketEventHub`` per event loop: a single
+listener feeds every open stream of the worker, so the database work does
+not grow with the number of connected tabs. On PostgreSQL the listener
+holds one ``LISTEN`` connection and ticket writes ``pg_notify`` inside
+their transaction, which delivers the event exactly when the change
+commits. Other backends fall back to polling tickets and tombstones by
+``(updated_at, id)`` every ``TICKET_EVENTS_POLL_INTERVAL`` seconds; that
+mode cannot tell assignments from other updates, and a transaction that
+commits later than a poll it predates can be missed. Streams are a
+latency optimisation; clients that must not miss a change catch up with
+the changes action.
+
+Deleted (and archived) tickets are announced by id only and reach every
+stream whatever its filters.
+"""
+import asyncio
+import json
+import logging
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connections, router
+from django.utils import timezone
+
+from .models import Ticket, TicketTombstone
+from .sync import after
+
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'ticket_events'
+
+CREATED = 'ticket.created'
+UPDATED = 'ticket.updated'
+ASSIGNED = 'ticket.assigned'
+DELETED = 'ticket.deleted'
+
+EVENT_FIELDS = ['id', 'status', 'priority', 'created_by', 'assigned_to', 'created_at', 'updated_at']
+
+# Rows read per poll; a busier interval continues on the next poll
+POLL_LIMIT = 1000
+
+
+def ticket_event(kind, ticket):
+    if kind == DELETED:
+        return {'type': DELETED, 'id': ticket.pk}
+    return {
+        'type': kind,
+        'id': ticket.pk,
+        'status': ticket.status,
+        'priority': ticket.priority,
+        'created_by': ticket.created_by_id,
+        'assigned_to': ticket.assigned_to_id,
+        'updated_at': ticket.updated_at.isoformat(),
+    }
+
+
+def save_event_kind(ticket, previous, created):
+    if created:
+        return CREATED
+    if previous is not None and ticket.assigned_to_id is not None and ticket.assigned_to_id != previous['assignee']:
+        return ASSIGNED
+    return UPDATED
+
+
+def notify(events, using):
+    """
+    Publish ``events`` to the listening workers. NOTIFY is transactional, so
+    call this inside the transaction of the change; a no-op without LISTEN support.
+    """
+    if not events or connections[using].vendor != 'postgresql':
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            'SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload',
+            [CHANNEL, [json.dumps(event) for event in events]],
+        )
+
+
+class Subscription:
+    """One stream's queue and filters; ``role`` is matched against ``user_id``"""
+
+    def __init__(self, user_id, role=None, status=None, priority=None):
+        self.queue = asyncio.Queue(maxsize=settings.TICKET_EVENTS_QUEUE_SIZE)
+        self.user_id = user_id
+        self.role = role
+        self.status = status
+        self.priority = priority
+        self.overflowed = False
+
+    def matches(self, event):
+        if event['type'] == DELETED:
+            return True
+        if self.status and event['status'] != self.status:
+            return False
+        if self.priority and event['priority'] != self.priority:
+            return False
+        if self.role == 'created':
+            return event['created_by'] == self.user_id
+        if self.role == 'assigned':
+            return event['assigned_to'] == self.user_id
+        if self.role == 'any':
+            return self.user_id in (event['created_by'], event['assigned_to'])
+        return True
+
+    def put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A stream that cannot keep up is closed; the client reconnects and catches up
+            self.overflowed = True
+
+
+class NotifyListener:
+    """Dedicated psycopg2 connection LISTENing on ``CHANNEL``, read from the event loop"""
+
+    def __init__(self, using):
+        self.using = using
+
+    async def run(self, publish):
+        wrapper = connections[self.using]
+        connection = await sync_to_async(wrapper.get_new_connection, thread_sensitive=False)(
+            wrapper.get_connection_params()
+        )
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f'LISTEN {CHANNEL}')
+            loop = asyncio.get_running_loop()
+            lost = loop.create_future()
+
+            def readable():
+                try:
+                    connection.poll()
+                except Exception as exc:
+                    if not lost.done():
+                        lost.set_exception(exc)
+                    return
+                while connection.notifies:
+                    publish(json.loads(connection.notifies.pop(0).payload))
+
+            loop.add_reader(connection.fileno(), readable)
+            try:
+                await lost
+            finally:
+                loop.remove_reader(connection.fileno())
+        finally:
+            connection.close()
+
+
+class PollingListener:
+    """Reads tickets and tombstones past the last seen ``(updated_at, id)`` positions"""
+
+    def __init__(self, using, interval=None):
+        self.using = using
+        self.interval = interval or settings.TICKET_EVENTS_POLL_INTERVAL
+
+    def start(self):
+        now = timezone.now()
+        return (now, 0), (now, 0)
+
+    def poll(self, position):
+        """Return the events past ``position`` and the position after them"""
+        close_old_connections()
+        tickets_position, tombstones_position = position
+        tickets = list(after(
+            Ticket.objects.using(self.using).only(*EVENT_FIELDS), 'updated_at', tickets_position
+        )[:POLL_LIMIT])
+        tombstones = list(after(
+            TicketTombstone.objects.using(self.using), 'deleted_at', tombstones_position
+        )[:POLL_LIMIT])
+
+        events = [
+            ticket_event(CREATED if ticket.created_at > tickets_position[0] else UPDATED, ticket)
+            for ticket in tickets
+        ]
+        events.extend({'type': DELETED, 'id': tombstone.ticket_id} for tombstone in tombstones)
+        if tickets:
+            tickets_position = (tickets[-1].updated_at, tickets[-1].pk)
+        if tombstones:
+            tombstones_position = (tombstones[-1].deleted_at, tombstones[-1].pk)
+        return events, (tickets_position, tombstones_position)
+
+    async def run(self, publish):
+        position = self.start()
+        poll = sync_to_async(self.poll, thread_sensitive=False)
+        while True:
+            await asyncio.sleep(self.interval)
+            events, position = await poll(position)
+            for event in events:
+                publish(event)
+
+
+def get_listener():
+    primary = router.db_for_write(Ticket)
+    if connections[primary].vendor == 'postgresql':
+        # Notifications are not replicated; listen on the primary
+        return NotifyListener(primary)
+    return PollingListener(router.db_for_read(Ticket))
+
+
+class TicketEventHub:
+    """Fans the events of one listener out to the subscriptions of this event loop"""
+
+    restart_delay = 1.0
+
+    def __init__(self, listener_factory=get_listener):
+        self.listener_factory = listener_factory
+        self.subscriptions = set()
+        self.task = None
+
+    def subscribe(self, subscription):
+        self.subscriptions.add(subscription)
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.listen())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscriptions.discard(subscription)
+        if not self.subscriptions and self.task is not None:
+            # Nobody is listening; stop holding a connection or polling
+            self.task.cancel()
+            self.task = None
+
+    def publish(self, event):
+        for subscription in list(self.subscriptions):
+            if subscription.matches(event):
+                subscription.put(event)
+
+    async def listen(self):
+        while True:
+            try:
+                await self.listener_factory().run(self.publish)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Ticket event listener failed; restarting')
+            await asyncio.sleep(self.restart_delay)
+
+
+_hubs = weakref.WeakKeyDictionary()
+
+
+def get_hub():
+    """The hub of the running event loop, created on first use"""
+    loop = asyncio.get_running_loop()
+    hub = _hubs.get(loop)
+    if hub is None:
+        hub = _hubs[loop] = TicketEventHub()
+    return hub
+
+
+def sse_message(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def event_stream(subscription, hub=None):
+    """
+    SSE body for ``subscription``. Ends after TICKET_EVENTS_MAX_STREAM_SECONDS
+    (Django 4.2 does not notice disconnected clients, so a stream must not
+    outlive them for long) and EventSource reconnects by itself.
+    """
+    hub = hub or get_hub()
+    hub.subscribe(subscription)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.TICKET_EVENTS_MAX_STREAM_SECONDS
+    try:
+        yield f'retry: {settings.TICKET_EVENTS_RETRY_MS}\n\n'
+        while not subscription.overflowed:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(), min(settings.TICKET_EVENTS_HEARTBEAT, remaining)
+                )
+            except asyncio.TimeoutError:
+                if loop.time() < deadline:
+                    yield ': keepalive\n\n'
+                continue
+            yield sse_message(event)
+    finally:
+        hub.unsubscribe(subscription)
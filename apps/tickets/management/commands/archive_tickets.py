@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from apps.tickets.archive import archive_batch, archive_cutoff, archivable_tickets
+
+
+class Command(BaseCommand):
+    help = (
+        "Move closed tickets not updated for --older-than days into the archive "
+        "table. Every batch commits on its own, so the command can be stopped "
+        "and re-run at any time; it continues with the tickets still left."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=None, metavar='DAYS',
+                            help='Defaults to TICKET_ARCHIVE_AFTER_DAYS')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--max-batches', type=int, default=None, help='Stop after this many batches')
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to sleep between batches')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the archivable tickets')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+        if options['older_than'] is not None and options['older_than'] < 0:
+            raise CommandError('--older-than must not be negative.')
+        using = options['database']
+        cutoff = archive_cutoff(options['older_than'])
+
+        if options['dry_run']:
+            count = archivable_tickets(cutoff, using).count()
+            self.stdout.write(f'{count} closed tickets last updated before {cutoff:%Y-%m-%d %H:%M} would be archived')
+            return
+
+        started = time.monotonic()
+        archived = batches = 0
+        while options['max_batches'] is None or batches < options['max_batches']:
+            moved = archive_batch(cutoff, options['batch_size'], using=using)
+            if not moved:
+                break
+            archived += moved
+            batches += 1
+            self.stdout.write(f'{archived} tickets archived')
+            if options['pause']:
+                time.sleep(options['pause'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {archived} tickets in {batches} batches ({time.monotonic() - started:.1f}s)'
+        ))
@@ -0,0 +1,186 @@
+import json
+import platform
+import random
+import statistics
+import time
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.core.instrumentation import track_queries
+from apps.tickets.models import Ticket
+
+
+SCENARIOS = ['list', 'retrieve', 'my_tickets', 'users', 'create', 'assign', 'login']
+WRITE_SCENARIOS = {'create', 'assign'}
+
+
+def percentile(samples, percent):
+    """Percentile with linear interpolation between closest ranks"""
+    ordered = sorted(samples)
+    if len(ordered) == 1:
+        return ordered[0]
+    position = (len(ordered) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(latencies, queries, elapsed, statuses):
+    return {
+        'requests': len(latencies),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'queries': {
+            'min': min(queries),
+            'max': max(queries),
+            'mean': round(statistics.fmean(queries), 2),
+        },
+        'status_codes': {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the ticket and auth endpoints in-process and record latency "
+        "percentiles, throughput and query counts per scenario as JSON. "
+        "Requests authenticate with the seeded users' API tokens, as clients do. "
+        "Writes made by the create and assign scenarios are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenario', action='append', choices=SCENARIOS, dest='scenarios',
+                            help='Repeat to pick scenarios (default: all)')
+        parser.add_argument('--requests', type=int, default=200, help='Measured requests per scenario')
+        parser.add_argument('--warmup', type=int, default=20, help='Unmeasured requests per scenario')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--username-prefix', default='perf_user_')
+        parser.add_argument('--password', default='benchmark')
+        parser.add_argument('--output', default='benchmark-results.json')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests must be positive.')
+        self.rng = random.Random(options['seed'])
+        self.options = options
+
+        users = list(
+            User.objects.filter(username__startswith=options['username_prefix'])
+            .order_by('pk')[:500]
+        )
+        if not users:
+            raise CommandError('No seeded users found; run seed_perf_data first.')
+        self.users = users
+        self.user_ids = [user.pk for user in users]
+        self.tokens = [Token.objects.get_or_create(user=user)[0].key for user in users]
+        self.ticket_ids = list(Ticket.objects.order_by('-created_at', '-id').values_list('pk', flat=True)[:1000])
+        if not self.ticket_ids:
+            raise CommandError('No tickets found; run seed_perf_data first.')
+
+        host = next((h for h in settings.ALLOWED_HOSTS if h not in ('*', '') and not h.startswith('.')), 'localhost')
+        self.client = APIClient(HTTP_HOST=host)
+
+        results = {}
+        for name in options['scenarios'] or SCENARIOS:
+            results[name] = self.run_scenario(name)
+            summary = results[name]
+            self.stdout.write(
+                f"{name:<11} p50 {summary['p50_ms']:>8.2f}ms  p95 {summary['p95_ms']:>8.2f}ms  "
+                f"p99 {summary['p99_ms']:>8.2f}ms  {summary['throughput_rps']:>8} req/s  "
+                f"queries {summary['queries']['mean']}"
+            )
+
+        report = {
+            'started_at': timezone.now().isoformat(),
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'tickets': Ticket.objects.order_by().count(),
+                'users': User.objects.order_by().count(),
+            },
+            'options': {
+                key: options[key] for key in ('requests', 'warmup', 'seed')
+            },
+            'scenarios': results,
+        }
+        with open(options['output'], 'w') as handle:
+            json.dump(report, handle, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+    def run_scenario(self, name):
+        if name not in WRITE_SCENARIOS:
+            # Reads run in autocommit mode like they do in production
+            return self.measure(name)
+        with transaction.atomic():
+            summary = self.measure(name)
+            transaction.set_rollback(True)
+        return summary
+
+    def measure(self, name):
+        make_request = getattr(self, f'request_{name}')
+        latencies, queries, statuses = [], [], {}
+        for _ in range(self.options['warmup']):
+            make_request()
+        started = time.perf_counter()
+        for _ in range(self.options['requests']):
+            # Counted on every database alias, replicas included
+            with track_queries() as captured:
+                request_started = time.perf_counter()
+                response = make_request()
+                latencies.append(time.perf_counter() - request_started)
+            queries.append(captured.count)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        elapsed = time.perf_counter() - started
+        return summarize(latencies, queries, elapsed, statuses)
+
+    def authenticate(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.rng.choice(self.tokens)}')
+
+    def request_list(self):
+        self.authenticate()
+        return self.client.get('/api/v1/tickets/')
+
+    def request_retrieve(self):
+        self.authenticate()
+        return self.client.get(f'/api/v1/tickets/{self.rng.choice(self.ticket_ids)}/')
+
+    def request_my_tickets(self):
+        self.authenticate()
+        return self.client.get('/api/v1/tickets/my_tickets/')
+
+    def request_users(self):
+        self.authenticate()
+        return self.client.get('/api/v1/auth/users/')
+
+    def request_create(self):
+        self.authenticate()
+        return self.client.post('/api/v1/tickets/', {
+            'title': 'Benchmark ticket',
+            'description': 'Created by benchmark_api',
+            'priority': 'medium',
+        }, format='json')
+
+    def request_assign(self):
+        self.authenticate()
+        return self.client.post(
+            f'/api/v1/tickets/{self.rng.choice(self.ticket_ids)}/assign/',
+            {'user_id': self.rng.choice(self.user_ids)},
+            format='json',
+        )
+
+    def request_login(self):
+        self.client.credentials()
+        return self.client.post('/api/v1/auth/login/', {
+            'username': self.rng.choice(self.users).username,
+            'password': self.options['password'],
+        }, format='json')
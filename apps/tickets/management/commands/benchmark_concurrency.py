@@ -0,0 +1,148 @@
+import asyncio
+import importlib
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import ThreadSensitiveContext
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import AsyncClient, Client, override_settings
+from django.urls import clear_url_caches
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from apps.accounts.models import User
+from apps.tickets.models import Ticket
+
+from .benchmark_api import percentile
+
+
+SCENARIOS = ['list', 'retrieve', 'my_tickets', 'me']
+URL_MODULES = ['apps.tickets.urls', 'apps.accounts.urls']
+
+
+def use_async_views(enabled):
+    """Rebuild the URLconf with ASYNC_READ_VIEWS switched on or off"""
+    with override_settings(ASYNC_READ_VIEWS=enabled):
+        for module in [*URL_MODULES, settings.ROOT_URLCONF]:
+            importlib.reload(importlib.import_module(module))
+    clear_url_caches()
+
+
+def summarize_latencies(latencies, statuses, elapsed):
+    return {
+        'requests': len(latencies),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'status_codes': {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare read endpoint throughput at high concurrency between the sync "
+        "views served through WSGI (one thread per in-flight request) and the "
+        "async views served through ASGI (one event loop). Runs in-process "
+        "against the configured database; results are written as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenario', action='append', choices=SCENARIOS, dest='scenarios',
+                            help='Repeat to pick scenarios (default: all)')
+        parser.add_argument('--concurrency', type=int, default=100)
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per scenario and interface')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--username-prefix', default='perf_user_')
+        parser.add_argument('--output', default='benchmark-concurrency.json')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['requests'] < 1:
+            raise CommandError('--concurrency and --requests must be positive.')
+        users = list(User.objects.filter(username__startswith=options['username_prefix']).order_by('pk')[:50])
+        ticket_ids = list(Ticket.objects.order_by('-created_at', '-id').values_list('pk', flat=True)[:1000])
+        if not users or not ticket_ids:
+            raise CommandError('No seeded data found; run seed_perf_data first.')
+        tokens = [Token.objects.get_or_create(user=user)[0].key for user in users]
+
+        rng = random.Random(options['seed'])
+        paths = {
+            'list': lambda: '/api/v1/tickets/',
+            'retrieve': lambda: f'/api/v1/tickets/{rng.choice(ticket_ids)}/',
+            'my_tickets': lambda: '/api/v1/tickets/my_tickets/',
+            'me': lambda: '/api/v1/auth/users/me/',
+        }
+        results = {'wsgi': {}, 'asgi': {}}
+        # The test clients always send Host: testserver
+        allow_test_host = override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'])
+        allow_test_host.enable()
+        try:
+            for name in options['scenarios'] or SCENARIOS:
+                requests = [
+                    (paths[name](), f'Token {rng.choice(tokens)}') for _ in range(options['requests'])
+                ]
+                use_async_views(False)
+                results['wsgi'][name] = self.run_wsgi(requests, options['concurrency'])
+                use_async_views(True)
+                results['asgi'][name] = asyncio.run(self.run_asgi(requests, options['concurrency']))
+                for interface in ('wsgi', 'asgi'):
+                    summary = results[interface][name]
+                    self.stdout.write(
+                        f"{name:<11} {interface}  p50 {summary['p50_ms']:>8.2f}ms  "
+                        f"p99 {summary['p99_ms']:>8.2f}ms  {summary['throughput_rps']:>8} req/s"
+                    )
+        finally:
+            allow_test_host.disable()
+            use_async_views(settings.ASYNC_READ_VIEWS)
+
+        report = {
+            'started_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'concurrency': options['concurrency'],
+            'requests': options['requests'],
+            'results': results,
+        }
+        with open(options['output'], 'w') as handle:
+            json.dump(report, handle, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+    def run_wsgi(self, requests, concurrency):
+        def send(request):
+            path, authorization = request
+            started = time.perf_counter()
+            response = Client().get(path, headers={'authorization': authorization})
+            latency = time.perf_counter() - started
+            connections.close_all()
+            return latency, response.status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            outcomes = list(executor.map(send, requests))
+        return self.summarize(outcomes, time.perf_counter() - started)
+
+    async def run_asgi(self, requests, concurrency):
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def send(request):
+            path, authorization = request
+            async with semaphore:
+                # ASGIHandler gives every request its own context for thread-sensitive code
+                async with ThreadSensitiveContext():
+                    started = time.perf_counter()
+                    response = await client.get(path, headers={'authorization': authorization})
+                    return time.perf_counter() - started, response.status_code
+
+        started = time.perf_counter()
+        outcomes = await asyncio.gather(*(send(request) for request in requests))
+        return self.summarize(outcomes, time.perf_counter() - started)
+
+    def summarize(self, outcomes, elapsed):
+        statuses = {}
+        for _, status_code in outcomes:
+            statuses[status_code] = statuses.get(status_code, 0) + 1
+        return summarize_latencies([latency for latency, _ in outcomes], statuses, elapsed)
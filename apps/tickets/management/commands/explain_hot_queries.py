@@ -0,0 +1,149 @@
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.tickets.models import Ticket
+
+
+# (label, path, query params, plan problems tolerated for this request)
+HOT_REQUESTS = [
+    ('ticket-list', '/api/v1/tickets/', {}, ()),
+    ('ticket-list status', '/api/v1/tickets/', {'status': 'open'}, ()),
+    ('ticket-list priority', '/api/v1/tickets/', {'priority': 'high'}, ()),
+    ('ticket-list status+priority', '/api/v1/tickets/', {'status': 'open', 'priority': 'high'}, ()),
+    ('ticket-list closed+priority', '/api/v1/tickets/', {'status': 'closed', 'priority': 'low'}, ()),
+    ('ticket-list cursor', '/api/v1/tickets/', {'pagination': 'cursor'}, ()),
+    ('ticket-list cursor status', '/api/v1/tickets/', {'pagination': 'cursor', 'status': 'open'}, ()),
+    ('ticket-list cursor archived', '/api/v1/tickets/', {'pagination': 'cursor', 'include_archived': '1'}, ()),
+    ('ticket-retrieve', '/api/v1/tickets/{ticket}/', {}, ()),
+    ('ticket-history', '/api/v1/tickets/{ticket}/history/', {}, ()),
+    ('ticket-changes', '/api/v1/tickets/changes/', {}, ()),
+    ('ticket-my-tickets created', '/api/v1/tickets/my_tickets/', {'role': 'created'}, ()),
+    ('ticket-my-tickets assigned', '/api/v1/tickets/my_tickets/', {'role': 'assigned'}, ()),
+    # The UNION of both index scans is bounded by one user's tickets and sorted afterwards
+    ('ticket-my-tickets any', '/api/v1/tickets/my_tickets/', {'role': 'any'}, ('sort',)),
+    ('user-list', '/api/v1/auth/users/', {}, ()),
+    ('user-retrieve', '/api/v1/auth/users/{user}/', {}, ()),
+]
+
+# Plan lines that mean a full table read or a sort, per backend
+PLAN_PROBLEMS = {
+    'postgresql': [
+        ('scan', re.compile(r'\bSeq Scan on (\w+)')),
+        ('sort', re.compile(r'^\s*(?:->\s*)?(?:Incremental )?Sort\b')),
+    ],
+    'sqlite': [
+        ('scan', re.compile(r'\bSCAN (\w+)\b(?! USING)')),
+        ('sort', re.compile(r'USE TEMP B-TREE FOR (?:ORDER BY|RIGHT PART OF ORDER BY)')),
+    ],
+}
+
+EXPLAIN_PREFIX = {'postgresql': 'EXPLAIN', 'sqlite': 'EXPLAIN QUERY PLAN'}
+
+
+class SelectRecorder:
+    """Database execute wrapper that keeps every SELECT with its parameters"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith('SELECT'):
+            self.queries.append((sql, params))
+        return execute(sql, params, many, context)
+
+
+AGGREGATE_QUERY = re.compile(r'^\s*SELECT\s+(?:COUNT|MAX|MIN|SUM|AVG)\(', re.IGNORECASE)
+
+
+def is_aggregate(sql):
+    """Whole-result aggregates (page counts, list validators) have to read every matching row"""
+    return bool(AGGREGATE_QUERY.match(sql))
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay the hot ticket and user endpoints, EXPLAIN every SELECT they run "
+        "and fail when a plan reads a whole table or sorts rows. Run it against "
+        "seeded data (seed_perf_data): on near-empty tables the planner rightly "
+        "prefers sequential scans. Aggregates over a whole list (the page count "
+        "and list validators) are reported but never fail the run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username-prefix', default='perf_user_')
+        parser.add_argument('--no-analyze', action='store_false', dest='analyze',
+                            help='Skip refreshing planner statistics first')
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan')
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        if vendor not in PLAN_PROBLEMS:
+            raise CommandError(f'EXPLAIN parsing is not implemented for {vendor}.')
+
+        user = (
+            User.objects.filter(username__startswith=options['username_prefix'], created_tickets__isnull=False)
+            .order_by('pk').first()
+        )
+        ticket = Ticket.objects.order_by('-created_at', '-id').first()
+        if user is None or ticket is None:
+            raise CommandError('No seeded users or tickets found; run seed_perf_data first.')
+
+        if options['analyze']:
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        host = next((h for h in settings.ALLOWED_HOSTS if h not in ('*', '') and not h.startswith('.')), 'localhost')
+        client = APIClient(HTTP_HOST=host)
+        client.force_authenticate(user)
+
+        failures = 0
+        for label, path, params, tolerated in HOT_REQUESTS:
+            recorder = SelectRecorder()
+            request_failures = 0
+            with connection.execute_wrapper(recorder):
+                response = client.get(path.format(ticket=ticket.pk, user=user.pk), params)
+            if response.status_code != 200:
+                raise CommandError(f'{label}: unexpected status {response.status_code}')
+
+            for sql, query_params in recorder.queries:
+                plan = self.explain(sql, query_params)
+                problems = [
+                    problem for problem in self.find_problems(vendor, plan)
+                    if problem[0] not in tolerated
+                ]
+                failing = problems and not is_aggregate(sql)
+                request_failures += bool(failing)
+                if failing or problems or options['verbose_plans']:
+                    style = self.style.ERROR if failing else self.style.WARNING
+                    self.stdout.write(style(f'{label}: {sql}'))
+                    for line in plan:
+                        self.stdout.write(f'    {line}')
+            if not request_failures:
+                self.stdout.write(f'{label}: {len(recorder.queries)} queries OK')
+            failures += request_failures
+
+        if failures:
+            raise CommandError(f'{failures} queries scan a table or sort rows.')
+        self.stdout.write(self.style.SUCCESS('Every hot query is served by an index.'))
+
+    def explain(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(f'{EXPLAIN_PREFIX[connection.vendor]} {sql}', params)
+            rows = cursor.fetchall()
+        if connection.vendor == 'sqlite':
+            # (id, parent, notused, detail)
+            return [row[-1] for row in rows]
+        return [row[0] for row in rows]
+
+    def find_problems(self, vendor, plan):
+        problems = []
+        for line in plan:
+            for kind, pattern in PLAN_PROBLEMS[vendor]:
+                if pattern.search(line):
+                    problems.append((kind, line))
+        return problems
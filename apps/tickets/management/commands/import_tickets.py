@@ -0,0 +1,157 @@
+import csv
+import json
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from apps.accounts.models import User
+from apps.tickets.bulk import create_tickets
+from apps.tickets.models import Ticket
+from apps.tickets.serializers import TicketImportSerializer
+
+
+def read_jsonl(stream):
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_number, exc
+
+
+def read_csv(stream):
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def normalize_row(row):
+    """Accept rows produced by the export endpoint, which nest users as objects or dotted columns"""
+    row = dict(row)
+    for name in ('created_by', 'assigned_to'):
+        value = row.pop(f'{name}.username', row.get(name))
+        if isinstance(value, dict):
+            value = value.get('username')
+        row[name] = value
+    return row
+
+
+READERS = {'jsonl': read_jsonl, 'csv': read_csv}
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Import tickets from a JSONL or CSV file. Rows name users by username "
+        "(created_by, assigned_to) and are inserted in bulk_create batches, each "
+        "in its own transaction. A checkpoint file records the last committed "
+        "line so --resume continues after a failure."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Input file, or '-' for stdin")
+        parser.add_argument('--format', choices=sorted(READERS), help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--checkpoint', help='Checkpoint file (default: <path>.checkpoint)')
+        parser.add_argument('--resume', action='store_true', help='Skip lines already committed')
+        parser.add_argument('--strict', action='store_true', help='Stop at the first invalid row')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        input_format = options['format'] or Path(path).suffix.lstrip('.').lower()
+        if input_format == 'ndjson':
+            input_format = 'jsonl'
+        if input_format not in READERS:
+            raise CommandError('Cannot infer the input format; pass --format jsonl or --format csv.')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+
+        checkpoint = None
+        if path != '-':
+            checkpoint = Path(options['checkpoint'] or f'{path}.checkpoint')
+        elif options['resume']:
+            raise CommandError('--resume needs a file input.')
+        start_after = 0
+        if options['resume'] and checkpoint.exists():
+            start_after = int(checkpoint.read_text().strip() or 0)
+            self.stdout.write(f'Resuming after line {start_after}')
+
+        using = options['database']
+        user_ids = dict(User.objects.using(using).values_list('username', 'id'))
+
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            self.run_import(
+                READERS[input_format](stream), user_ids, start_after, checkpoint, options
+            )
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+    def run_import(self, rows, user_ids, start_after, checkpoint, options):
+        rows = ((number, row) for number, row in rows if number > start_after)
+        imported = invalid = 0
+        started = time.monotonic()
+
+        for batch in batched(rows, options['batch_size']):
+            tickets = []
+            for line_number, row in batch:
+                ticket = self.build_ticket(line_number, row, user_ids)
+                if ticket is None:
+                    invalid += 1
+                    if options['strict']:
+                        raise CommandError(
+                            f'Invalid row at line {line_number}; lines up to {start_after} were '
+                            f'imported, fix the row and rerun with --resume.'
+                        )
+                    continue
+                tickets.append(ticket)
+
+            create_tickets(tickets, batch_size=options['batch_size'], using=options['database'])
+            imported += len(tickets)
+            start_after = batch[-1][0]
+            if checkpoint is not None:
+                checkpoint.write_text(str(start_after))
+
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f'{imported} rows imported through line {start_after} '
+                f'({imported / elapsed if elapsed else 0:.0f} rows/s)'
+            )
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {imported} tickets, skipped {invalid} invalid rows in {elapsed:.1f}s '
+            f'({imported / elapsed if elapsed else 0:.0f} rows/s)'
+        ))
+
+    def build_ticket(self, line_number, row, user_ids):
+        if isinstance(row, Exception) or not isinstance(row, dict):
+            self.stderr.write(f'Line {line_number}: not a JSON object ({row})')
+            return None
+        serializer = TicketImportSerializer(data=normalize_row(row), context={'user_ids': user_ids})
+        if not serializer.is_valid():
+            self.stderr.write(f'Line {line_number}: {json.dumps(serializer.errors)}')
+            return None
+        attrs = serializer.validated_data
+        return Ticket(
+            title=attrs['title'],
+            description=attrs.get('description', ''),
+            content=attrs.get('content', ''),
+            status=attrs.get('status', 'open'),
+            priority=attrs.get('priority', 'medium'),
+            created_by_id=attrs['created_by'],
+            assigned_to_id=attrs.get('assigned_to'),
+        )
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from apps.tickets.outbox import prune_delivered_events
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete outbox events delivered more than OUTBOX_RETENTION_DAYS ago. "
+        "Pending and failed events are kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        deleted = prune_delivered_events(using=options['database'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} delivered outbox events.'))
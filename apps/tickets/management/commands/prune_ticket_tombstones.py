@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from apps.tickets.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete sync tombstones older than TICKETS_SYNC_TOMBSTONE_DAYS. Sync tokens "
+        "expire with them, so no client can still need the rows removed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones(using=options['database'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} tombstones.'))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from apps.tickets.models import Ticket, TicketCounter
+from apps.tickets.stats import compute_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the ticket statistics counters from the tickets table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        using = options['database']
+        connection = connections[using]
+        with transaction.atomic(using=using):
+            if connection.vendor == 'postgresql':
+                # Block ticket writes so no increment lands between the scan and the swap
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LOCK TABLE {Ticket._meta.db_table} IN SHARE MODE')
+            counters = [
+                TicketCounter(dimension=dimension, bucket=bucket, count=count)
+                for dimension, bucket, count in compute_counters(Ticket.objects.using(using))
+            ]
+            TicketCounter.objects.using(using).all().delete()
+            TicketCounter.objects.using(using).bulk_create(counters)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {len(counters)} ticket counters'))
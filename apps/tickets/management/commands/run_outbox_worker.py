@@ -0,0 +1,53 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, close_old_connections
+
+from apps.tickets.outbox import claim_events, deliver_events, get_backends
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver outbox events (ticket assignments and status changes) through "
+        "OUTBOX_BACKENDS. Several workers can run side by side; each claims its "
+        "own batches. Stops cleanly on SIGTERM/SIGINT after the current batch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to wait when no event is due')
+        parser.add_argument('--once', action='store_true', help='Drain the due events and exit')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+        using = options['database']
+        backends = get_backends()
+        self.stopping = False
+        if not options['once']:
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+        delivered_total = failed_total = 0
+        while not self.stopping:
+            close_old_connections()
+            events = claim_events(options['batch_size'], using=using)
+            if events:
+                delivered, failed = deliver_events(events, backends, using=using)
+                delivered_total += delivered
+                failed_total += failed
+                self.stdout.write(f'{delivered} delivered, {failed} failed')
+                continue
+            if options['once']:
+                break
+            time.sleep(options['poll_interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Outbox worker stopped: {delivered_total} delivered, {failed_total} failed'
+        ))
+
+    def stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,117 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.tickets.bulk import create_tickets
+from apps.tickets.models import Ticket
+
+
+WORDS = (
+    'login error timeout database server page slow crash export report invoice email '
+    'password reset sync mobile upload billing dashboard search permission network '
+    'printer backup release build deploy cache queue payment account profile api'
+).split()
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic users and tickets for performance work. "
+        "Rows are bulk inserted and drawn from a fixed random seed, so two runs "
+        "with the same options produce the same data. Tickets are backdated over "
+        "the last --days days, relative to the time of the run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=2000)
+        parser.add_argument('--tickets', type=int, default=1_000_000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--days', type=int, default=365, help='Spread created_at/updated_at over this many days')
+        parser.add_argument('--username-prefix', default='perf_user_')
+        parser.add_argument('--password', default='benchmark', help='Password shared by every seeded user')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['batch_size'] < 1 or options['days'] < 1:
+            raise CommandError('--users, --batch-size and --days must be positive.')
+        using = options['database']
+        rng = random.Random(options['seed'])
+
+        user_ids = self.seed_users(options, using)
+        started = time.monotonic()
+        created = 0
+        now = timezone.now()
+        tickets = self.generate_tickets(rng, user_ids, options['tickets'], options['batch_size'], now, options['days'])
+        for batch, moments in tickets:
+            create_tickets(batch, using=using)
+            self.backdate(batch, moments, using)
+            created += len(batch)
+            elapsed = time.monotonic() - started
+            self.stdout.write(f'{created}/{options["tickets"]} tickets ({created / elapsed:.0f} rows/s)')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(user_ids)} users and {created} tickets in {time.monotonic() - started:.1f}s'
+        ))
+
+    def seed_users(self, options, using):
+        prefix = options['username_prefix']
+        # Hashing is deliberately slow, so every seeded user shares one hash
+        password = make_password(options['password'])
+        roles = [role for role, _ in User.ROLES_CHOICES]
+        users = [
+            User(
+                username=f'{prefix}{index}',
+                email=f'{prefix}{index}@example.com',
+                password=password,
+                role=roles[index % len(roles)],
+            )
+            for index in range(options['users'])
+        ]
+        User.objects.using(using).bulk_create(users, batch_size=options['batch_size'], ignore_conflicts=True)
+        return list(
+            User.objects.using(using)
+            .filter(username__startswith=prefix)
+            .order_by('pk')
+            .values_list('pk', flat=True)
+        )
+
+    def generate_tickets(self, rng, user_ids, total, batch_size, now, days):
+        """Yield ``(tickets, [(created_at, updated_at), ...])`` batches"""
+        statuses = [status for status, _ in Ticket.STATUS_CHOICES]
+        priorities = [priority for priority, _ in Ticket.PRIORITY_CHOICES]
+        window = timedelta(days=days).total_seconds()
+        batch, moments = [], []
+        for _ in range(total):
+            age = rng.uniform(0, window)
+            created_at = now - timedelta(seconds=age)
+            moments.append((created_at, created_at + timedelta(seconds=rng.uniform(0, age))))
+            batch.append(Ticket(
+                title=' '.join(rng.choices(WORDS, k=rng.randint(3, 8))).capitalize(),
+                description=' '.join(rng.choices(WORDS, k=rng.randint(10, 40))),
+                content=' '.join(rng.choices(WORDS, k=rng.randint(20, 120))),
+                status=rng.choices(statuses, weights=(4, 2, 1, 3))[0],
+                priority=rng.choices(priorities, weights=(2, 5, 3, 1))[0],
+                created_by_id=rng.choice(user_ids),
+                # Roughly a fifth of tickets are unassigned
+                assigned_to_id=rng.choice(user_ids) if rng.random() < 0.8 else None,
+            ))
+            if len(batch) >= batch_size:
+                yield batch, moments
+                batch, moments = [], []
+        if batch:
+            yield batch, moments
+
+    def backdate(self, tickets, moments, using):
+        """Inserts stamp created_at/updated_at with the current time; move them to the generated ones"""
+        for ticket, (created_at, updated_at) in zip(tickets, moments):
+            ticket.created_at = created_at
+            ticket.updated_at = updated_at
+            if ticket.resolved_at is not None:
+                ticket.resolved_at = updated_at
+        Ticket.objects.using(using).bulk_update(tickets, ['created_at', 'updated_at', 'resolved_at'])
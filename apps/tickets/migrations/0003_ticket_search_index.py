@@ -0,0 +1,70 @@
+from django.db import migrations
+
+
+POSTGRES_FORWARD = [
+    "ALTER TABLE tickets ADD COLUMN search_vector tsvector",
+    """
+    CREATE FUNCTION tickets_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(NEW.content, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER tickets_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description, content ON tickets
+    FOR EACH ROW EXECUTE FUNCTION tickets_search_vector_update()
+    """,
+    """
+    UPDATE tickets SET search_vector =
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(content, '')), 'C')
+    """,
+    "CREATE INDEX tickets_search_vector_idx ON tickets USING GIN (search_vector)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS tickets_search_vector_idx",
+    "DROP TRIGGER IF EXISTS tickets_search_vector_trigger ON tickets",
+    "DROP FUNCTION IF EXISTS tickets_search_vector_update()",
+    "ALTER TABLE tickets DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE tickets_fts USING fts5(title, description, content)",
+    "INSERT INTO tickets_fts (rowid, title, description, content) "
+    "SELECT id, title, description, content FROM tickets",
+]
+
+SQLITE_REVERSE = [
+    "DROP TABLE IF EXISTS tickets_fts",
+]
+
+
+def run_for_vendor(postgres, sqlite):
+    def run(apps, schema_editor):
+        statements = {'postgresql': postgres, 'sqlite': sqlite}.get(
+            schema_editor.connection.vendor, []
+        )
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tickets", "0002_alter_ticket_id"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor(POSTGRES_FORWARD, SQLITE_FORWARD),
+            run_for_vendor(POSTGRES_REVERSE, SQLITE_REVERSE),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.30 on 2026-10-18 00:59
+
+from django.db import migrations, models
+
+from apps.tickets.stats import compute_counters
+
+
+def populate_counters(apps, schema_editor):
+    Ticket = apps.get_model("tickets", "Ticket")
+    TicketCounter = apps.get_model("tickets", "TicketCounter")
+    using = schema_editor.connection.alias
+    TicketCounter.objects.using(using).bulk_create(
+        TicketCounter(dimension=dimension, bucket=bucket, count=count)
+        for dimension, bucket, count in compute_counters(Ticket.objects.using(using))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tickets", "0003_ticket_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TicketCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "dimension",
+                    models.CharField(
+                        choices=[
+                            ("status", "Status"),
+                            ("priority", "Priority"),
+                            ("assignee", "Assignee"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "bucket",
+                    models.CharField(
+                        blank=True,
+                        help_text="Field value; assignee user id or '' for unassigned",
+                        max_length=64,
+                    ),
+                ),
+                ("count", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "db_table": "ticket_counters",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="ticketcounter",
+            constraint=models.UniqueConstraint(
+                fields=("dimension", "bucket"),
+                name="ticket_counters_dimension_bucket_uniq",
+            ),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 4.2.30 on 2026-10-18 01:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("tickets", "0004_ticket_counters"),
+    ]
+
+    operations = [
+        # New composite indexes first, so the foreign keys are never left unindexed
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(fields=["created_at", "id"], name="tickets_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                fields=["status", "created_at", "id"], name="tickets_status_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                fields=["priority", "created_at", "id"],
+                name="tickets_priority_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                fields=["created_by", "created_at", "id"],
+                name="tickets_creator_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                fields=["assigned_to", "created_at", "id"],
+                name="tickets_assignee_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                condition=models.Q(("status", "open")),
+                fields=["priority", "created_at", "id"],
+                name="tickets_open_priority_idx",
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="ticket",
+            name="tickets_status_1dbab2_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="ticket",
+            name="tickets_created_b5c671_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="ticket",
+            name="tickets_assigne_cb12f9_idx",
+        ),
+        migrations.AlterField(
+            model_name="ticket",
+            name="assigned_to",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="assigned_tickets",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="ticket",
+            name="created_by",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="created_tickets",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
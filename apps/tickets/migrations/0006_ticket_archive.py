@@ -0,0 +1,153 @@
+# Generated by Django 4.2.30 on 2026-10-18 01:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# The ticket columns, in the same order for both halves of the UNION
+TICKET_COLUMNS = (
+    'id, title, description, status, created_by_id, assigned_to_id, content, '
+    'created_at, updated_at, resolved_at, priority'
+)
+
+CREATE_VIEW = (
+    f'CREATE VIEW tickets_with_archive AS '
+    f'SELECT {TICKET_COLUMNS} FROM tickets '
+    f'UNION ALL SELECT {TICKET_COLUMNS} FROM tickets_archive'
+)
+
+DROP_VIEW = 'DROP VIEW IF EXISTS tickets_with_archive'
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("tickets", "0005_ticket_access_path_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedTicket",
+            fields=[
+                ("title", models.CharField(max_length=200)),
+                ("description", models.TextField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("open", "OPEN"),
+                            ("in_progress", "iN Progress"),
+                            ("resolved", "Resolved"),
+                            ("closed", "Closed"),
+                        ],
+                        default="open",
+                        max_length=20,
+                    ),
+                ),
+                ("content", models.TextField()),
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                ("resolved_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "priority",
+                    models.CharField(
+                        choices=[
+                            ("high", "HIGH"),
+                            ("medium", "Medium"),
+                            ("low", "LOW"),
+                            ("critical", "Critical"),
+                        ],
+                        default="medium",
+                        max_length=20,
+                    ),
+                ),
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "assigned_to",
+                    models.ForeignKey(
+                        blank=True,
+                        db_index=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "tickets_archive",
+                "ordering": ["-created_at"],
+                "abstract": False,
+                "indexes": [
+                    models.Index(
+                        fields=["created_at", "id"], name="tickets_arch_created_idx"
+                    ),
+                    models.Index(
+                        fields=["created_by", "created_at", "id"],
+                        name="tickets_arch_creator_idx",
+                    ),
+                    models.Index(
+                        fields=["assigned_to", "created_at", "id"],
+                        name="tickets_arch_assignee_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="TicketWithArchive",
+            fields=[
+                ("title", models.CharField(max_length=200)),
+                ("description", models.TextField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("open", "OPEN"),
+                            ("in_progress", "iN Progress"),
+                            ("resolved", "Resolved"),
+                            ("closed", "Closed"),
+                        ],
+                        default="open",
+                        max_length=20,
+                    ),
+                ),
+                ("content", models.TextField()),
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                ("resolved_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "priority",
+                    models.CharField(
+                        choices=[
+                            ("high", "HIGH"),
+                            ("medium", "Medium"),
+                            ("low", "LOW"),
+                            ("critical", "Critical"),
+                        ],
+                        default="medium",
+                        max_length=20,
+                    ),
+                ),
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+            ],
+            options={
+                "db_table": "tickets_with_archive",
+                "ordering": ["-created_at"],
+                "abstract": False,
+                "managed": False,
+            },
+        ),
+        migrations.RunSQL(CREATE_VIEW, DROP_VIEW),
+    ]
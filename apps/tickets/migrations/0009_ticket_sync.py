@@ -0,0 +1,44 @@
+# Generated by Django 4.2.30 on 2026-10-18 01:51
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tickets", "0008_outbox_event"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TicketTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("ticket_id", models.BigIntegerField()),
+                ("deleted_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                "db_table": "ticket_tombstones",
+                "ordering": ["deleted_at", "id"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(fields=["updated_at", "id"], name="tickets_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="tickettombstone",
+            index=models.Index(
+                fields=["deleted_at", "id"], name="ticket_tombstones_deleted_idx"
+            ),
+        ),
+    ]
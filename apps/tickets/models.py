@@ -1,5 +1,15 @@
-from django.db import models
+from collections import Counter
+
+from django.db import IntegrityError, models, router, transaction
 from django.conf import settings
+from django.utils import timezone
+
+
+# Ticket fields whose values are counted in TicketCounter and recorded in TicketChange
+COUNTED_FIELDS = {'status': 'status', 'priority': 'priority', 'assignee': 'assigned_to_id'}
+
+# Statuses that stamp resolved_at
+RESOLVED_STATUSES = {'resolved', 'closed'}
 
 
 class Ticket(models.Model):
@@ -23,8 +33,9 @@ class Ticket(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='open')
-    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='created_tickets')
-    assigned_to = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="assigned_tickets")
+    # Indexed through the composite (user, created_at, id) indexes in Meta
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='created_tickets', db_index=False)
+    assigned_to = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="assigned_tickets", db_index=False)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -34,11 +45,289 @@ class Ticket(models.Model):
     class Meta:
         db_table = 'tickets'
         ordering = ['-created_at']
+        # Every list is ordered by (-created_at, -id), so each filter's index ends with
+        # those columns and pages are read in index order without a sort
         indexes = [
-            models.Index(fields=['status', 'priority']),
-            models.Index(fields=['created_by']),
-            models.Index(fields=['assigned_to']),
+            models.Index(fields=['created_at', 'id'], name='tickets_created_idx'),
+            models.Index(fields=['status', 'created_at', 'id'], name='tickets_status_created_idx'),
+            models.Index(fields=['priority', 'created_at', 'id'], name='tickets_priority_created_idx'),
+            models.Index(fields=['created_by', 'created_at', 'id'], name='tickets_creator_created_idx'),
+            models.Index(fields=['assigned_to', 'created_at', 'id'], name='tickets_assignee_created_idx'),
+            # Delta sync (changes action) pages by (updated_at, id)
+            models.Index(fields=['updated_at', 'id'], name='tickets_updated_idx'),
+            # Triage queue (?status=open&priority=...); ignored by backends without partial indexes
+            models.Index(
+                fields=['priority', 'created_at', 'id'],
+                name='tickets_open_priority_idx',
+                condition=models.Q(status='open'),
+            ),
         ]
 
+    # User recorded as the author of the changes made by the next save
+    changed_by = None
+
+    def __str__(self):
+        return f"#{self.pk} - {self.title}"
+
+    def counted_values(self):
+        return {dimension: getattr(self, attname) for dimension, attname in COUNTED_FIELDS.items()}
+
+    def sync_resolved_at(self, now=None):
+        """Stamp resolved_at when the ticket is resolved, clear it when reopened; return True if it changed"""
+        if self.status in RESOLVED_STATUSES:
+            if self.resolved_at is None:
+                self.resolved_at = now or timezone.now()
+                return True
+        elif self.resolved_at is not None:
+            self.resolved_at = None
+            return True
+        return False
+
+    def save(self, *args, **kwargs):
+        """Save and update TicketCounter, the change history, the outbox and live events in the same transaction"""
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        update_fields = kwargs.get('update_fields')
+        if (update_fields is None or 'status' in update_fields) and self.sync_resolved_at():
+            if update_fields is not None:
+                kwargs['update_fields'] = update_fields = [*update_fields, 'resolved_at']
+        counted = update_fields is None or {'status', 'priority', 'assigned_to'} & set(update_fields)
+
+        with transaction.atomic(using=using):
+            previous = None
+            created = self._state.adding
+            if counted and not created and self.pk is not None:
+                # Read the stored values under a row lock so concurrent writes cannot double count
+                previous = type(self)._base_manager.using(using).select_for_update().filter(
+                    pk=self.pk
+                ).order_by().values(*COUNTED_FIELDS.values()).first()
+                if previous is not None:
+                    previous = {
+                        dimension: previous[attname] for dimension, attname in COUNTED_FIELDS.items()
+                    }
+            super().save(*args, **kwargs)
+            if counted:
+                TicketCounter.objects.db_manager(using).apply_change(previous, self.counted_values())
+            if previous is not None:
+                from .history import diff_changes, record_changes
+                from .outbox import enqueue_events, ticket_events
+
+                record_changes(diff_changes(self, previous, self.changed_by), using=using)
+                enqueue_events(ticket_events(self, previous, self.changed_by), using=using)
+            from .live import notify, save_event_kind, ticket_event
+
+            notify([ticket_event(save_event_kind(self, previous, created), self)], using=using)
+
+
+class TicketRecord(models.Model):
+    """Ticket columns shared by the archive table and the combined view; mirrors Ticket"""
+    title = models.CharField(max_length=200)
+    description = models.TextField()
+    status = models.CharField(max_length=20, choices=Ticket.STATUS_CHOICES, default='open')
+    content = models.TextField()
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    priority = models.CharField(max_length=20, choices=Ticket.PRIORITY_CHOICES, default='medium')
+
+    class Meta:
+        abstract = True
+        ordering = ['-created_at']
+
     def __str__(self):
         return f"#{self.pk} - {self.title}"
+
+
+class ArchivedTicket(TicketRecord):
+    """
+    Closed tickets moved out of the tickets table by archive_tickets.
+    Rows keep their ticket id, so ids stay unique across both tables.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+', db_index=False)
+    assigned_to = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', db_index=False)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta(TicketRecord.Meta):
+        db_table = 'tickets_archive'
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='tickets_arch_created_idx'),
+            models.Index(fields=['created_by', 'created_at', 'id'], name='tickets_arch_creator_idx'),
+            models.Index(fields=['assigned_to', 'created_at', 'id'], name='tickets_arch_assignee_idx'),
+        ]
+
+
+class TicketWithArchive(TicketRecord):
+    """
+    Read-only ``tickets`` UNION ALL ``tickets_archive`` view, queried for
+    retrieval by id and ``?include_archived=1`` lists. Migrations that
+    alter the tickets table drop the view first and recreate it after
+    (see migration 0006 for its definition).
+    """
+    id = models.BigIntegerField(primary_key=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, related_name='+', db_constraint=False
+    )
+    assigned_to = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, null=True, blank=True, related_name='+',
+        db_constraint=False,
+    )
+
+    class Meta(TicketRecord.Meta):
+        managed = False
+        db_table = 'tickets_with_archive'
+
+
+class TicketChange(models.Model):
+    """
+    One field-level change of a ticket. ``ticket_id`` is not a foreign key
+    and ``changed_by`` has no constraint, so the history outlives deletion
+    and archival of the ticket and of the user.
+    """
+    FIELD_CHOICES = [
+        ('status', 'Status'),
+        ('priority', 'Priority'),
+        ('assignee', 'Assignee'),
+    ]
+
+    ticket_id = models.BigIntegerField()
+    field = models.CharField(max_length=20, choices=FIELD_CHOICES)
+    old_value = models.CharField(max_length=64, null=True, blank=True)
+    new_value = models.CharField(max_length=64, null=True, blank=True)
+    # No constraint: rows are written behind the request, possibly after the user is gone
+    changed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, db_constraint=False,
+        null=True, blank=True, related_name='+',
+    )
+    changed_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'ticket_changes'
+        ordering = ['-changed_at', '-id']
+        indexes = [
+            models.Index(fields=['ticket_id', 'changed_at', 'id'], name='ticket_changes_ticket_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.ticket_id} {self.field}: {self.old_value} -> {self.new_value}"
+
+
+class TicketTombstone(models.Model):
+    """
+    Id of a ticket that left the tickets table, deleted or archived, kept
+    for TICKETS_SYNC_TOMBSTONE_DAYS so sync clients learn to drop it.
+    """
+    ticket_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'ticket_tombstones'
+        ordering = ['deleted_at', 'id']
+        indexes = [
+            models.Index(fields=['deleted_at', 'id'], name='ticket_tombstones_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.ticket_id} deleted at {self.deleted_at}"
+
+
+class OutboxEvent(models.Model):
+    """
+    Notification written in the same transaction as the ticket change it
+    announces and delivered afterwards by run_outbox_worker.
+    ``available_at`` is both the retry time and the claim lease.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('delivered', 'Delivered'),
+        ('failed', 'Failed'),
+    ]
+
+    topic = models.CharField(max_length=50)
+    payload = models.JSONField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    available_at = models.DateTimeField(default=timezone.now)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'outbox_events'
+        ordering = ['id']
+        indexes = [
+            models.Index(
+                fields=['available_at', 'id'],
+                name='outbox_events_pending_idx',
+                condition=models.Q(status='pending'),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.topic} #{self.pk} ({self.status})"
+
+
+class TicketCounterManager(models.Manager):
+    """Incremental maintenance of TicketCounter rows"""
+
+    @staticmethod
+    def bucket(value):
+        return '' if value is None else str(value)
+
+    def apply_change(self, previous, current):
+        """Move one ticket from the ``previous`` buckets to the ``current`` ones"""
+        self.apply_changes([(previous, current)])
+
+    def apply_changes(self, changes):
+        """Apply many ``(previous, current)`` moves with one UPDATE per bucket"""
+        deltas = Counter()
+        for previous, current in changes:
+            if previous is not None:
+                for dimension, value in previous.items():
+                    deltas[(dimension, self.bucket(value))] -= 1
+            if current is not None:
+                for dimension, value in current.items():
+                    deltas[(dimension, self.bucket(value))] += 1
+        self.apply_deltas(deltas)
+
+    def apply_deltas(self, deltas):
+        """Add ``{(dimension, bucket): delta}`` to the counters"""
+        using = self.db
+        for (dimension, bucket), delta in sorted(deltas.items()):
+            if not delta:
+                continue
+            rows = self.filter(dimension=dimension, bucket=bucket)
+            if rows.update(count=models.F('count') + delta):
+                continue
+            try:
+                with transaction.atomic(using=using):
+                    self.create(dimension=dimension, bucket=bucket, count=delta)
+            except IntegrityError:
+                # Another transaction created the bucket first
+                rows.update(count=models.F('count') + delta)
+
+
+class TicketCounter(models.Model):
+    """
+    Number of tickets per status, priority and assignee.
+    Maintained incrementally on every ticket write; see rebuild_ticket_stats.
+    """
+    DIMENSION_CHOICES = [
+        ('status', 'Status'),
+        ('priority', 'Priority'),
+        ('assignee', 'Assignee'),
+    ]
+
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    bucket = models.CharField(max_length=64, blank=True, help_text="Field value; assignee user id or '' for unassigned")
+    count = models.BigIntegerField(default=0)
+
+    objects = TicketCounterManager()
+
+    class Meta:
+        db_table = 'ticket_counters'
+        constraints = [
+            models.UniqueConstraint(fields=['dimension', 'bucket'], name='ticket_counters_dimension_bucket_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.dimension}={self.bucket or '-'}: {self.count}"
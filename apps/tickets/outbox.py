@@ -0,0 +1,234 @@
+"""
+Transactional outbox for ticket notifications.
+
+Assignment and status changes add ``OutboxEvent`` rows inside the
+transaction that changes the ticket, so an event exists exactly when its
+change was committed and no network I/O happens on the request path.
+``run_outbox_worker`` claims due events in batches, hands each one to
+every backend in ``OUTBOX_BACKENDS`` and retries failures with
+exponential backoff until ``OUTBOX_MAX_ATTEMPTS``. Delivery is at least
+once: backends receive the event id to deduplicate on. The lease is renewed
+before each event is sent, so a slow batch keeps its remaining events, and
+``prune_outbox_events`` deletes delivered rows after ``OUTBOX_RETENTION_DAYS``.
+
+Claiming uses ``SELECT ... FOR UPDATE SKIP LOCKED`` where the backend
+supports it, so several workers never block on or share an event. SQLite
+has no row locks; there each event is claimed with a conditional UPDATE
+and a worker skips the events another one claimed first.
+"""
+import json
+import logging
+import sys
+import urllib.request
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import connections, router, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import OutboxEvent
+
+
+logger = logging.getLogger(__name__)
+
+ASSIGNED = 'ticket.assigned'
+STATUS_CHANGED = 'ticket.status_changed'
+
+
+def ticket_events(ticket, previous, changed_by=None):
+    """Outbox events for the assignee and status changes since ``previous``"""
+    base = {
+        'ticket_id': ticket.pk,
+        'title': ticket.title,
+        'changed_by': getattr(changed_by, 'pk', None),
+    }
+    events = []
+    if ticket.assigned_to_id is not None and ticket.assigned_to_id != previous['assignee']:
+        events.append(OutboxEvent(topic=ASSIGNED, payload={
+            **base,
+            'assigned_to': ticket.assigned_to_id,
+            'previous_assignee': previous['assignee'],
+        }))
+    if ticket.status != previous['status']:
+        events.append(OutboxEvent(topic=STATUS_CHANGED, payload={
+            **base,
+            'old_status': previous['status'],
+            'new_status': ticket.status,
+            'created_by': ticket.created_by_id,
+            'assigned_to': ticket.assigned_to_id,
+        }))
+    return events
+
+
+def enqueue_events(events, using):
+    """Write ``events``; call inside the transaction of the change they describe"""
+    if events:
+        OutboxEvent.objects.using(using).bulk_create(events)
+
+
+def retry_delay(attempts):
+    delay = settings.OUTBOX_RETRY_BASE_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.OUTBOX_RETRY_MAX_DELAY))
+
+
+def lease_deadline():
+    return timezone.now() + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+
+
+def claim_events(batch_size, using=None):
+    """
+    Lease up to ``batch_size`` due events to this worker for
+    ``OUTBOX_LEASE_SECONDS``; a worker that dies mid-batch only delays them.
+    """
+    using = using or router.db_for_write(OutboxEvent)
+    now = timezone.now()
+    lease_until = lease_deadline()
+    due = OutboxEvent.objects.using(using).filter(status='pending', available_at__lte=now).order_by('id')
+
+    with transaction.atomic(using=using):
+        if connections[using].features.has_select_for_update_skip_locked:
+            events = list(due.select_for_update(skip_locked=True)[:batch_size])
+            OutboxEvent.objects.using(using).filter(pk__in=[event.pk for event in events]).update(
+                available_at=lease_until
+            )
+        else:
+            events = [
+                event for event in due[:batch_size]
+                # Lost to a concurrent worker if the row no longer matches
+                if due.filter(pk=event.pk).update(available_at=lease_until)
+            ]
+    for event in events:
+        event.available_at = lease_until
+    return events
+
+
+def renew_lease(event, using):
+    """
+    Extend this worker's lease on ``event``; False when the lease already
+    expired and another worker may have claimed the event since.
+    """
+    lease_until = lease_deadline()
+    renewed = OutboxEvent.objects.using(using).filter(
+        pk=event.pk, status='pending', available_at=event.available_at
+    ).update(available_at=lease_until)
+    if renewed:
+        event.available_at = lease_until
+    return bool(renewed)
+
+
+def get_backends():
+    return [import_string(path)() for path in settings.OUTBOX_BACKENDS]
+
+
+def deliver_events(events, backends, using=None):
+    """Deliver claimed ``events``; return ``(delivered, failed)`` counts"""
+    using = using or router.db_for_write(OutboxEvent)
+    delivered = failed = 0
+    for event in events:
+        if not renew_lease(event, using):
+            logger.warning('Lease on outbox event %s expired before delivery; skipping it', event.pk)
+            continue
+        event.attempts += 1
+        try:
+            for backend in backends:
+                backend.send(event)
+        except Exception as exc:
+            failed += 1
+            event.last_error = f'{type(exc).__name__}: {exc}'
+            if event.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                event.status = 'failed'
+                logger.error('Giving up on outbox event %s after %d attempts', event.pk, event.attempts)
+            else:
+                event.available_at = timezone.now() + retry_delay(event.attempts)
+            event.save(using=using, update_fields=['attempts', 'last_error', 'status', 'available_at'])
+            continue
+        delivered += 1
+        event.status = 'delivered'
+        event.delivered_at = timezone.now()
+        event.last_error = ''
+        event.save(using=using, update_fields=['attempts', 'last_error', 'status', 'delivered_at'])
+    return delivered, failed
+
+
+def retention_cutoff():
+    return timezone.now() - timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+
+
+def prune_delivered_events(using=None):
+    """Delete events delivered before ``OUTBOX_RETENTION_DAYS``; failed events are kept for inspection"""
+    using = using or router.db_for_write(OutboxEvent)
+    deleted, _ = OutboxEvent.objects.using(using).filter(
+        status='delivered', delivered_at__lt=retention_cutoff()
+    ).delete()
+    return deleted
+
+
+def event_message(event):
+    return {
+        'id': event.pk,
+        'topic': event.topic,
+        'created_at': event.created_at.isoformat(),
+        'payload': event.payload,
+    }
+
+
+class ConsoleBackend:
+    """Write each event as a JSON line to stdout"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send(self, event):
+        self.stream.write(json.dumps(event_message(event)) + '\n')
+        self.stream.flush()
+
+
+class FileBackend:
+    """Append each event as a JSON line to ``OUTBOX_FILE_PATH``"""
+
+    def __init__(self, path=None):
+        self.path = path or settings.OUTBOX_FILE_PATH
+
+    def send(self, event):
+        with open(self.path, 'a') as handle:
+            handle.write(json.dumps(event_message(event)) + '\n')
+
+
+class WebhookBackend:
+    """POST each event as JSON to ``OUTBOX_WEBHOOK_URL``; non-2xx responses are retried"""
+
+    def __init__(self, url=None, timeout=None):
+        self.url = url or settings.OUTBOX_WEBHOOK_URL
+        self.timeout = timeout or settings.OUTBOX_WEBHOOK_TIMEOUT
+
+    def send(self, event):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(event_message(event)).encode(),
+            headers={'Content-Type': 'application/json', 'Idempotency-Key': f'outbox-{event.pk}'},
+            method='POST',
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            # urlopen raises HTTPError for 4xx/5xx
+            pass
+
+
+class EmailBackend:
+    """Email the assignee of ``ticket.assigned`` events; other topics are ignored"""
+
+    def send(self, event):
+        if event.topic != ASSIGNED:
+            return
+        from apps.accounts.models import User
+
+        email = User.objects.filter(pk=event.payload['assigned_to']).values_list('email', flat=True).first()
+        if not email:
+            return
+        send_mail(
+            subject=f"Ticket #{event.payload['ticket_id']} assigned to you",
+            message=f"You have been assigned ticket #{event.payload['ticket_id']}: {event.payload['title']}",
+            from_email=None,
+            recipient_list=[email],
+        )
@@ -0,0 +1,87 @@
+"""
+Full-text search over ticket title, description and content.
+
+PostgreSQL keeps a weighted ``tickets.search_vector`` tsvector column up to
+date with a trigger and searches it through a GIN index. SQLite keeps an FTS5
+shadow table, ``tickets_fts``, in sync from the ``post_save``/``post_delete``
+signals. Other backends fall back to case-insensitive substring matching.
+"""
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+
+SEARCH_CONFIG = 'english'
+FTS_TABLE = 'tickets_fts'
+
+
+def fts5_query(query):
+    """Quote every term so user input is never parsed as FTS5 syntax"""
+    terms = query.split()
+    return ' '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+
+def search_tickets(queryset, query):
+    """
+    Restrict ``queryset`` to tickets matching ``query``, annotated with a
+    ``search_rank`` (higher is more relevant) and ordered by it.
+    """
+    query = query.strip()
+    if not query:
+        return queryset
+
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        tsquery = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+        queryset = queryset.filter(pk__in=RawSQL(
+            f'SELECT id FROM tickets WHERE search_vector @@ {tsquery}', [query]
+        )).annotate(search_rank=RawSQL(
+            f'ts_rank_cd(tickets.search_vector, {tsquery})', [query]
+        ))
+    elif vendor == 'sqlite':
+        match = fts5_query(query)
+        if not match:
+            return queryset
+        queryset = queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match]
+        )).annotate(search_rank=RawSQL(
+            # bm25() is lower for better matches, negate it to match ts_rank_cd
+            f'SELECT -bm25({FTS_TABLE}, 10.0, 5.0, 1.0) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = tickets.id', [match]
+        ))
+    else:
+        return queryset.filter(
+            Q(title__icontains=query)
+            | Q(description__icontains=query)
+            | Q(content__icontains=query)
+        )
+    return queryset.order_by('-search_rank', '-created_at')
+
+
+def index_tickets(tickets, using='default'):
+    """Write ``tickets`` into the SQLite FTS5 table; PostgreSQL uses a trigger"""
+    if connections[using].vendor != 'sqlite':
+        return
+    rows = [(t.pk, t.title, t.description, t.content) for t in tickets]
+    if not rows:
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(
+            f'INSERT OR REPLACE INTO {FTS_TABLE} (rowid, title, description, content) '
+            'VALUES (%s, %s, %s, %s)',
+            rows,
+        )
+
+
+def unindex_tickets(ticket_ids, using='default'):
+    """Remove deleted tickets from the SQLite FTS5 table"""
+    if connections[using].vendor != 'sqlite':
+        return
+    ticket_ids = list(ticket_ids)
+    if not ticket_ids:
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+            [(ticket_id,) for ticket_id in ticket_ids],
+        )
@@ -1,8 +1,9 @@
 from rest_framework import serializers
-from .models import Ticket
+from .models import Ticket, TicketChange
 from apps.accounts.serializers import UserSerializer
+from apps.core.serializers import SparseFieldsetMixin, TimedRepresentationMixin
 
-class TicketSerializer(serializers.ModelSerializer):
+class TicketSerializer(TimedRepresentationMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer fot Ticket model"""
     created_by = UserSerializer(read_only=True)
     assigned_to = UserSerializer(read_only=True)
@@ -11,17 +12,77 @@ class TicketSerializer(serializers.ModelSerializer):
         model = Ticket
         fields = '__all__'
         read_only_fields = ['id', 'created_at', 'updated_at', 'created_by']
+        expandable_fields = ['created_by', 'assigned_to']
+        list_excluded_fields = ['description', 'content']
 
 
-class TicketCreateSerializer(serializers.ModelSerializer):
+class TicketCreateSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     """Serializer for creating tickets"""
 
     class Meta:
         model = Ticket
         fields = ['title', 'description', 'priority']
 
-class TicketUpdateSerializer(serializers.ModelSerializer):
+class TicketUpdateSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     """Serializer for updating tickets"""
     class Meta:
         model = Ticket
-        fields = ['title', 'description', 'status', 'priority', 'assigned_to']
\ No newline at end of file
+        fields = ['title', 'description', 'status', 'priority', 'assigned_to']
+
+class TicketBulkUpdateSerializer(TicketUpdateSerializer):
+    """Serializer for one item of a bulk update; assignees come from a preloaded map"""
+    id = serializers.IntegerField()
+    assigned_to = serializers.IntegerField(allow_null=True, required=False)
+
+    class Meta(TicketUpdateSerializer.Meta):
+        fields = ['id'] + TicketUpdateSerializer.Meta.fields
+
+    def validate_assigned_to(self, value):
+        if value is None:
+            return None
+        try:
+            return self.context['users'][value]
+        except KeyError:
+            raise serializers.ValidationError('User not found.')
+
+
+class TicketAssignmentSerializer(serializers.Serializer):
+    """Serializer for one item of a bulk assignment"""
+    ticket_id = serializers.IntegerField()
+    user_id = serializers.IntegerField()
+
+
+class TicketImportSerializer(serializers.ModelSerializer):
+    """Serializer for one imported row; usernames come from a preloaded map"""
+    created_by = serializers.CharField()
+    assigned_to = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+    class Meta:
+        model = Ticket
+        fields = ['title', 'description', 'content', 'status', 'priority', 'created_by', 'assigned_to']
+        extra_kwargs = {
+            'description': {'allow_blank': True, 'required': False},
+            'content': {'allow_blank': True, 'required': False},
+        }
+
+    def resolve_username(self, username):
+        try:
+            return self.context['user_ids'][username]
+        except KeyError:
+            raise serializers.ValidationError(f'Unknown user "{username}".')
+
+    def validate_created_by(self, value):
+        return self.resolve_username(value)
+
+    def validate_assigned_to(self, value):
+        if not value:
+            return None
+        return self.resolve_username(value)
+
+
+class TicketChangeSerializer(serializers.ModelSerializer):
+    """One entry of a ticket's change history"""
+
+    class Meta:
+        model = TicketChange
+        fields = ['id', 'field', 'old_value', 'new_value', 'changed_by', 'changed_at']
@@ -0,0 +1,57 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.accounts.models import User
+from .live import DELETED, notify, ticket_event
+from .models import Ticket, TicketCounter, TicketTombstone
+from .search import index_tickets, unindex_tickets
+
+
+@receiver(post_save, sender=Ticket)
+def sync_search_index(sender, instance, using, update_fields=None, **kwargs):
+    """Keep the full-text index in step with the ticket row"""
+    if update_fields is not None and not {'title', 'description', 'content'} & set(update_fields):
+        return
+    index_tickets([instance], using=using)
+
+
+@receiver(post_delete, sender=Ticket)
+def remove_from_search_index(sender, instance, using, **kwargs):
+    unindex_tickets([instance.pk], using=using)
+
+
+@receiver(post_delete, sender=Ticket)
+def record_tombstone(sender, instance, using, **kwargs):
+    """Tell sync clients (the changes action) and live streams to drop the ticket"""
+    TicketTombstone.objects.using(using).create(ticket_id=instance.pk)
+    notify([ticket_event(DELETED, instance)], using=using)
+
+
+@receiver(post_delete, sender=Ticket)
+def decrement_counters(sender, instance, using, **kwargs):
+    """Runs inside the deletion transaction, including cascades from User"""
+    TicketCounter.objects.db_manager(using).apply_change(instance.counted_values(), None)
+
+
+@receiver(pre_delete, sender=User)
+def unassign_counters(sender, instance, using, **kwargs):
+    """
+    Deleting a user sets assigned_to to NULL with a bulk UPDATE, which skips
+    Ticket.save. Move those tickets to the unassigned bucket here; tickets the
+    user created are cascade-deleted and decremented individually.
+    """
+    moved = Ticket.objects.using(using).filter(assigned_to=instance).exclude(created_by=instance).count()
+    if moved:
+        TicketCounter.objects.db_manager(using).apply_deltas({
+            ('assignee', TicketCounter.objects.bucket(instance.pk)): -moved,
+            ('assignee', ''): moved,
+        })
+
+
+@receiver(pre_delete, sender=User)
+def touch_unassigned_tickets(sender, instance, using, **kwargs):
+    """The SET_NULL UPDATE leaves updated_at alone; move the tickets into the next sync"""
+    Ticket.objects.using(using).filter(assigned_to=instance).exclude(created_by=instance).update(
+        updated_at=timezone.now()
+    )
@@ -0,0 +1,34 @@
+from django.db.models import Count
+
+from .models import COUNTED_FIELDS
+
+
+def compute_counters(tickets):
+    """
+    Yield ``(dimension, bucket, count)`` for every non-empty bucket by
+    grouping ``tickets`` from scratch.
+    """
+    for dimension, attname in COUNTED_FIELDS.items():
+        rows = tickets.order_by().values(attname).annotate(total=Count('pk'))
+        for row in rows:
+            value = row[attname]
+            yield dimension, '' if value is None else str(value), row['total']
+
+
+def counters_to_stats(counters):
+    """Shape ``TicketCounter`` rows into the stats endpoint payload"""
+    stats = {'total': 0, 'by_status': {}, 'by_priority': {}, 'by_assignee': []}
+    for counter in counters:
+        if counter.count <= 0:
+            continue
+        if counter.dimension == 'status':
+            stats['by_status'][counter.bucket] = counter.count
+            stats['total'] += counter.count
+        elif counter.dimension == 'priority':
+            stats['by_priority'][counter.bucket] = counter.count
+        elif counter.dimension == 'assignee':
+            stats['by_assignee'].append({
+                'user_id': int(counter.bucket) if counter.bucket else None,
+                'count': counter.count,
+            })
+    return stats
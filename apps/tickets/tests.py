@@ -1,3 +1,1071 @@
-from django.test import TestCase
+import asyncio
+import csv
+import json
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APIRequestFactory
+
+from apps.accounts.models import User
+from apps.accounts.views import UserViewSet
+from .cache import get_ticket_cache
+from .history import HistoryBuffer, history_buffer
+from .live import DELETED, PollingListener, Subscription, TicketEventHub
+from .models import ArchivedTicket, OutboxEvent, Ticket, TicketChange
+from .outbox import ConsoleBackend, claim_events, deliver_events
+from .sync import decode_sync_token
+from .views import TicketsViewset
+
+
+class TicketAPITestCase(TestCase):
+    """Shared fixtures for ticket API tests"""
+
+    def setUp(self):
+        get_ticket_cache().clear()
+        self.user = User.objects.create_user(username='alice', password='password123')
+        self.other = User.objects.create_user(username='bob', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def make_tickets(self, count, **kwargs):
+        kwargs.setdefault('created_by', self.user)
+        kwargs.setdefault('assigned_to', self.other)
+        return [
+            Ticket.objects.create(
+                title=f'Ticket {i}',
+                description='Description',
+                content='Content',
+                **kwargs
+            )
+            for i in range(count)
+        ]
+
+
+class TicketQueryCountTests(TicketAPITestCase):
+    """Ticket endpoints must not issue a query per row"""
+
+    def test_list_query_count_is_constant(self):
+        self.make_tickets(3)
+        # Count/validators, the page of ids, one joined SELECT for cache misses
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/v1/tickets/')
+        self.assertEqual(response.status_code, 200)
+
+        self.make_tickets(30)
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/v1/tickets/?expand=created_by,assigned_to')
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertEqual(response.data['results'][0]['assigned_to']['username'], 'bob')
+
+    def test_retrieve_query_count(self):
+        ticket = self.make_tickets(1)[0]
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/v1/tickets/{ticket.pk}/')
+        self.assertEqual(response.data['created_by']['username'], 'alice')
+
+    def test_my_tickets_query_count_is_constant(self):
+        self.make_tickets(25)
+        self.make_tickets(25, created_by=self.other, assigned_to=self.user)
+        self.make_tickets(5, created_by=self.other, assigned_to=None)
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/v1/tickets/my_tickets/')
+        self.assertEqual(response.data['count'], 50)
+        self.assertEqual(len(response.data['results']), 20)
+
+    def test_assign_query_count(self):
+        first, ticket = self.make_tickets(2, assigned_to=None)
+        self.client.post(f'/api/v1/tickets/{first.pk}/assign/', {'user_id': self.other.pk})
+        # ticket lookup, user lookup, locked read of the counted values, UPDATE,
+        # one counter UPDATE per bucket moved, the outbox INSERT, plus the savepoint pair
+        with self.assertNumQueries(9):
+            response = self.client.post(
+                f'/api/v1/tickets/{ticket.pk}/assign/', {'user_id': self.other.pk}
+            )
+        self.assertEqual(response.data['assigned_to']['username'], 'bob')
+
+
+class TicketKeysetPaginationTests(TicketAPITestCase):
+    """Opt-in keyset pagination on the ticket list"""
+
+    def test_walks_all_pages_without_counting(self):
+        tickets = self.make_tickets(45)
+        expected = [ticket.pk for ticket in reversed(tickets)]
+
+        seen = []
+        url = '/api/v1/tickets/?pagination=cursor'
+        while url:
+            with self.assertNumQueries(2):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, expected)
+
+    def test_previous_link_returns_prior_page(self):
+        self.make_tickets(45)
+        first = self.client.get('/api/v1/tickets/?pagination=cursor')
+        self.assertIsNone(first.data['previous'])
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(
+            [row['id'] for row in back.data['results']],
+            [row['id'] for row in first.data['results']],
+        )
+
+    def test_approximate_count_and_filters(self):
+        self.make_tickets(3, status='closed')
+        self.make_tickets(2)
+        response = self.client.get('/api/v1/tickets/?pagination=cursor&count=approx&status=closed')
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_tampered_cursor_is_rejected(self):
+        response = self.client.get('/api/v1/tickets/?cursor=bogus')
+        self.assertEqual(response.status_code, 404)
+
+
+class MyTicketsTests(TicketAPITestCase):
+    """my_tickets role selection, filters and pagination"""
+
+    def setUp(self):
+        super().setUp()
+        self.created = self.make_tickets(3, assigned_to=None)
+        self.assigned = self.make_tickets(2, created_by=self.other, assigned_to=self.user)
+        self.both = self.make_tickets(1, assigned_to=self.user, status='closed')
+        self.make_tickets(4, created_by=self.other, assigned_to=None)
+
+    def ids(self, response):
+        return {row['id'] for row in response.data['results']}
+
+    def test_any_role_returns_each_ticket_once(self):
+        response = self.client.get('/api/v1/tickets/my_tickets/')
+        self.assertEqual(response.data['count'], 6)
+        self.assertEqual(self.ids(response), {t.pk for t in self.created + self.assigned + self.both})
+
+    def test_role_filters_one_side(self):
+        response = self.client.get('/api/v1/tickets/my_tickets/?role=created')
+        self.assertEqual(self.ids(response), {t.pk for t in self.created + self.both})
+        response = self.client.get('/api/v1/tickets/my_tickets/?role=assigned')
+        self.assertEqual(self.ids(response), {t.pk for t in self.assigned + self.both})
+
+    def test_status_filter_and_keyset_pagination(self):
+        response = self.client.get('/api/v1/tickets/my_tickets/?status=closed&pagination=cursor')
+        self.assertEqual(self.ids(response), {self.both[0].pk})
+        self.assertIsNone(response.data['next'])
+
+    def test_invalid_role(self):
+        response = self.client.get('/api/v1/tickets/my_tickets/?role=watching')
+        self.assertEqual(response.status_code, 400)
+
+
+class SparseFieldsetTests(TicketAPITestCase):
+    """?fields= and ?expand= on ticket and user endpoints"""
+
+    def setUp(self):
+        super().setUp()
+        self.ticket = self.make_tickets(1)[0]
+
+    def test_list_is_compact_by_default(self):
+        row = self.client.get('/api/v1/tickets/').data['results'][0]
+        self.assertNotIn('description', row)
+        self.assertNotIn('content', row)
+        self.assertEqual(row['created_by'], self.user.pk)
+        self.assertEqual(row['assigned_to'], self.other.pk)
+
+    def test_list_expand(self):
+        row = self.client.get('/api/v1/tickets/?expand=assigned_to,description').data['results'][0]
+        self.assertEqual(row['assigned_to']['username'], 'bob')
+        self.assertEqual(row['created_by'], self.user.pk)
+        self.assertEqual(row['description'], 'Description')
+        self.assertNotIn('content', row)
+
+    def test_fields_defers_unused_columns(self):
+        self.client.get('/api/v1/tickets/')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/v1/tickets/?fields=id,title,status,priority')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'title', 'status', 'priority'})
+        for query in queries.captured_queries:
+            self.assertNotIn('"description"', query['sql'])
+            # The users' versions for the cache key are read without joining them
+            self.assertNotIn('JOIN "users"', query['sql'])
+
+    def test_detail_is_fully_expanded(self):
+        response = self.client.get(f'/api/v1/tickets/{self.ticket.pk}/')
+        self.assertEqual(response.data['content'], 'Content')
+        self.assertEqual(response.data['created_by']['username'], 'alice')
+
+    def test_users_fields(self):
+        response = self.client.get('/api/v1/auth/users/?fields=id,username')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'username'})
+
+
+class TicketSearchTests(TicketAPITestCase):
+    """?q= full-text search backed by the FTS index"""
+
+    def setUp(self):
+        super().setUp()
+        self.login = Ticket.objects.create(
+            title='Login button broken', description='Cannot sign in on mobile',
+            content='', created_by=self.user,
+        )
+        self.export = Ticket.objects.create(
+            title='CSV export slow', description='The login audit export times out',
+            content='', created_by=self.user,
+        )
+        Ticket.objects.create(
+            title='Typo on homepage', description='Spelling', content='', created_by=self.other,
+        )
+
+    def ids(self, response):
+        return [row['id'] for row in response.data['results']]
+
+    def test_ranks_title_matches_first(self):
+        response = self.client.get('/api/v1/tickets/?q=login')
+        self.assertEqual(self.ids(response), [self.login.pk, self.export.pk])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.export.title = 'Dashboard widget'
+        self.export.description = 'Renders blank'
+        self.export.save()
+        self.assertEqual(self.ids(self.client.get('/api/v1/tickets/?q=login')), [self.login.pk])
+        self.assertEqual(self.ids(self.client.get('/api/v1/tickets/?q=widget')), [self.export.pk])
+
+        self.login.delete()
+        self.assertEqual(self.ids(self.client.get('/api/v1/tickets/?q=login')), [])
+
+    def test_search_syntax_is_escaped_and_combines_with_my_tickets(self):
+        response = self.client.get('/api/v1/tickets/my_tickets/?q=login" OR "typo')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get('/api/v1/tickets/my_tickets/?q=export')
+        self.assertEqual(self.ids(response), [self.export.pk])
+
+    def test_search_rejects_cursor_pagination(self):
+        response = self.client.get('/api/v1/tickets/?q=login&pagination=cursor')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('q', response.data)
+
+
+class ConditionalRequestTests(TicketAPITestCase):
+    """ETag / Last-Modified validators on ticket endpoints"""
+
+    def setUp(self):
+        super().setUp()
+        self.ticket = self.make_tickets(1)[0]
+        self.url = f'/api/v1/tickets/{self.ticket.pk}/'
+
+    def test_retrieve_not_modified(self):
+        response = self.client.get(self.url)
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.ticket.title = 'Changed'
+        self.ticket.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_not_modified_until_rows_change(self):
+        response = self.client.get('/api/v1/tickets/?status=open')
+        etag = response['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/tickets/?status=open', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.make_tickets(1)
+        response = self.client.get('/api/v1/tickets/?status=open', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 2)
+
+        Ticket.objects.filter(pk=self.ticket.pk).delete()
+        response = self.client.get('/api/v1/tickets/?status=open', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_match_guards_updates(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.patch(self.url, {'title': 'First'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        response = self.client.patch(self.url, {'title': 'Second'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.title, 'First')
+
+    def test_etag_varies_with_media_type_and_embedded_users(self):
+        etag = self.client.get(self.url)['ETag']
+        packed = self.client.get(self.url, HTTP_ACCEPT='application/msgpack')['ETag']
+        self.assertNotEqual(packed, etag)
+
+        self.other.email = 'bob@example.com'
+        self.other.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['assigned_to']['email'], 'bob@example.com')
+
+        # Any rendering of the current version satisfies If-Match
+        packed = self.client.get(self.url, HTTP_ACCEPT='application/msgpack')['ETag']
+        response = self.client.patch(self.url, {'title': 'Packed'}, HTTP_IF_MATCH=packed)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.patch(self.url, {'title': 'Stale'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+
+
+class RepresentationCacheTests(TicketAPITestCase):
+    """Serialized tickets are served from the cache until they change"""
+
+    def setUp(self):
+        super().setUp()
+        self.tickets = self.make_tickets(3)
+        self.url = f'/api/v1/tickets/{self.tickets[0].pk}/'
+
+    def test_warm_reads_skip_the_joined_select(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['assigned_to']['username'], 'bob')
+
+        # Only the two tickets not fetched above are loaded
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/v1/tickets/')
+        self.assertIn(f'IN ({self.tickets[2].pk}, {self.tickets[1].pk})', queries.captured_queries[-1]['sql'])
+
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/v1/tickets/')
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_ticket_save_and_assign_are_visible(self):
+        self.client.get(self.url)
+        self.client.patch(self.url, {'title': 'Renamed'})
+        self.assertEqual(self.client.get(self.url).data['title'], 'Renamed')
+
+        self.client.post(f'{self.url}assign/', {'user_id': self.user.pk})
+        self.assertEqual(self.client.get(self.url).data['assigned_to']['username'], 'alice')
+
+    def test_user_profile_change_is_visible(self):
+        self.client.get('/api/v1/tickets/?expand=assigned_to')
+        self.other.username = 'robert'
+        self.other.save()
+        response = self.client.get('/api/v1/tickets/?expand=assigned_to')
+        self.assertEqual(response.data['results'][0]['assigned_to']['username'], 'robert')
+
+        # The key follows the user's updated_at, so no worker needs to be told
+        self.other.email = 'robert@example.com'
+        self.other.save(update_fields=['email'])
+        response = self.client.get('/api/v1/tickets/?expand=assigned_to')
+        self.assertEqual(response.data['results'][0]['assigned_to']['email'], 'robert@example.com')
+
+    def test_deleted_ticket_is_dropped(self):
+        self.client.get('/api/v1/tickets/')
+        self.client.delete(self.url)
+        response = self.client.get('/api/v1/tickets/')
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_file_based_backend(self):
+        with tempfile.TemporaryDirectory() as location:
+            caches = {
+                **settings.CACHES,
+                'tickets': {
+                    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                    'LOCATION': location,
+                },
+            }
+            with override_settings(CACHES=caches):
+                self.client.get(self.url)
+                with self.assertNumQueries(1):
+                    response = self.client.get(self.url)
+        self.assertEqual(response.data['created_by']['username'], 'alice')
+
+
+class TicketStatsTests(TicketAPITestCase):
+    """Counters behind /tickets/stats/ follow every write"""
+
+    def stats(self):
+        with self.assertNumQueries(1):
+            return self.client.get('/api/v1/tickets/stats/').data
+
+    def assert_matches_rebuild(self):
+        before = self.stats()
+        call_command('rebuild_ticket_stats', stdout=StringIO())
+        self.assertEqual(self.stats(), before)
+
+    def test_create_update_assign_delete(self):
+        response = self.client.post('/api/v1/tickets/', {
+            'title': 'New', 'description': 'Body', 'priority': 'high',
+        })
+        self.assertEqual(response.status_code, 201)
+        ticket_id = Ticket.objects.get().pk
+        stats = self.stats()
+        self.assertEqual(stats['total'], 1)
+        self.assertEqual(stats['by_status'], {'open': 1})
+        self.assertEqual(stats['by_priority'], {'high': 1})
+        self.assertEqual(stats['by_assignee'], [{'user_id': None, 'count': 1}])
+
+        self.client.patch(f'/api/v1/tickets/{ticket_id}/', {'status': 'closed'})
+        self.client.post(f'/api/v1/tickets/{ticket_id}/assign/', {'user_id': self.other.pk})
+        stats = self.stats()
+        self.assertEqual(stats['by_status'], {'closed': 1})
+        self.assertEqual(stats['by_assignee'], [{'user_id': self.other.pk, 'count': 1}])
+        self.assert_matches_rebuild()
+
+        self.client.delete(f'/api/v1/tickets/{ticket_id}/')
+        self.assertEqual(self.stats()['total'], 0)
+
+    def test_user_deletion_cascades_and_unassigns(self):
+        self.make_tickets(2, created_by=self.user, assigned_to=self.other)
+        self.make_tickets(3, created_by=self.other, assigned_to=self.user)
+        self.make_tickets(1, created_by=self.user, assigned_to=self.user)
+        self.user.delete()
+        stats = self.stats()
+        self.assertEqual(stats['total'], 3)
+        self.assertEqual(stats['by_assignee'], [{'user_id': None, 'count': 3}])
+        self.assert_matches_rebuild()
+
+
+class ArchiveTests(TicketAPITestCase):
+    """archive_tickets moves old closed tickets out of the hot table"""
+
+    def setUp(self):
+        super().setUp()
+        self.old_closed = self.make_tickets(3, status='closed')
+        self.recent_closed = self.make_tickets(1, status='closed')[0]
+        self.old_open = self.make_tickets(1)[0]
+        old = timezone.now() - timedelta(days=400)
+        Ticket.objects.exclude(pk=self.recent_closed.pk).update(updated_at=old)
+
+    def archive(self, *args):
+        call_command('archive_tickets', '--older-than', '180', *args, stdout=StringIO())
+
+    def test_only_old_closed_tickets_move(self):
+        self.archive()
+        archived = {ticket.pk for ticket in self.old_closed}
+        self.assertEqual(set(ArchivedTicket.objects.values_list('pk', flat=True)), archived)
+        self.assertFalse(Ticket.objects.filter(pk__in=archived).exists())
+        self.assertEqual(self.client.get('/api/v1/tickets/stats/').data['total'], 2)
+        call_command('rebuild_ticket_stats', stdout=StringIO())
+        self.assertEqual(self.client.get('/api/v1/tickets/stats/').data['total'], 2)
+
+    def test_interrupted_run_resumes(self):
+        self.archive('--batch-size', '1', '--max-batches', '2')
+        self.assertEqual(ArchivedTicket.objects.count(), 2)
+        self.archive('--batch-size', '1')
+        self.assertEqual(ArchivedTicket.objects.count(), 3)
+        self.assertEqual(Ticket.objects.count(), 2)
+
+    def test_archived_tickets_stay_readable(self):
+        self.archive()
+        ticket = self.old_closed[0]
+        response = self.client.get(f'/api/v1/tickets/{ticket.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['title'], ticket.title)
+        self.assertEqual(response.data['created_by']['username'], 'alice')
+        response = self.client.patch(f'/api/v1/tickets/{ticket.pk}/', {'status': 'open'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_lists_include_archived_on_request(self):
+        self.archive()
+        response = self.client.get('/api/v1/tickets/')
+        self.assertEqual(response.data['count'], 2)
+        response = self.client.get('/api/v1/tickets/', {'include_archived': '1'})
+        self.assertEqual(response.data['count'], 5)
+        response = self.client.get('/api/v1/tickets/', {'include_archived': '1', 'pagination': 'cursor'})
+        self.assertEqual(len(response.data['results']), 5)
+        response = self.client.get('/api/v1/tickets/my_tickets/', {'include_archived': 'true', 'status': 'closed'})
+        self.assertEqual(response.data['count'], 4)
+        response = self.client.get('/api/v1/tickets/', {'include_archived': '1', 'q': 'ticket'})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(TICKETS_SYNC_SETTLE_SECONDS=0, TICKETS_SYNC_PAGE_SIZE=2)
+class TicketSyncTests(TicketAPITestCase):
+    """The changes action returns only what changed since a sync token"""
+
+    def sync(self, token=None):
+        params = {'since': token} if token else {}
+        response = self.client.get('/api/v1/tickets/changes/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_full_sync_then_deltas(self):
+        tickets = self.make_tickets(3)
+        first = self.sync()
+        self.assertTrue(first['has_more'])
+        second = self.sync(first['sync_token'])
+        self.assertFalse(second['has_more'])
+        synced = [t['id'] for t in first['changes'] + second['changes']]
+        self.assertEqual(synced, [t.pk for t in tickets])
+        self.assertNotIn('description', second['changes'][0])
+
+        self.assertEqual(self.sync(second['sync_token'])['changes'], [])
+        self.client.patch(f'/api/v1/tickets/{tickets[0].pk}/', {'status': 'closed'})
+        self.client.delete(f'/api/v1/tickets/{tickets[1].pk}/')
+        with self.assertNumQueries(3):
+            delta = self.sync(second['sync_token'])
+        self.assertEqual([t['id'] for t in delta['changes']], [tickets[0].pk])
+        self.assertEqual(delta['changes'][0]['status'], 'closed')
+        self.assertEqual(delta['deleted'], [tickets[1].pk])
+        # Tokens embed a signing timestamp, so compare the positions they carry
+        again = self.sync(delta['sync_token'])
+        self.assertEqual((again['changes'], again['deleted'], again['has_more']), ([], [], False))
+        self.assertEqual(decode_sync_token(again['sync_token']), decode_sync_token(delta['sync_token']))
+
+    def test_archived_and_unassigned_tickets_are_synced(self):
+        archived, kept = self.make_tickets(2, status='closed')
+        Ticket.objects.filter(pk=archived.pk).update(updated_at=timezone.now() - timedelta(days=400))
+        token = self.sync(self.sync()['sync_token'])['sync_token']
+
+        call_command('archive_tickets', '--older-than', '180', stdout=StringIO())
+        self.other.delete()
+        delta = self.sync(token)
+        self.assertEqual(delta['deleted'], [archived.pk])
+        self.assertEqual([t['id'] for t in delta['changes']], [kept.pk])
+        self.assertIsNone(delta['changes'][0]['assigned_to'])
+
+    def test_bad_and_expired_tokens(self):
+        response = self.client.get('/api/v1/tickets/changes/', {'since': 'garbage'})
+        self.assertEqual(response.status_code, 400)
+        token = self.sync()['sync_token']
+        with override_settings(TICKETS_SYNC_TOMBSTONE_DAYS=-1):
+            response = self.client.get('/api/v1/tickets/changes/', {'since': token})
+        self.assertEqual(response.status_code, 410)
+
+
+class StubListener:
+    """Publishes the given events once, then idles like a real listener"""
+
+    def __init__(self, events):
+        self.events = events
+
+    async def run(self, publish):
+        for event in self.events:
+            publish(event)
+        await asyncio.Event().wait()
+
+
+class LiveEventTests(TicketAPITestCase):
+    """Ticket events are fanned out to SSE streams by one listener per worker"""
+
+    def event(self, kind='ticket.updated', **fields):
+        return {
+            'type': kind, 'id': 1, 'status': 'open', 'priority': 'medium',
+            'created_by': self.other.pk, 'assigned_to': None, **fields,
+        }
+
+    def test_hub_filters_per_subscription(self):
+        hub = TicketEventHub()
+        everything = Subscription(self.user.pk)
+        mine = Subscription(self.user.pk, role='any')
+        urgent = Subscription(self.user.pk, status='open', priority='critical')
+        hub.subscriptions.update([everything, mine, urgent])
+
+        hub.publish(self.event())
+        hub.publish(self.event('ticket.assigned', assigned_to=self.user.pk, priority='critical'))
+        hub.publish({'type': DELETED, 'id': 1})
+        self.assertEqual(everything.queue.qsize(), 3)
+        self.assertEqual(mine.queue.qsize(), 2)
+        self.assertEqual(urgent.queue.qsize(), 2)
+
+    def test_polling_listener_reports_changes(self):
+        listener = PollingListener('default')
+        kept, deleted = self.make_tickets(2)
+        position = listener.start()
+        Ticket.objects.filter(pk=kept.pk).update(updated_at=timezone.now() - timedelta(days=1))
+        created = self.make_tickets(1)[0]
+        self.client.patch(f'/api/v1/tickets/{deleted.pk}/', {'status': 'closed'})
+        self.client.delete(f'/api/v1/tickets/{deleted.pk}/')
+
+        events, position = listener.poll(position)
+        self.assertEqual([(e['type'], e['id']) for e in events], [
+            ('ticket.created', created.pk), ('ticket.deleted', deleted.pk),
+        ])
+        self.client.post(f'/api/v1/tickets/{created.pk}/assign/', {'user_id': self.user.pk})
+        events, position = listener.poll(position)
+        self.assertEqual([(e['type'], e['assigned_to']) for e in events], [('ticket.updated', self.user.pk)])
+        self.assertEqual(listener.poll(position)[0], [])
+
+    @override_settings(TICKET_EVENTS_MAX_STREAM_SECONDS=0.2)
+    async def test_stream_sends_matching_events_until_it_expires(self):
+        token = await Token.objects.acreate(user=self.user)
+        hub = TicketEventHub(lambda: StubListener([
+            self.event(status='closed'),
+            self.event(id=2, created_by=self.user.pk),
+        ]))
+        with mock.patch('apps.tickets.live.get_hub', return_value=hub):
+            response = await AsyncClient().get(
+                '/api/v1/tickets/events/', {'role': 'created'}, headers={'Authorization': f'Token {token.key}'}
+            )
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            chunks = [chunk.decode() async for chunk in response.streaming_content]
+
+        self.assertTrue(chunks[0].startswith('retry:'))
+        self.assertTrue(chunks[1].startswith('event: ticket.updated\n'))
+        self.assertEqual(json.loads(chunks[1].split('data: ')[1])['id'], 2)
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(hub.subscriptions, set())
+        self.assertIsNone(hub.task)
+
+    async def test_stream_needs_authentication_and_asgi(self):
+        response = await AsyncClient().get('/api/v1/tickets/events/')
+        self.assertEqual(response.status_code, 401)
+        response = await sync_to_async(self.client.get)('/api/v1/tickets/events/')
+        self.assertEqual(response.status_code, 501)
+
+
+@override_settings(TICKET_HISTORY_FLUSH_INTERVAL=0)
+class TicketHistoryTests(TicketAPITestCase):
+    """Field-level changes are logged and served by the history action"""
+
+    def test_update_assign_and_bulk_changes_are_recorded(self):
+        ticket = self.make_tickets(1, assigned_to=None)[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/v1/tickets/{ticket.pk}/', {'status': 'resolved', 'title': 'Renamed'})
+            self.client.post(f'/api/v1/tickets/{ticket.pk}/assign/', {'user_id': self.other.pk})
+            self.client.patch('/api/v1/tickets/bulk_update/', [{'id': ticket.pk, 'priority': 'high'}], format='json')
+
+        response = self.client.get(f'/api/v1/tickets/{ticket.pk}/history/')
+        self.assertEqual(response.status_code, 200)
+        changes = [(c['field'], c['old_value'], c['new_value']) for c in response.data['results']]
+        self.assertEqual(changes, [
+            ('priority', 'medium', 'high'),
+            ('assignee', None, str(self.other.pk)),
+            ('status', 'open', 'resolved'),
+        ])
+        self.assertEqual({c['changed_by'] for c in response.data['results']}, {self.user.pk})
+
+    def test_resolved_at_follows_status(self):
+        ticket = self.make_tickets(1)[0]
+        self.client.patch(f'/api/v1/tickets/{ticket.pk}/', {'status': 'closed'})
+        ticket.refresh_from_db()
+        self.assertIsNotNone(ticket.resolved_at)
+        self.client.patch('/api/v1/tickets/bulk_update/', [{'id': ticket.pk, 'status': 'open'}], format='json')
+        ticket.refresh_from_db()
+        self.assertIsNone(ticket.resolved_at)
+
+    @override_settings(TICKET_HISTORY_FLUSH_INTERVAL=3600)
+    def test_changes_are_written_behind_the_request(self):
+        ticket, other = self.make_tickets(2)
+        self.addCleanup(history_buffer.pending.clear)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/v1/tickets/{ticket.pk}/', {'priority': 'low'})
+            self.client.patch(f'/api/v1/tickets/{other.pk}/', {'priority': 'low'})
+        self.assertFalse(TicketChange.objects.exists())
+        response = self.client.get(f'/api/v1/tickets/{ticket.pk}/history/')
+        self.assertEqual(len(response.data['results']), 1)
+        # Other tickets' changes stay buffered for the writer thread
+        self.assertEqual(list(TicketChange.objects.values_list('ticket_id', flat=True)), [ticket.pk])
+
+    @override_settings(TICKET_HISTORY_FLUSH_INTERVAL=3600, TICKET_HISTORY_MAX_RETRIES=2, TICKET_HISTORY_MAX_PENDING=3)
+    def test_buffer_drops_rows_that_keep_failing(self):
+        def change(ticket_id, **kwargs):
+            return TicketChange(
+                ticket_id=ticket_id, field='status', old_value='open', new_value='closed',
+                changed_at=timezone.now(), **kwargs
+            )
+
+        buffer = HistoryBuffer()
+        # A user deleted before the flush no longer breaks the batch; a NULL ticket_id does
+        buffer.add([change(1, changed_by_id=9999), change(None)], 'default')
+        with self.assertLogs('apps.tickets.history', 'ERROR'):
+            buffer.flush()
+        self.assertEqual(len(buffer.pending['default']), 2)
+        with self.assertLogs('apps.tickets.history', 'ERROR'):
+            buffer.flush()
+        self.assertEqual(list(TicketChange.objects.values_list('ticket_id', flat=True)), [1])
+        self.assertEqual(buffer.pending['default'], [])
+
+        with self.assertLogs('apps.tickets.history', 'ERROR'):
+            buffer.add([change(pk) for pk in range(2, 7)], 'default')
+        self.assertEqual([c.ticket_id for c in buffer.pending['default']], [4, 5, 6])
+
+
+class OutboxTests(TicketAPITestCase):
+    """Assignments and status changes are delivered through the outbox"""
+
+    def setUp(self):
+        super().setUp()
+        self.ticket = self.make_tickets(1, assigned_to=None)[0]
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = f'{self.directory.name}/events.jsonl'
+
+    def read_events(self):
+        with open(self.path) as handle:
+            return [json.loads(line) for line in handle]
+
+    def run_worker(self):
+        with override_settings(OUTBOX_BACKENDS=['apps.tickets.outbox.FileBackend'], OUTBOX_FILE_PATH=self.path):
+            call_command('run_outbox_worker', '--once', stdout=StringIO())
+
+    def test_changes_are_written_with_the_ticket_and_delivered(self):
+        self.client.post(f'/api/v1/tickets/{self.ticket.pk}/assign/', {'user_id': self.other.pk})
+        self.client.patch(f'/api/v1/tickets/{self.ticket.pk}/', {'status': 'in_progress'})
+        self.client.patch(f'/api/v1/tickets/{self.ticket.pk}/', {'title': 'No event'})
+        self.assertEqual(OutboxEvent.objects.filter(status='pending').count(), 2)
+
+        self.run_worker()
+        events = self.read_events()
+        self.assertEqual([event['topic'] for event in events], ['ticket.assigned', 'ticket.status_changed'])
+        self.assertEqual(events[0]['payload']['assigned_to'], self.other.pk)
+        self.assertEqual(events[1]['payload']['new_status'], 'in_progress')
+        self.assertEqual(OutboxEvent.objects.filter(status='delivered').count(), 2)
+
+        self.run_worker()
+        self.assertEqual(len(self.read_events()), 2)
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        self.client.patch('/api/v1/tickets/bulk_update/', [{'id': self.ticket.pk, 'status': 'closed'}], format='json')
+        with override_settings(OUTBOX_BACKENDS=['apps.tickets.outbox.WebhookBackend'],
+                               OUTBOX_WEBHOOK_URL='http://127.0.0.1:9/', OUTBOX_MAX_ATTEMPTS=2):
+            call_command('run_outbox_worker', '--once', stdout=StringIO())
+            event = OutboxEvent.objects.get()
+            self.assertEqual((event.status, event.attempts), ('pending', 1))
+            self.assertGreater(event.available_at, timezone.now())
+            self.assertIn('URLError', event.last_error)
+
+            OutboxEvent.objects.update(available_at=timezone.now())
+            with self.assertLogs('apps.tickets.outbox', 'ERROR'):
+                call_command('run_outbox_worker', '--once', stdout=StringIO())
+            event.refresh_from_db()
+            self.assertEqual((event.status, event.attempts), ('failed', 2))
+
+    def test_claimed_events_are_not_claimed_again(self):
+        self.client.post(f'/api/v1/tickets/{self.ticket.pk}/assign/', {'user_id': self.other.pk})
+        self.assertEqual(len(claim_events(10)), 1)
+        self.assertEqual(claim_events(10), [])
+
+    def test_expired_lease_is_not_delivered(self):
+        self.client.post(f'/api/v1/tickets/{self.ticket.pk}/assign/', {'user_id': self.other.pk})
+        events = claim_events(10)
+        # The lease ran out and another worker claimed the event
+        OutboxEvent.objects.update(available_at=timezone.now() + timedelta(minutes=5))
+        with self.assertLogs('apps.tickets.outbox', 'WARNING'):
+            self.assertEqual(deliver_events(events, [ConsoleBackend(StringIO())]), (0, 0))
+        self.assertEqual(OutboxEvent.objects.get().attempts, 0)
+
+    def test_prune_deletes_old_delivered_events(self):
+        self.client.post(f'/api/v1/tickets/{self.ticket.pk}/assign/', {'user_id': self.other.pk})
+        self.client.patch(f'/api/v1/tickets/{self.ticket.pk}/', {'status': 'in_progress'})
+        self.run_worker()
+        old, recent = OutboxEvent.objects.all()
+        old.delivered_at = timezone.now() - timedelta(days=30)
+        old.save()
+        call_command('prune_outbox_events', stdout=StringIO())
+        self.assertEqual(list(OutboxEvent.objects.values_list('pk', flat=True)), [recent.pk])
+
+
+class BulkEndpointTests(TicketAPITestCase):
+    """bulk_create / bulk_update / bulk_assign"""
+
+    def test_bulk_create(self):
+        items = [{'title': f'T{i}', 'description': 'D', 'priority': 'high'} for i in range(5)]
+        response = self.client.post('/api/v1/tickets/bulk_create/', items, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertTrue(all(row['created_by'] == self.user.pk for row in response.data['results']))
+        self.assertEqual(self.client.get('/api/v1/tickets/stats/').data['by_priority'], {'high': 5})
+        self.assertEqual(len(self.client.get('/api/v1/tickets/?q=T3').data['results']), 1)
+
+    def test_bulk_create_is_all_or_nothing(self):
+        items = [{'title': 'Fine', 'description': 'D'}, {'description': 'No title'}]
+        response = self.client.post('/api/v1/tickets/bulk_create/', items, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('title', response.data[1])
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_bulk_create_limit(self):
+        with self.settings(TICKETS_BULK_MAX_ITEMS=2):
+            items = [{'title': 'T', 'description': 'D'}] * 3
+            response = self.client.post('/api/v1/tickets/bulk_create/', items, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_update(self):
+        first, second = self.make_tickets(2)
+        items = [
+            {'id': first.pk, 'status': 'closed'},
+            {'id': second.pk, 'title': 'Renamed', 'assigned_to': self.user.pk},
+        ]
+        response = self.client.patch('/api/v1/tickets/bulk_update/', items, format='json')
+        self.assertEqual(response.status_code, 200)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.status, 'closed')
+        self.assertEqual((second.title, second.assigned_to), ('Renamed', self.user))
+        stats = self.client.get('/api/v1/tickets/stats/').data
+        self.assertEqual(stats['by_status'], {'open': 1, 'closed': 1})
+
+    def test_bulk_update_reports_per_item_errors(self):
+        ticket = self.make_tickets(1)[0]
+        items = [{'id': ticket.pk, 'status': 'bogus'}, {'id': 9999}, {'id': ticket.pk, 'assigned_to': 9999}]
+        response = self.client.patch('/api/v1/tickets/bulk_update/', items, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('status', response.data[0])
+        self.assertIn('id', response.data[1])
+        self.assertIn('id', response.data[2])
+
+    def test_bulk_update_rejects_non_integer_ids(self):
+        ticket = self.make_tickets(1)[0]
+        items = [{'id': 'abc'}, {'id': [1]}, 'nope', {'id': ticket.pk, 'status': 'closed'}]
+        response = self.client.patch('/api/v1/tickets/bulk_update/', items, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([list(error) for error in response.data], [['id'], ['id'], ['id'], []])
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.status, 'open')
+
+    def test_bulk_assign_uses_constant_queries(self):
+        tickets = self.make_tickets(10, assigned_to=None)
+        self.client.post('/api/v1/tickets/bulk_assign/', [
+            {'ticket_id': tickets[0].pk, 'user_id': self.other.pk},
+        ], format='json')
+        items = [{'ticket_id': ticket.pk, 'user_id': self.other.pk} for ticket in tickets[1:]]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/v1/tickets/bulk_assign/', items, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            sum('FROM "users"' in query['sql'] for query in queries.captured_queries), 1
+        )
+        self.assertEqual(Ticket.objects.filter(assigned_to=self.other).count(), 10)
+        stats = self.client.get('/api/v1/tickets/stats/').data
+        self.assertEqual(stats['by_assignee'], [{'user_id': self.other.pk, 'count': 10}])
+
+    def test_bulk_assign_unknown_user(self):
+        ticket = self.make_tickets(1)[0]
+        response = self.client.post('/api/v1/tickets/bulk_assign/', [
+            {'ticket_id': ticket.pk, 'user_id': 9999},
+        ], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('user_id', response.data[0])
+
+
+class ExportTests(TicketAPITestCase):
+    """Streaming NDJSON / CSV export"""
+
+    def setUp(self):
+        super().setUp()
+        self.make_tickets(5)
+        self.make_tickets(3, status='closed', assigned_to=None)
+
+    def read(self, response):
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_ndjson_export_in_one_query(self):
+        with self.settings(TICKETS_EXPORT_CHUNK_SIZE=2):
+            with self.assertNumQueries(1):
+                response = self.client.get('/api/v1/tickets/export/')
+                body = self.read(response)
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(rows[-1]['created_by']['username'], 'alice')
+        self.assertEqual(rows[-1]['content'], 'Content')
+
+    def test_csv_export_honours_filters(self):
+        response = self.client.get('/api/v1/tickets/export/?export_format=csv&status=closed')
+        rows = list(csv.DictReader(StringIO(self.read(response))))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['status'], 'closed')
+        self.assertEqual(rows[0]['created_by.username'], 'alice')
+        self.assertEqual(rows[0]['assigned_to.username'], '')
+
+    async def test_asgi_export_streams_asynchronously(self):
+        token = await sync_to_async(Token.objects.create)(user=self.user)
+        with self.settings(TICKETS_EXPORT_CHUNK_SIZE=3):
+            response = await AsyncClient().get(
+                '/api/v1/tickets/export/', headers={'Authorization': f'Token {token.key}'}
+            )
+            self.assertTrue(response.is_async)
+            chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(len(b''.join(chunks).decode().splitlines()), 8)
+
+    def test_unknown_format(self):
+        response = self.client.get('/api/v1/tickets/export/?export_format=xml')
+        self.assertEqual(response.status_code, 400)
+
+
+class ImportTicketsTests(TicketAPITestCase):
+    """import_tickets management command"""
+
+    def write(self, directory, name, content):
+        path = f'{directory}/{name}'
+        with open(path, 'w') as handle:
+            handle.write(content)
+        return path
+
+    def test_jsonl_import_skips_invalid_rows(self):
+        rows = [
+            {'title': 'One', 'description': 'd', 'content': 'c', 'created_by': 'alice', 'assigned_to': 'bob'},
+            {'title': 'Two', 'created_by': 'nobody'},
+            {'title': 'Three', 'status': 'closed', 'created_by': {'username': 'bob'}, 'assigned_to': None},
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            path = self.write(directory, 'tickets.jsonl', '\n'.join(json.dumps(row) for row in rows))
+            stderr = StringIO()
+            call_command('import_tickets', path, stdout=StringIO(), stderr=stderr)
+
+        self.assertIn('Line 2', stderr.getvalue())
+        self.assertEqual(Ticket.objects.count(), 2)
+        three = Ticket.objects.get(title='Three')
+        self.assertEqual((three.created_by, three.assigned_to, three.status), (self.other, None, 'closed'))
+        self.assertIsNotNone(three.resolved_at)
+        self.assertIsNone(Ticket.objects.get(title='One').resolved_at)
+        response = self.client.get('/api/v1/tickets/stats/')
+        self.assertEqual(response.data['total'], 2)
+        self.assertEqual(self.client.get('/api/v1/tickets/?q=three').data['count'], 1)
+
+    def test_csv_import_resumes_from_checkpoint(self):
+        content = 'title,created_by,assigned_to\nA,alice,bob\nB,alice,\nC,bob,alice\n'
+        with tempfile.TemporaryDirectory() as directory:
+            path = self.write(directory, 'tickets.csv', content)
+            self.write(directory, 'tickets.csv.checkpoint', '3')
+            call_command('import_tickets', path, '--resume', '--batch-size', '1', stdout=StringIO())
+            with open(f'{path}.checkpoint') as handle:
+                self.assertEqual(handle.read(), '4')
+
+        self.assertEqual(list(Ticket.objects.values_list('title', flat=True)), ['C'])
+
+
+class PerfToolingTests(TestCase):
+    """seed_perf_data and benchmark_api management commands"""
+
+    def seed(self, **options):
+        call_command('seed_perf_data', users=3, tickets=25, batch_size=10, stdout=StringIO(), **options)
+
+    def test_seed_is_deterministic(self):
+        self.seed()
+        first = list(Ticket.objects.order_by('pk').values_list('title', 'status', 'created_by__username'))
+        Ticket.objects.all().delete()
+        self.seed()
+        second = list(Ticket.objects.order_by('pk').values_list('title', 'status', 'created_by__username'))
+        self.assertEqual(len(first), 25)
+        self.assertEqual(first, second)
+        self.assertEqual(User.objects.filter(username__startswith='perf_user_').count(), 3)
+        created = Ticket.objects.values_list('created_at', flat=True)
+        self.assertEqual(len(set(created)), 25)
+        self.assertLess(min(created), timezone.now() - timedelta(days=1))
+        self.assertFalse(Ticket.objects.filter(updated_at__lt=F('created_at')).exists())
+
+    def test_benchmark_writes_report_and_rolls_back(self):
+        self.seed()
+        with tempfile.TemporaryDirectory() as directory:
+            output = f'{directory}/results.json'
+            call_command('benchmark_api', requests=3, warmup=1, output=output, stdout=StringIO())
+            with open(output) as handle:
+                report = json.load(handle)
+
+        self.assertEqual(set(report['scenarios']), {
+            'list', 'retrieve', 'my_tickets', 'users', 'create', 'assign', 'login',
+        })
+        for name, summary in report['scenarios'].items():
+            self.assertEqual(summary['requests'], 3)
+            self.assertLessEqual(summary['p50_ms'], summary['p99_ms'])
+            self.assertEqual(set(summary['status_codes']), {'201' if name == 'create' else '200'}, name)
+        self.assertEqual(Ticket.objects.count(), 25)
+
+    def test_explain_hot_queries_uses_indexes(self):
+        # Enough rows that the planner has no reason to prefer a table scan
+        call_command('seed_perf_data', users=20, tickets=3000, batch_size=1000, stdout=StringIO())
+        stdout = StringIO()
+        call_command('explain_hot_queries', stdout=stdout)
+        self.assertIn('ticket-my-tickets assigned: 3 queries OK', stdout.getvalue())
+        self.assertIn('Every hot query is served by an index.', stdout.getvalue())
+
+    def test_explain_flags_scans_and_sorts(self):
+        from .management.commands.explain_hot_queries import Command
+
+        problems = Command().find_problems('sqlite', [
+            'SCAN tickets',
+            'SCAN tickets USING INDEX tickets_created_idx',
+            'USE TEMP B-TREE FOR ORDER BY',
+        ])
+        self.assertEqual([kind for kind, _ in problems], ['scan', 'sort'])
+        problems = Command().find_problems('postgresql', [
+            'Limit  (cost=0.42..1.23 rows=20 width=24)',
+            '  ->  Sort  (cost=10.00..11.00 rows=400 width=24)',
+            '        ->  Seq Scan on tickets  (cost=0.00..8.00 rows=400 width=24)',
+        ])
+        self.assertEqual([kind for kind, _ in problems], ['sort', 'scan'])
+
+
+@override_settings(ASYNC_READ_VIEWS=True)
+class AsyncReadViewTests(TicketAPITestCase):
+    """Async handlers answer like the sync viewset"""
+
+    def setUp(self):
+        super().setUp()
+        self.tickets = self.make_tickets(3)
+        self.make_tickets(2, created_by=self.other, assigned_to=None)
+        self.token = Token.objects.create(user=self.user)
+        self.factory = APIRequestFactory()
+
+    def call(self, view, path, method='get', token=True, data=None, **kwargs):
+        headers = {'HTTP_AUTHORIZATION': f'Token {self.token.key}'} if token else {}
+        request = getattr(self.factory, method)(path, data, format='json', **headers)
+        response = async_to_sync(view)(request, **kwargs)
+        response.render()
+        return response
+
+    def list_view(self):
+        return TicketsViewset.as_view({'get': 'list', 'post': 'create'}, basename='ticket', detail=False)
+
+    def test_list_matches_sync_view(self):
+        expected = self.client.get('/api/v1/tickets/?status=open&page=1')
+        # Token lookup, ETag/count aggregate and page rows; representations come from the cache
+        with self.assertNumQueries(3):
+            response = self.call(self.list_view(), '/api/v1/tickets/?status=open&page=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, expected.data)
+        self.assertEqual(response['ETag'], expected['ETag'])
+
+    def test_keyset_my_tickets(self):
+        view = TicketsViewset.as_view({'get': 'my_tickets'}, basename='ticket', detail=False)
+        expected = self.client.get('/api/v1/tickets/my_tickets/?pagination=cursor&role=created')
+        response = self.call(view, '/api/v1/tickets/my_tickets/?pagination=cursor&role=created')
+        self.assertEqual(response.data, expected.data)
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_retrieve_conditional_and_missing(self):
+        view = TicketsViewset.as_view({'get': 'retrieve'}, basename='ticket', detail=True)
+        ticket = self.tickets[0]
+        response = self.call(view, f'/api/v1/tickets/{ticket.pk}/', pk=ticket.pk)
+        self.assertEqual(response.data['created_by']['username'], 'alice')
+
+        request = self.factory.get(
+            f'/api/v1/tickets/{ticket.pk}/',
+            HTTP_AUTHORIZATION=f'Token {self.token.key}',
+            HTTP_IF_NONE_MATCH=response['ETag'],
+        )
+        self.assertEqual(async_to_sync(view)(request, pk=ticket.pk).status_code, 304)
+        self.assertEqual(self.call(view, '/api/v1/tickets/0/', pk=0).status_code, 404)
+
+    def test_authentication_is_enforced(self):
+        self.assertEqual(self.call(self.list_view(), '/api/v1/tickets/', token=False).status_code, 401)
+        self.token.delete()
+        self.assertEqual(self.call(self.list_view(), '/api/v1/tickets/').status_code, 401)
+
+    def test_other_methods_use_the_sync_view(self):
+        response = self.call(self.list_view(), '/api/v1/tickets/', method='post', data={
+            'title': 'New', 'description': 'Created through the async route', 'priority': 'low',
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Ticket.objects.get(title='New').created_by, self.user)
+
+    def test_me(self):
+        view = UserViewSet.as_view({'get': 'me'}, basename='user', detail=False)
+        response = self.call(view, '/api/v1/auth/users/me/')
+        self.assertEqual(response.data['username'], 'alice')
@@ -1,12 +1,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from .views import TicketsViewset
+from .views import TicketsViewset, ticket_events
 
 
 router = DefaultRouter()
 router.register(r'', TicketsViewset, basename="ticket")
 
 urlpatterns = [
+    # Before the router, whose detail route would match events/
+    path('events/', ticket_events, name='ticket-events'),
     path('', include(router.urls))
 ]
\ No newline at end of file
@@ -3,19 +3,69 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter, OpenApiExample
 from drf_spectacular.types import OpenApiTypes
+from rest_framework.exceptions import ValidationError
 from django.conf import settings
-from django.db import models
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
 
-
-from .serializers import TicketSerializer, TicketUpdateSerializer, TicketCreateSerializer
-from .models import Ticket
+from apps.accounts.serializers import UserSerializer
+from apps.core.asyncviews import AsyncActionsMixin, aauthenticate
+from apps.core.conditional import ConditionalRequestMixin
+from apps.core.pagination import KeysetPagination, PageNumberOrKeysetPagination
+from apps.core.schema import SPARSE_FIELDSET_PARAMETERS
+from apps.core.serializers import SparseFieldsetMixin
+from .bulk import create_tickets, update_tickets
+from .export import EXPORT_FORMATS, export_response
+from .serializers import (
+    TicketSerializer,
+    TicketUpdateSerializer,
+    TicketCreateSerializer,
+    TicketBulkUpdateSerializer,
+    TicketAssignmentSerializer,
+    TicketChangeSerializer,
+)
+from .cache import EMBEDDED_USERS, aget_representations, get_representations, row_queryset
+from .history import history_buffer
+from .live import Subscription, event_stream
+from .models import Ticket, TicketChange, TicketCounter, TicketWithArchive
+from .search import search_tickets
+from .stats import counters_to_stats
+from .sync import ExpiredSyncToken, InvalidSyncToken, read_changes
 
 User = settings.AUTH_USER_MODEL
 
+MY_TICKETS_ROLES = ['created', 'assigned', 'any']
+
+# Collection actions that can include archived tickets with ?include_archived=1
+ARCHIVE_READ_ACTIONS = {'list', 'my_tickets', 'export'}
+
+
+class TicketHistoryPagination(KeysetPagination):
+    ordering = ('changed_at', 'id')
+    cursor_salt = 'apps.tickets.views.TicketHistoryPagination'
+
+
+INCLUDE_ARCHIVED_PARAMETER = OpenApiParameter(
+    name='include_archived',
+    type=OpenApiTypes.BOOL,
+    location=OpenApiParameter.QUERY,
+    description='Also return tickets moved to the archive; cannot be combined with q',
+)
+
+
 @extend_schema_view(
     list=extend_schema(
         summary="List all tickets",
-        description="Get a paginated list of all tickets. Supports filtering by status and priority.",
+        description=(
+            "Get a paginated list of all tickets. Supports filtering by status and priority "
+            "and full-text search with q. "
+            "Pass pagination=cursor for keyset pagination, which skips the total count and "
+            "keeps deep pages fast; add count=approx for an estimated total. "
+            "Archived tickets are left out unless include_archived=1."
+        ),
         parameters=[
             OpenApiParameter(
                 name='status',
@@ -31,12 +81,27 @@ User = settings.AUTH_USER_MODEL
                 description='Filter by priority level',
                 enum=['low', 'medium', 'high', 'critical']
             ),
+            OpenApiParameter(
+                name='q',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description=(
+                    'Full-text search over title, description and content, ranked by relevance. '
+                    'Not available with pagination=cursor.'
+                ),
+            ),
+            INCLUDE_ARCHIVED_PARAMETER,
+            *SPARSE_FIELDSET_PARAMETERS,
         ],
         tags=['Tickets'],
     ),
     retrieve=extend_schema(
         summary="Get ticket details",
-        description="Retrieve detailed information about a specific ticket.",
+        description=(
+            "Retrieve detailed information about a specific ticket, archived or not. Responses carry "
+            "ETag and Last-Modified; send If-None-Match or If-Modified-Since to get 304 when unchanged."
+        ),
+        parameters=SPARSE_FIELDSET_PARAMETERS,
         tags=['Tickets'],
     ),
     create=extend_schema(
@@ -59,14 +124,20 @@ User = settings.AUTH_USER_MODEL
     ),
     update=extend_schema(
         summary="Update a ticket",
-        description="Update an existing ticket's information.",
+        description=(
+            "Update an existing ticket's information. Send If-Match with the ticket's ETag "
+            "to get 412 instead of overwriting a concurrent change."
+        ),
         request=TicketUpdateSerializer,
         responses={200: TicketSerializer},
         tags=['Tickets'],
     ),
     partial_update=extend_schema(
         summary="Partially update a ticket",
-        description="Update specific fields of a ticket.",
+        description=(
+            "Update specific fields of a ticket. Send If-Match with the ticket's ETag "
+            "to get 412 instead of overwriting a concurrent change."
+        ),
         request=TicketUpdateSerializer,
         responses={200: TicketSerializer},
         tags=['Tickets'],
@@ -78,13 +149,41 @@ User = settings.AUTH_USER_MODEL
     ),
 )
 
-class TicketsViewset(viewsets.ModelViewSet):
-    """ViewSet for managing tickets"""
+class TicketsViewset(AsyncActionsMixin, ConditionalRequestMixin, viewsets.ModelViewSet):
+    """
+    ViewSet for managing tickets.
+    list, retrieve and my_tickets also have async handlers (alist, ...) used under ASGI.
+    """
 
     permission_classes = [permissions.IsAuthenticated]
 
     queryset = Ticket.objects.all()
     serializer_class = TicketSerializer
+    pagination_class = PageNumberOrKeysetPagination
+    conditional_related = EMBEDDED_USERS
+
+    def include_archived(self):
+        value = self.request.query_params.get('include_archived', '')
+        return value.lower() in ('1', 'true', 'yes')
+
+    def get_ticket_model(self):
+        """
+        Reads by id and ``?include_archived=1`` collections go through the
+        tickets + archive view; writes only ever see the tickets table.
+        """
+        if self.action in ('retrieve', 'history'):
+            return TicketWithArchive
+        if self.action in ARCHIVE_READ_ACTIONS and self.include_archived():
+            return TicketWithArchive
+        return Ticket
+
+    def get_base_queryset(self):
+        """Tickets limited to the columns and joins the response serializer needs"""
+        queryset = self.get_ticket_model().objects.all()
+        serializer = self.get_export_serializer() if self.action == 'export' else self.get_serializer()
+        if isinstance(serializer, SparseFieldsetMixin):
+            queryset = serializer.optimize_queryset(queryset, extra_fields=['created_at'])
+        return queryset
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -94,7 +193,7 @@ class TicketsViewset(viewsets.ModelViewSet):
         return TicketSerializer
        
     def get_queryset(self):
-        queryset = Ticket.objects.all()
+        queryset = self.get_base_queryset()
 
         # Filter by status
         status = self.request.query_params.get('status')
@@ -105,12 +204,85 @@ class TicketsViewset(viewsets.ModelViewSet):
         priority = self.request.query_params.get('priority')
         if priority:
             queryset = queryset.filter(priority=priority)
-        
+
+        # Full-text search, ordered by relevance
+        query = self.request.query_params.get('q')
+        if query:
+            if queryset.model is not Ticket:
+                raise ValidationError({'q': 'Search covers live tickets only; drop include_archived.'})
+            if self.action != 'export' and self.paginator is not None and self.paginator.use_keyset(self.request):
+                # Keyset pages follow (created_at, id) and would drop the relevance order
+                raise ValidationError({'q': 'Search results are paged by page number; drop pagination=cursor.'})
+            queryset = search_tickets(queryset, query)
+
+        if self.action == 'retrieve':
+            queryset = self.get_validator_queryset(queryset)
         return queryset
+
+    def get_export_serializer(self):
+        """Full representation by default; honours ?fields= and ?expand="""
+        return TicketSerializer(context={'request': self.request})
+
+    def get_row_queryset(self, queryset):
+        """Only the columns needed to look rows up in the representation cache"""
+        return row_queryset(queryset)
+
+    def get_validator_queryset(self, queryset):
+        """The row columns plus the embedded users' updated_at, which version the ETag"""
+        related = self.conditional_related
+        return queryset.select_related(None).select_related(*related).only(
+            'id', 'created_at', 'updated_at', *related, *(f'{name}__updated_at' for name in related)
+        )
+
+    def paginate_queryset(self, queryset):
+        return super().paginate_queryset(self.get_row_queryset(queryset))
+
+    async def apaginate_queryset(self, queryset):
+        return await super().apaginate_queryset(self.get_row_queryset(queryset))
+
+    def get_cache_miss_queryset(self, pks):
+        serializer = TicketSerializer(context={})
+        return serializer.optimize_queryset(
+            self.get_ticket_model().objects.filter(pk__in=pks).order_by(),
+            extra_fields=[f'{name}__updated_at' for name in EMBEDDED_USERS],
+        )
+
+    def get_representations(self, rows):
+        """Full ticket representations from the cache, loading misses in one query"""
+        def load(pks):
+            instances = list(self.get_cache_miss_queryset(pks))
+            return zip(instances, TicketSerializer(instances, many=True, context={}).data)
+
+        serializer = self.get_serializer()
+        return [serializer.project(data) for data in get_representations(rows, load)]
+
+    async def aget_representations(self, rows):
+        async def load(pks):
+            instances = [instance async for instance in self.get_cache_miss_queryset(pks)]
+            return zip(instances, TicketSerializer(instances, many=True, context={}).data)
+
+        serializer = self.get_serializer()
+        return [serializer.project(data) for data in await aget_representations(rows, load)]
+
+    def serialize_instance(self, instance):
+        return self.get_representations([instance])[0]
+
+    def serialize_page(self, page):
+        return self.get_representations(page)
+
+    async def aserialize_instance(self, instance):
+        return (await self.aget_representations([instance]))[0]
+
+    async def aserialize_page(self, page):
+        return await self.aget_representations(page)
     
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
+    def perform_update(self, serializer):
+        serializer.instance.changed_by = self.request.user
+        super().perform_update(serializer)
+
     @extend_schema(
         summary="Assign ticket to user",
         description="Assign a ticket to a specific user.",
@@ -135,9 +307,10 @@ class TicketsViewset(viewsets.ModelViewSet):
         
         from apps.accounts.models import User
         try:
-            user = User.objects.get(id=user_id)
+            user = User.objects.only(*UserSerializer.Meta.fields).get(id=user_id)
             ticket.assigned_to = user
-            ticket.save()
+            ticket.changed_by = request.user
+            ticket.save(update_fields=['assigned_to', 'updated_at'])
             serializer = self.get_serializer(ticket)
             return Response(serializer.data)
         except User.DoesNotExist:
@@ -146,17 +319,375 @@ class TicketsViewset(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
     
+    @extend_schema(
+        summary="Ticket change history",
+        description=(
+            "Status, priority and assignee changes of a ticket, newest first, paged with a cursor. "
+            "Changes are written behind the request, so the newest ones can take up to "
+            "TICKET_HISTORY_FLUSH_INTERVAL seconds to appear."
+        ),
+        responses={200: TicketChangeSerializer(many=True)},
+        tags=['Tickets'],
+    )
+    @action(detail=True, methods=['get'], pagination_class=TicketHistoryPagination)
+    def history(self, request, pk=None):
+        """Get the change history of a ticket"""
+        ticket = self.get_object()
+        # Changes to this ticket buffered by this worker, typically this client's own
+        history_buffer.flush_ticket(ticket.pk, ticket._state.db)
+        changes = TicketChange.objects.filter(ticket_id=ticket.pk)
+        page = self.paginator.paginate_queryset(changes, request, view=self)
+        return self.get_paginated_response(TicketChangeSerializer(page, many=True).data)
+
     @extend_schema(
         summary="Get my tickets",
-        description="Get all tickets created by or assigned to the authenticated user.",
+        description=(
+            "Get a paginated list of tickets created by or assigned to the authenticated user. "
+            "Supports the same status, priority and pagination parameters as the list endpoint."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name='role',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Only tickets the user created, only tickets assigned to them, or both',
+                enum=MY_TICKETS_ROLES,
+                default='any',
+            ),
+            INCLUDE_ARCHIVED_PARAMETER,
+            *SPARSE_FIELDSET_PARAMETERS,
+        ],
         tags=['Tickets'],
     )
     @action(detail=False, methods=['get'])
     def my_tickets(self, request):
         """Get tickets for current user"""
-        tickets = Ticket.objects.filter(
-            models.Q(created_by=request.user) | models.Q(assigned_to=request.user)
-        ).distinct()
-        
+        tickets = self.get_my_tickets_queryset(request)
+        page = self.paginate_queryset(tickets)
+        if page is not None:
+            return self.get_paginated_response(self.serialize_page(page))
+
         serializer = self.get_serializer(tickets, many=True)
         return Response(serializer.data)
+
+    async def amy_tickets(self, request):
+        tickets = self.get_my_tickets_queryset(request)
+        page = await self.apaginate_queryset(tickets)
+        if page is not None:
+            return self.get_paginated_response(await self.aserialize_page(page))
+        return Response(await self.aserialize_page([ticket async for ticket in tickets]))
+
+    def get_my_tickets_queryset(self, request):
+        role = request.query_params.get('role', 'any')
+        if role not in MY_TICKETS_ROLES:
+            raise ValidationError({'role': f"Must be one of: {', '.join(MY_TICKETS_ROLES)}"})
+
+        queryset = self.get_queryset()
+        created = queryset.filter(created_by=request.user)
+        assigned = queryset.filter(assigned_to=request.user)
+        if role == 'created':
+            return created
+        if role == 'assigned':
+            return assigned
+        # UNION of two single-column index scans instead of OR + DISTINCT
+        return queryset.filter(pk__in=created.order_by().values('pk').union(
+            assigned.order_by().values('pk')
+        ))
+
+    @extend_schema(
+        summary="Ticket changes since a sync token",
+        description=(
+            "Incremental sync for clients that keep a copy of the ticket list: tickets created or "
+            "updated since the sync token, in the list representation, and the ids of tickets that "
+            "were deleted or archived since. Start without a token (a full sync), then keep passing "
+            "the returned sync_token; while has_more is true, call again straight away. Changes show "
+            "up after TICKETS_SYNC_SETTLE_SECONDS. A token older than TICKETS_SYNC_TOMBSTONE_DAYS "
+            "gets 410 and the client has to sync from scratch."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name='since',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Opaque sync_token from the previous response',
+            ),
+            *SPARSE_FIELDSET_PARAMETERS,
+        ],
+        responses={
+            200: {
+                'type': 'object',
+                'properties': {
+                    'changes': {'type': 'array', 'items': {'type': 'object'}},
+                    'deleted': {'type': 'array', 'items': {'type': 'integer'}},
+                    'sync_token': {'type': 'string'},
+                    'has_more': {'type': 'boolean'},
+                },
+            },
+            410: {'type': 'object', 'properties': {'detail': {'type': 'string'}}},
+        },
+        tags=['Tickets'],
+    )
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """Get tickets changed and deleted since a sync token"""
+        try:
+            tickets, deleted, sync_token, has_more = read_changes(
+                self.get_row_queryset(Ticket.objects.all()), request.query_params.get('since')
+            )
+        except ExpiredSyncToken as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_410_GONE)
+        except InvalidSyncToken as exc:
+            raise ValidationError({'since': str(exc)})
+        return Response({
+            'changes': self.serialize_page(tickets),
+            'deleted': deleted,
+            'sync_token': sync_token,
+            'has_more': has_more,
+        })
+
+    @extend_schema(
+        summary="Ticket statistics",
+        description=(
+            "Ticket counts by status, priority and assignee. Read from counters maintained "
+            "on every ticket write, so the cost does not grow with the number of tickets. "
+            "Archived tickets are not counted."
+        ),
+        responses={
+            200: {
+                'type': 'object',
+                'properties': {
+                    'total': {'type': 'integer'},
+                    'by_status': {'type': 'object', 'additionalProperties': {'type': 'integer'}},
+                    'by_priority': {'type': 'object', 'additionalProperties': {'type': 'integer'}},
+                    'by_assignee': {
+                        'type': 'array',
+                        'items': {
+                            'type': 'object',
+                            'properties': {
+                                'user_id': {'type': 'integer', 'nullable': True},
+                                'count': {'type': 'integer'},
+                            },
+                        },
+                    },
+                },
+            }
+        },
+        tags=['Tickets'],
+    )
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """Get ticket counts per bucket"""
+        return Response(counters_to_stats(TicketCounter.objects.all()))
+
+    def get_bulk_items(self, request):
+        """The request body as a non-empty list of at most TICKETS_BULK_MAX_ITEMS items"""
+        items = request.data
+        limit = settings.TICKETS_BULK_MAX_ITEMS
+        if not isinstance(items, list) or not items:
+            raise ValidationError({'non_field_errors': ['Expected a non-empty list of items.']})
+        if len(items) > limit:
+            raise ValidationError({'non_field_errors': [f'At most {limit} items per request.']})
+        return items
+
+    def get_bulk_response(self, tickets, status_code=status.HTTP_200_OK):
+        serializer = self.get_serializer(tickets, many=True)
+        return Response({'results': serializer.data}, status=status_code)
+
+    def get_item_id(self, item):
+        """The integer ``id`` of a bulk item, or None when it has none"""
+        if not isinstance(item, dict) or isinstance(item.get('id'), bool):
+            return None
+        try:
+            return int(item.get('id'))
+        except (TypeError, ValueError):
+            return None
+
+    def get_users_by_id(self, user_ids):
+        from apps.accounts.models import User
+
+        valid_ids = set()
+        for user_id in user_ids:
+            try:
+                valid_ids.add(int(user_id))
+            except (TypeError, ValueError):
+                continue
+        return User.objects.only(*UserSerializer.Meta.fields).in_bulk(valid_ids)
+
+    @extend_schema(
+        summary="Create tickets in bulk",
+        description=(
+            "Create up to TICKETS_BULK_MAX_ITEMS tickets in one transaction. Either every item "
+            "is created or none is, and a 400 response lists the errors per item."
+        ),
+        request=TicketCreateSerializer(many=True),
+        responses={201: TicketSerializer(many=True)},
+        tags=['Tickets'],
+    )
+    @action(detail=False, methods=['post'])
+    def bulk_create(self, request):
+        """Create many tickets"""
+        serializer = TicketCreateSerializer(data=self.get_bulk_items(request), many=True)
+        serializer.is_valid(raise_exception=True)
+        tickets = create_tickets([
+            Ticket(created_by=request.user, **attrs) for attrs in serializer.validated_data
+        ])
+        return self.get_bulk_response(tickets, status.HTTP_201_CREATED)
+
+    @extend_schema(
+        summary="Update tickets in bulk",
+        description=(
+            "Partially update up to TICKETS_BULK_MAX_ITEMS tickets, each item identified by id, "
+            "in one transaction. Either every item is applied or none is."
+        ),
+        request=TicketBulkUpdateSerializer(many=True),
+        responses={200: TicketSerializer(many=True)},
+        tags=['Tickets'],
+    )
+    @action(detail=False, methods=['patch'])
+    def bulk_update(self, request):
+        """Update many tickets"""
+        items = self.get_bulk_items(request)
+        ids = [self.get_item_id(item) for item in items]
+        tickets = Ticket.objects.in_bulk([pk for pk in ids if pk is not None])
+        users = self.get_users_by_id(item.get('assigned_to') for item in items if isinstance(item, dict))
+
+        errors, updates, seen = [], [], set()
+        for item, pk in zip(items, ids):
+            if pk is None:
+                errors.append({'id': ['Expected an object with an integer id.']})
+                continue
+            ticket = tickets.get(pk)
+            if ticket is None or ticket.pk in seen:
+                errors.append({'id': ['Ticket not found or listed twice.']})
+                continue
+            seen.add(ticket.pk)
+            serializer = TicketBulkUpdateSerializer(
+                ticket, data=item, partial=True, context={'users': users}
+            )
+            if serializer.is_valid():
+                errors.append({})
+                updates.append((ticket, serializer.validated_data))
+            else:
+                errors.append(serializer.errors)
+        if any(errors):
+            raise ValidationError(errors)
+
+        fields = set()
+        for ticket, attrs in updates:
+            attrs.pop('id')
+            for attr, value in attrs.items():
+                setattr(ticket, attr, value)
+            fields.update(attrs)
+        updated = update_tickets([ticket for ticket, _ in updates], fields, changed_by=request.user)
+        return self.get_bulk_response(updated)
+
+    @extend_schema(
+        summary="Assign tickets in bulk",
+        description=(
+            "Assign up to TICKETS_BULK_MAX_ITEMS tickets in one transaction. Tickets and users "
+            "are each resolved with a single query."
+        ),
+        request=TicketAssignmentSerializer(many=True),
+        responses={200: TicketSerializer(many=True)},
+        tags=['Tickets'],
+    )
+    @action(detail=False, methods=['post'])
+    def bulk_assign(self, request):
+        """Assign many tickets"""
+        serializer = TicketAssignmentSerializer(data=self.get_bulk_items(request), many=True)
+        serializer.is_valid(raise_exception=True)
+        assignments = serializer.validated_data
+        tickets = Ticket.objects.in_bulk([item['ticket_id'] for item in assignments])
+        users = self.get_users_by_id(item['user_id'] for item in assignments)
+
+        errors, seen = [], set()
+        for item in assignments:
+            error = {}
+            if item['ticket_id'] not in tickets or item['ticket_id'] in seen:
+                error['ticket_id'] = ['Ticket not found or listed twice.']
+            if item['user_id'] not in users:
+                error['user_id'] = ['User not found.']
+            seen.add(item['ticket_id'])
+            errors.append(error)
+        if any(errors):
+            raise ValidationError(errors)
+
+        assigned = []
+        for item in assignments:
+            ticket = tickets[item['ticket_id']]
+            ticket.assigned_to = users[item['user_id']]
+            assigned.append(ticket)
+        return self.get_bulk_response(update_tickets(assigned, ['assigned_to'], changed_by=request.user))
+
+    @extend_schema(
+        summary="Export tickets",
+        description=(
+            "Stream every ticket matching the status, priority and q filters as NDJSON or CSV. "
+            "Rows are read from the database in chunks, so memory use does not grow with the export."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name='export_format',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Output format',
+                enum=list(EXPORT_FORMATS),
+                default='ndjson',
+            ),
+            OpenApiParameter(name='status', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name='priority', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY),
+            OpenApiParameter(name='q', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY),
+            INCLUDE_ARCHIVED_PARAMETER,
+            *SPARSE_FIELDSET_PARAMETERS,
+        ],
+        responses={(200, 'application/x-ndjson'): OpenApiTypes.STR, (200, 'text/csv'): OpenApiTypes.STR},
+        tags=['Tickets'],
+    )
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream tickets as NDJSON or CSV"""
+        export_format = request.query_params.get('export_format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError({'export_format': f"Must be one of: {', '.join(EXPORT_FORMATS)}"})
+        queryset = self.filter_queryset(self.get_queryset())
+        return export_response(
+            queryset, self.get_export_serializer(), export_format,
+            asynchronous=isinstance(request._request, ASGIRequest),
+        )
+
+
+async def ticket_events(request):
+    """
+    Server-Sent Events stream of ticket changes (ticket.created, ticket.updated,
+    ticket.assigned, ticket.deleted). Narrow it with role (created, assigned or
+    any, as in my_tickets), status and priority. Only served by the ASGI app.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'error': 'Live events are only served by the ASGI app (SERVER_INTERFACE=asgi)'}, status=501
+        )
+
+    drf_request = Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+    try:
+        await aauthenticate(drf_request)
+    except exceptions.APIException as exc:
+        return JsonResponse({'detail': str(exc.detail)}, status=exc.status_code)
+    if not drf_request.user.is_authenticated:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+    role = request.GET.get('role') or None
+    if role is not None and role not in MY_TICKETS_ROLES:
+        return JsonResponse({'role': [f"Must be one of: {', '.join(MY_TICKETS_ROLES)}"]}, status=400)
+    subscription = Subscription(
+        drf_request.user.pk,
+        role=role,
+        status=request.GET.get('status') or None,
+        priority=request.GET.get('priority') or None,
+    )
+    response = StreamingHttpResponse(event_stream(subscription), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Keep reverse proxies (nginx) from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,25 @@
+"""Gunicorn settings shared by entrypoint.sh and the Procfile"""
+import os
+
+
+def child_exit(server, worker):
+    # Drop the exited worker's live gauges from the shared metrics directory
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def on_starting(server):
+    # Logout and token revocation reach other workers only through shared token caches
+    if server.cfg.workers > 1:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+        from django.conf import settings
+
+        for alias in (settings.TOKEN_CACHE_ALIAS, settings.TOKEN_REVOCATION_CACHE_ALIAS):
+            backend = settings.CACHES[alias]['BACKEND']
+            if backend.endswith('.LocMemCache'):
+                raise RuntimeError(
+                    f'The {alias} cache is per process ({backend}) but {server.cfg.workers} workers '
+                    'were requested; set TOKEN_CACHE_LOCATION to a shared directory.'
+                )
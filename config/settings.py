@@ -1,3 +1,4 @@
+import tempfile
 from pathlib import Path
 from decouple import config
 import dj_database_url
@@ -55,6 +56,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'apps.core.metrics.PrometheusMetricsMiddleware',
+    'apps.core.timing.ServerTimingMiddleware',
+    'apps.core.replicas.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -105,6 +109,80 @@ else:
         }
     }
 
+# Read replicas, comma-separated database URLs, become aliases replica_1, replica_2, ...
+# Safe requests read from one of them; after a write the client reads from the
+# primary for PRIMARY_PIN_SECONDS (see apps.core.replicas)
+PRIMARY_DATABASE = 'default'
+REPLICA_DATABASES = []
+for index, replica_url in enumerate(env_list('DATABASE_REPLICA_URLS'), start=1):
+    alias = f'replica_{index}'
+    DATABASES[alias] = {
+        **dj_database_url.parse(replica_url, conn_max_age=600),
+        # Tests run against the primary's test database
+        'TEST': {'MIRROR': PRIMARY_DATABASE},
+    }
+    REPLICA_DATABASES.append(alias)
+DATABASE_ROUTERS = ['apps.core.replicas.ReplicaRouter']
+PRIMARY_PIN_SECONDS = config('PRIMARY_PIN_SECONDS', default=5, cast=int)
+
+# Caches
+# Logout and account changes drop token cache entries, which only reaches every
+# worker through a shared backend: by default a file cache in the temp directory,
+# shared by the workers of one host. An empty TOKEN_CACHE_LOCATION keeps tokens in
+# process memory, which config/gunicorn.py refuses with more than one worker.
+# Access token revocations live next to it in a cache of their own that is never
+# culled, as an evicted entry would bring a revoked token back to life.
+# The ticket cache is per process unless TICKET_CACHE_LOCATION names a directory;
+# its keys carry the ticket and user versions, so workers never serve stale copies.
+TOKEN_CACHE_ALIAS = 'tokens'
+TOKEN_CACHE_TIMEOUT = config('TOKEN_CACHE_TIMEOUT', default=60, cast=int)
+token_cache_location = config(
+    'TOKEN_CACHE_LOCATION', default=str(Path(tempfile.gettempdir()) / 'issue-tracker-token-cache')
+)
+TOKEN_REVOCATION_CACHE_ALIAS = 'token-revocations'
+TICKET_CACHE_ALIAS = 'tickets'
+TICKET_CACHE_TIMEOUT = config('TICKET_CACHE_TIMEOUT', default=300, cast=int)
+ticket_cache_location = config('TICKET_CACHE_LOCATION', default='')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    TOKEN_CACHE_ALIAS: {
+        'BACKEND': (
+            'django.core.cache.backends.filebased.FileBasedCache'
+            if token_cache_location
+            else 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': token_cache_location or 'auth-tokens',
+        'TIMEOUT': TOKEN_CACHE_TIMEOUT,
+        'OPTIONS': {
+            'MAX_ENTRIES': config('TOKEN_CACHE_MAX_ENTRIES', default=10000, cast=int),
+        },
+    },
+    TOKEN_REVOCATION_CACHE_ALIAS: {
+        'BACKEND': (
+            'django.core.cache.backends.filebased.FileBasedCache'
+            if token_cache_location
+            else 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': f'{token_cache_location}-revocations' if token_cache_location else 'auth-token-revocations',
+        # Entries expire with the tokens they revoke; this bound is never meant to be reached
+        'OPTIONS': {'MAX_ENTRIES': 10**9},
+    },
+    TICKET_CACHE_ALIAS: {
+        'BACKEND': (
+            'django.core.cache.backends.filebased.FileBasedCache'
+            if ticket_cache_location
+            else 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': ticket_cache_location or 'ticket-representations',
+        'TIMEOUT': TICKET_CACHE_TIMEOUT,
+        'OPTIONS': {
+            'MAX_ENTRIES': config('TICKET_CACHE_MAX_ENTRIES', default=50000, cast=int),
+        },
+    },
+}
+
 # Proxy/SSL settings - safe defaults for direct EC2 demo deployment.
 USE_X_FORWARDED_HOST = env_bool('USE_X_FORWARDED_HOST', default=False)
 if env_bool('USE_PROXY_SSL_HEADER', default=False):
@@ -128,10 +206,24 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
 # Django REST Framework
+# The browsable API renders forms with extra queries per request; production leaves it out
+BROWSABLE_API = env_bool('BROWSABLE_API', default=DEBUG)
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_RENDERER_CLASSES': [
+        'apps.core.renderers.ORJSONRenderer',
+        'apps.core.renderers.MessagePackRenderer',
+        *(['rest_framework.renderers.BrowsableAPIRenderer'] if BROWSABLE_API else []),
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'apps.core.parsers.ORJSONParser',
+        'apps.core.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'apps.accounts.authentication.SignedAccessTokenAuthentication',
+        'apps.accounts.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -143,6 +235,89 @@ REST_FRAMEWORK = {
     'EXCEPTION_HANDLER': 'rest_framework.views.exception_handler',
 }
 
+# Issue short-lived signed access tokens (Authorization: Bearer) on login and
+# /auth/token/refresh/; the DRF Token doubles as the refresh token
+SIGNED_ACCESS_TOKENS = env_bool('SIGNED_ACCESS_TOKENS', default=False)
+ACCESS_TOKEN_LIFETIME = config('ACCESS_TOKEN_LIFETIME', default=300, cast=int)
+
+# Ticket history is buffered and written in batches by a background thread every
+# TICKET_HISTORY_FLUSH_INTERVAL seconds; 0 writes it synchronously on commit
+TICKET_HISTORY_FLUSH_INTERVAL = config('TICKET_HISTORY_FLUSH_INTERVAL', default=1.0, cast=float)
+TICKET_HISTORY_BATCH_SIZE = config('TICKET_HISTORY_BATCH_SIZE', default=500, cast=int)
+# Changes held per database while writes fail, and failed flushes before a batch
+# is written row by row and the rows that still fail are dropped
+TICKET_HISTORY_MAX_PENDING = config('TICKET_HISTORY_MAX_PENDING', default=50000, cast=int)
+TICKET_HISTORY_MAX_RETRIES = config('TICKET_HISTORY_MAX_RETRIES', default=3, cast=int)
+
+# Outbox delivery (run_outbox_worker); backends are dotted paths, comma separated
+OUTBOX_BACKENDS = env_list('OUTBOX_BACKENDS', default='apps.tickets.outbox.ConsoleBackend')
+OUTBOX_FILE_PATH = config('OUTBOX_FILE_PATH', default=str(BASE_DIR / 'outbox-events.jsonl'))
+OUTBOX_WEBHOOK_URL = config('OUTBOX_WEBHOOK_URL', default='')
+OUTBOX_WEBHOOK_TIMEOUT = config('OUTBOX_WEBHOOK_TIMEOUT', default=5.0, cast=float)
+OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', default=8, cast=int)
+OUTBOX_RETRY_BASE_DELAY = config('OUTBOX_RETRY_BASE_DELAY', default=5.0, cast=float)
+OUTBOX_RETRY_MAX_DELAY = config('OUTBOX_RETRY_MAX_DELAY', default=900.0, cast=float)
+OUTBOX_LEASE_SECONDS = config('OUTBOX_LEASE_SECONDS', default=60, cast=int)
+# Delivered events older than this are deleted by prune_outbox_events
+OUTBOX_RETENTION_DAYS = config('OUTBOX_RETENTION_DAYS', default=7, cast=int)
+
+# Closed tickets untouched for this many days are moved to the archive by archive_tickets
+TICKET_ARCHIVE_AFTER_DAYS = config('TICKET_ARCHIVE_AFTER_DAYS', default=180, cast=int)
+
+# Delta sync (/tickets/changes/): rows per page, how long a write may take to
+# commit (and reach the read replicas) before it is returned, and how long
+# tombstones and sync tokens stay valid
+TICKETS_SYNC_PAGE_SIZE = config('TICKETS_SYNC_PAGE_SIZE', default=500, cast=int)
+TICKETS_SYNC_SETTLE_SECONDS = config('TICKETS_SYNC_SETTLE_SECONDS', default=5.0, cast=float)
+TICKETS_SYNC_TOMBSTONE_DAYS = config('TICKETS_SYNC_TOMBSTONE_DAYS', default=30, cast=int)
+
+# Live ticket events (/tickets/events/, ASGI only): polling interval of the
+# non-PostgreSQL fallback, keepalive interval, stream lifetime before the
+# client reconnects, reconnect delay and events buffered per stream
+TICKET_EVENTS_POLL_INTERVAL = config('TICKET_EVENTS_POLL_INTERVAL', default=2.0, cast=float)
+TICKET_EVENTS_HEARTBEAT = config('TICKET_EVENTS_HEARTBEAT', default=15.0, cast=float)
+TICKET_EVENTS_MAX_STREAM_SECONDS = config('TICKET_EVENTS_MAX_STREAM_SECONDS', default=300.0, cast=float)
+TICKET_EVENTS_RETRY_MS = config('TICKET_EVENTS_RETRY_MS', default=3000, cast=int)
+TICKET_EVENTS_QUEUE_SIZE = config('TICKET_EVENTS_QUEUE_SIZE', default=100, cast=int)
+
+# Maximum number of items accepted by the ticket bulk endpoints
+TICKETS_BULK_MAX_ITEMS = config('TICKETS_BULK_MAX_ITEMS', default=100, cast=int)
+
+# Rows fetched per database round trip by the streaming ticket export
+TICKETS_EXPORT_CHUNK_SIZE = config('TICKETS_EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Serve the async handlers of ticket list/retrieve/my_tickets and users/me;
+# enable when running under an ASGI worker (see entrypoint.sh)
+ASYNC_READ_VIEWS = env_bool('ASYNC_READ_VIEWS', default=False)
+
+# Fraction of requests timed by ServerTimingMiddleware (0 disables it) and
+# whether the Server-Timing header is sent to clients as well as logged
+SERVER_TIMING_SAMPLE_RATE = config('SERVER_TIMING_SAMPLE_RATE', default=1.0, cast=float)
+SERVER_TIMING_HEADER = env_bool('SERVER_TIMING_HEADER', default=True)
+
+# /metrics is public unless METRICS_TOKEN is set, in which case it requires
+# "Authorization: Bearer <token>"; leave it empty only when the endpoint is reachable internally
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Request timings are logged as one JSON object per line; set TIMING_LOG_LEVEL=INFO to emit them
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'timing': {'class': 'logging.StreamHandler', 'formatter': 'message'},
+    },
+    'loggers': {
+        'apps.timing': {
+            'handlers': ['timing'],
+            'level': config('TIMING_LOG_LEVEL', default='WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
 # OpenAPI/Swagger Configuration
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Issue Tracker API',
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.urls import path, include
 from django.views.generic import RedirectView
+from apps.core.metrics import metrics_view
 from drf_spectacular.views import (
     SpectacularAPIView,
     SpectacularSwaggerView,
@@ -10,6 +11,7 @@ from drf_spectacular.views import (
 urlpatterns = [
     path('', RedirectView.as_view(url='/api/docs/', permanent=False)),
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
 
     # API endpoints
     path('api/v1/auth/', include('apps.accounts.urls')),
@@ -14,5 +14,17 @@ python manage.py migrate --noinput
 echo "Collecting static files..."
 python manage.py collectstatic --noinput
 
+# Workers share metrics through mmap'd files; stale files from a previous run would be summed in
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus-multiproc}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+# SERVER_INTERFACE=asgi runs uvicorn workers, which serve the async read views
+if [ "${SERVER_INTERFACE:-wsgi}" = "asgi" ]; then
+  APP="config.asgi:application --worker-class uvicorn.workers.UvicornWorker"
+else
+  APP="config.wsgi:application"
+fi
+
 echo "Starting Gunicorn..."
-exec gunicorn config.wsgi:application --bind 0.0.0.0:8000 --workers 3 --timeout 120 --log-file -
+exec gunicorn $APP -c config/gunicorn.py --bind 0.0.0.0:8000 --workers 3 --timeout 120 --log-file -